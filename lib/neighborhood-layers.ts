@@ -0,0 +1,50 @@
+/**
+ * Loader for the neighborhood map layers (/<layer>.json).
+ *
+ * Layers are written by the scripts/process-*-data.py and
+ * scripts/update-neighborhood-data.py processors. fetchLayer() resolves a
+ * layer through the hashed-asset manifest (scripts/layer_assets.py), so the
+ * browser can cache it forever, and falls back to the plain path.
+ */
+
+interface LayerManifest {
+  layers: Record<string, { path: string; hash: string; bytes: number }>;
+}
+
+let manifestPromise: Promise<LayerManifest | null> | null = null;
+
+/**
+ * The manifest written by scripts/layer_assets.py, mapping logical layer
+ * files to content-hashed (immutable) paths. Fetched once per page load.
+ */
+function loadManifest(): Promise<LayerManifest | null> {
+  if (!manifestPromise) {
+    manifestPromise = fetch('/layer-manifest.json', { cache: 'no-cache' })
+      .then(res => (res.ok ? res.json() : null))
+      .catch(() => null);
+  }
+  return manifestPromise;
+}
+
+async function fetchAsset(manifest: LayerManifest | null, file: string): Promise<Response> {
+  const hashed = manifest?.layers?.[file]?.path;
+  if (hashed) {
+    const res = await fetch(hashed);
+    if (res.ok) return res;
+  }
+  return fetch(`/${file}`);
+}
+
+/**
+ * Load a map layer by base path (e.g. '/crimes-data') from its .json file,
+ * through the hashed-asset manifest when one is published.
+ */
+export async function fetchLayer<T>(basePath: string): Promise<T> {
+  const manifest = await loadManifest();
+  const base = basePath.replace(/^\//, '');
+  const res = await fetchAsset(manifest, `${base}.json`);
+  if (!res.ok) {
+    throw new Error(`Failed to load ${basePath}.json: ${res.status}`);
+  }
+  return res.json();
+}
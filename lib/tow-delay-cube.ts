@@ -0,0 +1,150 @@
+/**
+ * Tow Record Delay Lookup
+ *
+ * Estimates how long after a tow CPD creates the tow record, and so when our
+ * tow alert can go out, from the cube built by scripts/build-tow-delay-cube.py
+ * (data/tow-delay-cube.json). The cube is a dense array over reason for tow,
+ * pound, hour of day and day of week. Sparse cells were already resolved to
+ * coarser ones at build time, so a lookup is one index computation.
+ *
+ * Unknown or missing values use the dimension's "all" slot. A tow date at
+ * exactly midnight Chicago time has no known hour; the portal only gives the
+ * date, as a zone-less Chicago timestamp.
+ */
+
+import * as fs from 'fs';
+import * as path from 'path';
+import { toChicagoTime } from './chicago-timezone-utils';
+
+const CUBE_PATH = path.join(process.cwd(), 'data', 'tow-delay-cube.json');
+const DIMENSIONS = ['reason', 'pound', 'hour', 'dow'] as const;
+
+export type Dimension = typeof DIMENSIONS[number];
+
+export interface TowDelayCube {
+  version: number;
+  built_at: string;
+  min_cell_count: number;
+  sync_delay_minutes: number;
+  dimensions: Record<Dimension, (string | number)[]>;
+  stats_fields: string[];
+  cells: number[];
+  stats: number[][];
+}
+
+export interface TowDelayQuery {
+  reason?: string | null;
+  pound?: string | number | null;
+  towDate?: Date | string | null;
+}
+
+export interface TowDelayEstimate {
+  sampleSize: number;
+  p50Minutes: number;
+  p75Minutes: number;
+  p90Minutes: number;
+  // Median record delay plus the average wait for our portal sync
+  expectedNotificationMinutes: number;
+  // Dimensions the query had a value for; the rest used their "all" slot.
+  // A sparse cell may still have fallen back further at build time.
+  matchedOn: Dimension[];
+}
+
+let cachedCube: TowDelayCube | null | undefined;
+
+/**
+ * Load the cube once per process. Returns null if it hasn't been built.
+ */
+export function loadTowDelayCube(): TowDelayCube | null {
+  if (cachedCube === undefined) {
+    try {
+      cachedCube = JSON.parse(fs.readFileSync(CUBE_PATH, 'utf8')) as TowDelayCube;
+    } catch (error) {
+      console.warn(`Tow delay cube not available (${CUBE_PATH}):`, error);
+      cachedCube = null;
+    }
+  }
+  return cachedCube;
+}
+
+function slot(cube: TowDelayCube, dimension: Dimension, value: string | number | null): number {
+  const values = cube.dimensions[dimension];
+  const index = value === null ? -1 : values.indexOf(value);
+  return index === -1 ? values.length - 1 : index;
+}
+
+// Portal timestamps carry no zone: '2025-10-20T00:00:00.000' is Chicago wall-clock time
+const FLOATING_TIMESTAMP = /^(\d{4})-(\d{2})-(\d{2})(?:[T ](\d{2}):(\d{2})(?::(\d{2})(?:\.\d+)?)?)?$/;
+
+/**
+ * Chicago hour of day (null at exactly midnight, the portal's date-only
+ * stamp) and weekday (Monday = 0 .. Sunday = 6, as in the cube).
+ * Zone-less strings are read as Chicago wall-clock time, not in the
+ * server's timezone; Dates and strings with a zone are instants.
+ */
+export function chicagoHourAndWeekday(
+  towDate: Date | string | null | undefined,
+): { hour: number | null; dow: number | null } {
+  if (!towDate) return { hour: null, dow: null };
+
+  let hours: number;
+  let minutes: number;
+  let seconds: number;
+  let weekday: number;
+  const floating = typeof towDate === 'string' ? FLOATING_TIMESTAMP.exec(towDate.trim()) : null;
+  if (floating) {
+    const [, year, month, day, h = '0', m = '0', sec = '0'] = floating;
+    hours = Number(h);
+    minutes = Number(m);
+    seconds = Number(sec);
+    weekday = new Date(Date.UTC(Number(year), Number(month) - 1, Number(day))).getUTCDay();
+  } else {
+    const instant = new Date(towDate);
+    if (isNaN(instant.getTime())) return { hour: null, dow: null };
+    const chicago = toChicagoTime(instant);
+    hours = chicago.getHours();
+    minutes = chicago.getMinutes();
+    seconds = chicago.getSeconds();
+    weekday = chicago.getDay();
+  }
+
+  return {
+    hour: hours || minutes || seconds ? hours : null,
+    dow: (weekday + 6) % 7,
+  };
+}
+
+/**
+ * Record delay quantiles for one tow, or null if the cube isn't available.
+ */
+export function estimateTowRecordDelay(
+  query: TowDelayQuery,
+  cube: TowDelayCube | null = loadTowDelayCube(),
+): TowDelayEstimate | null {
+  if (!cube) return null;
+
+  const { hour, dow } = chicagoHourAndWeekday(query.towDate);
+  const values: Record<Dimension, string | number | null> = {
+    reason: query.reason ? query.reason.trim().toUpperCase() : null,
+    pound: query.pound != null && query.pound !== '' ? String(query.pound).trim() : null,
+    hour,
+    dow,
+  };
+
+  let index = 0;
+  for (const dimension of DIMENSIONS) {
+    index = index * cube.dimensions[dimension].length + slot(cube, dimension, values[dimension]);
+  }
+
+  const [sampleSize, p50, p75, p90] = cube.stats[cube.cells[index]];
+  return {
+    sampleSize,
+    p50Minutes: p50,
+    p75Minutes: p75,
+    p90Minutes: p90,
+    expectedNotificationMinutes: p50 + cube.sync_delay_minutes,
+    matchedOn: DIMENSIONS.filter(
+      (dimension) => slot(cube, dimension, values[dimension]) !== cube.dimensions[dimension].length - 1,
+    ),
+  };
+}
@@ -9,6 +9,11 @@ const nextConfig = {
   env: {
     SITE_URL: process.env.SITE_URL || 'http://localhost:3000',
   },
+  // lib/tow-delay-cube.ts reads the cube with fs at runtime, which file
+  // tracing can't see; ship it with the tow cron.
+  outputFileTracingIncludes: {
+    '/api/cron/check-towed-vehicles': ['./data/tow-delay-cube.json'],
+  },
   // Serve the OAuth callback at /oauth-return so the Android app's
   // /auth/* universal-link intent filter (in v2.0.1 and earlier) does NOT
   // intercept it. Browser URL stays /oauth-return; Next.js internally
@@ -5,6 +5,7 @@ import { sanitizeErrorMessage } from '../../../lib/error-utils';
 import { createTowAlert, markAlertNotified } from '../../../lib/contest-intelligence';
 import { pushService } from '../../../lib/push-service';
 import { notificationLogger } from '../../../lib/notification-logger';
+import { estimateTowRecordDelay } from '../../../lib/tow-delay-cube';
 
 // Checks if any user's car was towed recently
 // Sends immediate SMS/email alerts
@@ -84,6 +85,13 @@ export default async function handler(
         continue;
       }
 
+      // Typical CPD record delay, kept with the alert so QA can compare it
+      // with when we actually found the tow. This is NOT a per-tow prediction:
+      // the portal has no reason or pound and its tow_date has no time, so
+      // only the weekday narrows it, and the cube is built from timed FOIA
+      // tows. matched_on records which inputs the baseline actually used.
+      const delayEstimate = estimateTowRecordDelay({ towDate: tow.tow_date });
+
       // Pre-claim dedup slot. Partial unique index on user_notifications
       // (user_id, notification_type='tow_alert', metadata->>'tow_id') means
       // a second cron fire's INSERT fails with 23505 and we skip the send.
@@ -96,7 +104,17 @@ export default async function handler(
           sent_at: new Date().toISOString(),
           status: 'sending',
           channels: [],
-          metadata: { tow_id: String(tow.id), inventory_number: tow.inventory_number, plate },
+          metadata: {
+            tow_id: String(tow.id),
+            inventory_number: tow.inventory_number,
+            plate,
+            record_delay_baseline: delayEstimate ? {
+              matched_on: delayEstimate.matchedOn,
+              sample_size: delayEstimate.sampleSize,
+              p50_minutes: delayEstimate.p50Minutes,
+              notification_minutes: delayEstimate.expectedNotificationMinutes,
+            } : null,
+          },
         } as any)
         .select('id')
         .single();
@@ -112,6 +130,11 @@ export default async function handler(
       const claimId = (claim as any).id;
 
       console.log(`🚨 FOUND TOW: ${plate} (${state}) - User: ${user.user_id}`);
+      if (delayEstimate) {
+        console.log(`  Baseline CPD record delay (by ${delayEstimate.matchedOn.join(', ') || 'nothing'}): ` +
+          `${Math.round(delayEstimate.p50Minutes)} min ` +
+          `(p90 ${Math.round(delayEstimate.p90Minutes)} min, n=${delayEstimate.sampleSize})`);
+      }
 
       // Format tow date (no time - Chicago doesn't provide it)
       const towDate = new Date(tow.tow_date);
@@ -5,6 +5,7 @@ import dynamic from 'next/dynamic';
 import Footer from '../components/Footer';
 import AddressAutocomplete from '../components/AddressAutocomplete';
 import { RED_LIGHT_CAMERAS, RedLightCamera } from '../lib/red-light-cameras';
+import { fetchLayer } from '../lib/neighborhood-layers';
 import type { SpeedCamera, UserLocation, MeterLocation } from '../components/CameraMap';
 import {
   calculateOverallScore,
@@ -506,8 +507,7 @@ export default function Neighborhoods() {
   // Load data based on active layer
   useEffect(() => {
     if (activeLayer === 'violations' && !violationsLoaded) {
-      fetch('/violations-data.json')
-        .then(res => res.json())
+      fetchLayer<ViolationsData>('/violations-data')
         .then((data: ViolationsData) => {
           setViolationBlocks(parseViolationsData(data));
           setViolationsLoaded(true);
@@ -515,8 +515,7 @@ export default function Neighborhoods() {
         .catch(err => console.error('Failed to load violations data:', err));
     }
     if (activeLayer === 'crimes' && !crimesLoaded) {
-      fetch('/crimes-data.json')
-        .then(res => res.json())
+      fetchLayer<CrimesData>('/crimes-data')
         .then((data: CrimesData) => {
           setCrimeBlocks(parseCrimesData(data));
           setCrimesLoaded(true);
@@ -524,8 +523,7 @@ export default function Neighborhoods() {
         .catch(err => console.error('Failed to load crimes data:', err));
     }
     if (activeLayer === 'crashes' && !crashesLoaded) {
-      fetch('/crashes-data.json')
-        .then(res => res.json())
+      fetchLayer<CrashesData>('/crashes-data')
         .then((data: CrashesData) => {
           setCrashBlocks(parseCrashesData(data));
           setCrashesLoaded(true);
@@ -533,8 +531,7 @@ export default function Neighborhoods() {
         .catch(err => console.error('Failed to load crashes data:', err));
     }
     if (activeLayer === '311' && !servicesLoaded) {
-      fetch('/311-data.json')
-        .then(res => res.json())
+      fetchLayer<ServiceRequestsData>('/311-data')
         .then((data: ServiceRequestsData) => {
           setServiceBlocks(parseServiceRequestsData(data));
           setServicesLoaded(true);
@@ -542,8 +539,7 @@ export default function Neighborhoods() {
         .catch(err => console.error('Failed to load 311 data:', err));
     }
     if (activeLayer === 'permits' && !permitsLoaded) {
-      fetch('/permits-data.json')
-        .then(res => res.json())
+      fetchLayer<PermitsData>('/permits-data')
         .then((data: PermitsData) => {
           setPermitBlocks(parsePermitsData(data));
           setPermitsLoaded(true);
@@ -551,8 +547,7 @@ export default function Neighborhoods() {
         .catch(err => console.error('Failed to load permits data:', err));
     }
     if (activeLayer === 'licenses' && !licensesLoaded) {
-      fetch('/licenses-data.json')
-        .then(res => res.json())
+      fetchLayer<LicensesData>('/licenses-data')
         .then((data: LicensesData) => {
           setLicenseBlocks(parseLicensesData(data));
           setLicensesLoaded(true);
@@ -560,8 +555,7 @@ export default function Neighborhoods() {
         .catch(err => console.error('Failed to load licenses data:', err));
     }
     if (activeLayer === 'potholes' && !potholesLoaded) {
-      fetch('/potholes-data.json')
-        .then(res => res.json())
+      fetchLayer<PotholesData>('/potholes-data')
         .then((data: PotholesData) => {
           setPotholeBlocks(parsePotholesData(data));
           setPotholesLoaded(true);
@@ -584,8 +578,7 @@ export default function Neighborhoods() {
     if (userLocation) {
       // Load all data sources in parallel when user searches
       if (!violationsLoaded) {
-        fetch('/violations-data.json')
-          .then(res => res.json())
+        fetchLayer<ViolationsData>('/violations-data')
           .then((data: ViolationsData) => {
             setViolationBlocks(parseViolationsData(data));
             setViolationsLoaded(true);
@@ -593,8 +586,7 @@ export default function Neighborhoods() {
           .catch(err => console.error('Failed to load violations data:', err));
       }
       if (!crimesLoaded) {
-        fetch('/crimes-data.json')
-          .then(res => res.json())
+        fetchLayer<CrimesData>('/crimes-data')
           .then((data: CrimesData) => {
             setCrimeBlocks(parseCrimesData(data));
             setCrimesLoaded(true);
@@ -602,8 +594,7 @@ export default function Neighborhoods() {
           .catch(err => console.error('Failed to load crimes data:', err));
       }
       if (!crashesLoaded) {
-        fetch('/crashes-data.json')
-          .then(res => res.json())
+        fetchLayer<CrashesData>('/crashes-data')
           .then((data: CrashesData) => {
             setCrashBlocks(parseCrashesData(data));
             setCrashesLoaded(true);
@@ -611,8 +602,7 @@ export default function Neighborhoods() {
           .catch(err => console.error('Failed to load crashes data:', err));
       }
       if (!servicesLoaded) {
-        fetch('/311-data.json')
-          .then(res => res.json())
+        fetchLayer<ServiceRequestsData>('/311-data')
           .then((data: ServiceRequestsData) => {
             setServiceBlocks(parseServiceRequestsData(data));
             setServicesLoaded(true);
@@ -620,8 +610,7 @@ export default function Neighborhoods() {
           .catch(err => console.error('Failed to load 311 data:', err));
       }
       if (!permitsLoaded) {
-        fetch('/permits-data.json')
-          .then(res => res.json())
+        fetchLayer<PermitsData>('/permits-data')
           .then((data: PermitsData) => {
             setPermitBlocks(parsePermitsData(data));
             setPermitsLoaded(true);
@@ -629,8 +618,7 @@ export default function Neighborhoods() {
           .catch(err => console.error('Failed to load permits data:', err));
       }
       if (!licensesLoaded) {
-        fetch('/licenses-data.json')
-          .then(res => res.json())
+        fetchLayer<LicensesData>('/licenses-data')
           .then((data: LicensesData) => {
             setLicenseBlocks(parseLicensesData(data));
             setLicensesLoaded(true);
@@ -638,8 +626,7 @@ export default function Neighborhoods() {
           .catch(err => console.error('Failed to load licenses data:', err));
       }
       if (!potholesLoaded) {
-        fetch('/potholes-data.json')
-          .then(res => res.json())
+        fetchLayer<PotholesData>('/potholes-data')
           .then((data: PotholesData) => {
             setPotholeBlocks(parsePotholesData(data));
             setPotholesLoaded(true);
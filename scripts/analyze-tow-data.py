@@ -2,14 +2,17 @@
 """
 Tow Data Analysis Script
 Part 1: Verify "93% within 15 minutes" claim from CPD FOIA data
-Part 2: Analyze OEMC dispatch data and cross-reference
+Part 2: Analyze OEMC dispatch data and cross-reference (match dispatches to tows)
 """
 
-import csv
-from datetime import datetime, timedelta
-from openpyxl import load_workbook
 import random
 from collections import defaultdict
+from itertools import islice
+
+from oemc_data import load_oemc
+from tow_data import FOIA_FILE, MISSING, OEMC_FILE, load_foia
+from tow_join import DEFAULT_AFTER_MIN, DEFAULT_BEFORE_MIN, LATENCY_FIELDS, latency_rows, match_dispatches
+from tow_stats import Distribution
 
 print("=" * 80)
 print("TOW DATA ANALYSIS")
@@ -23,26 +26,23 @@ print("\n" + "=" * 80)
 print("PART 1: CPD FOIA DATA ANALYSIS")
 print("=" * 80)
 
-xlsx_path = "/home/randy-vollrath/Downloads/25238_P150710_Towed_vehicles.xlsx"
+xlsx_path = FOIA_FILE
 print(f"\nLoading: {xlsx_path}")
 
-wb = load_workbook(xlsx_path, data_only=True)
-sheet = wb["Data"]
-
-# Get headers
-headers = []
-for cell in sheet[1]:
-    headers.append(cell.value)
+# Cached columnar copy of the "Data" sheet, dates already parsed
+foia = load_foia(xlsx_path)
+headers = foia.headers
 
 print(f"\nColumns found: {len(headers)}")
-print("Column G (index 6):", headers[6] if len(headers) > 6 else "NOT FOUND")
-print("Column Q (index 16):", headers[16] if len(headers) > 16 else "NOT FOUND")
 
-# Find column indices
-tow_date_idx = 6  # Column G
-record_created_idx = 16  # Column Q
+# Find column indices by name (Tow Date is column G, Date Tow Record Created column Q)
+tow_date_idx = headers.index("Tow Date")
+record_created_idx = headers.index("Date Tow Record Created")
 reason_idx = headers.index("Reason for Tow") if "Reason for Tow" in headers else None
 
+print(f"Tow Date column index: {tow_date_idx}")
+print(f"Date Tow Record Created column index: {record_created_idx}")
+
 print(f"\nReason for Tow column index: {reason_idx}")
 
 # Read all data
@@ -51,35 +51,17 @@ midnight_rows = []
 non_midnight_rows = []
 
 print("\nProcessing rows...")
-for row_idx, row in enumerate(sheet.iter_rows(min_row=2, values_only=True), start=2):
+for row_idx, row in enumerate(foia.rows(), start=foia.header_row + 1):
     if row_idx % 10000 == 0:
         print(f"  Processed {row_idx} rows...")
 
     tow_date = row[tow_date_idx]
     record_created = row[record_created_idx]
 
+    # Blank or unparseable dates come back as None
     if not tow_date or not record_created:
         continue
 
-    # Convert to datetime if needed
-    if isinstance(tow_date, str):
-        try:
-            tow_date = datetime.strptime(tow_date, "%Y-%m-%d %H:%M:%S")
-        except:
-            try:
-                tow_date = datetime.strptime(tow_date, "%m/%d/%Y %H:%M:%S")
-            except:
-                continue
-
-    if isinstance(record_created, str):
-        try:
-            record_created = datetime.strptime(record_created, "%Y-%m-%d %H:%M:%S")
-        except:
-            try:
-                record_created = datetime.strptime(record_created, "%m/%d/%Y %H:%M:%S")
-            except:
-                continue
-
     # Check if midnight (00:00:00)
     is_midnight = tow_date.hour == 0 and tow_date.minute == 0 and tow_date.second == 0
 
@@ -244,7 +226,7 @@ print("\n\n" + "=" * 80)
 print("PART 2: OEMC DISPATCH DATA ANALYSIS")
 print("=" * 80)
 
-csv_path = "/home/randy-vollrath/Downloads/FOIA_F261085_TOW_AUG_OCT_2025.csv"
+csv_path = OEMC_FILE
 print(f"\nLoading: {csv_path}")
 
 # First check what delimiter is used
@@ -252,28 +234,23 @@ with open(csv_path, 'r', encoding='utf-8-sig') as f:
     first_line = f.readline()
     print(f"\nFirst line raw: {repr(first_line[:200])}")
 
-# The file appears to use | as delimiter
-with open(csv_path, 'r', encoding='utf-8-sig') as f:
-    reader = csv.DictReader(f, delimiter='|')
-
-    # Get column names
-    columns = reader.fieldnames
-    print(f"\nColumns found ({len(columns)}):")
-    for i, col in enumerate(columns, 1):
-        print(f"  {i}. {col}")
-
-    # Read all rows
-    oemc_rows = [dict(row) for row in reader]
+# Delimiter and datetime columns/formats are detected once from a sample and
+# the datetime columns parsed in one pass (cached until the file changes)
+oemc = load_oemc(csv_path)
+columns = oemc.headers
+print(f"\nColumns found ({len(columns)}):")
+for i, col in enumerate(columns, 1):
+    print(f"  {i}. {col}")
 
-print(f"\nTotal rows: {len(oemc_rows)}")
+print(f"\nTotal rows: {len(oemc)}")
 
 # Print 10 sample rows
 print("\n10 Sample Rows:")
 print("-" * 80)
-for i, row in enumerate(oemc_rows[:10], 1):
+for i, row in enumerate(islice(oemc.rows(), 10), 1):
     print(f"\nRow {i}:")
-    for key, value in row.items():
-        if value and value.strip():
+    for key, value in zip(columns, row):
+        if value is not None and str(value).strip():
             print(f"  {key}: {value}")
 
 # Analyze datetime columns
@@ -290,31 +267,25 @@ for col in columns:
 print(f"\nPotential datetime columns: {datetime_cols}")
 
 for col in datetime_cols:
-    values = [row[col] for row in oemc_rows if row[col] and row[col].strip()]
-    if values:
-        print(f"\n{col}:")
-        print(f"  Sample values: {values[:3]}")
-        print(f"  Non-empty count: {len(values)}")
-
-        # Try to parse and get min/max
-        parsed_dates = []
-        for val in values:
-            try:
-                # Try common formats
-                for fmt in ["%Y-%m-%d %H:%M:%S", "%m/%d/%Y %H:%M:%S", "%Y-%m-%d", "%m/%d/%Y"]:
-                    try:
-                        dt = datetime.strptime(val, fmt)
-                        parsed_dates.append(dt)
-                        break
-                    except:
-                        continue
-            except:
-                pass
-
-        if parsed_dates:
-            print(f"  Min: {min(parsed_dates)}")
-            print(f"  Max: {max(parsed_dates)}")
-            print(f"  Successfully parsed: {len(parsed_dates)}/{len(values)}")
+    if col in oemc.formats:
+        parsed_dates = [dt for dt in oemc.datetimes(col) if dt is not None]
+        non_empty = len(parsed_dates) + oemc.unparsed[col]
+        if non_empty:
+            print(f"\n{col}:")
+            print(f"  Sample values: {[str(dt) for dt in parsed_dates[:3]]}")
+            print(f"  Non-empty count: {non_empty}")
+            print(f"  Format: {oemc.formats[col]}")
+            if parsed_dates:
+                print(f"  Min: {min(parsed_dates)}")
+                print(f"  Max: {max(parsed_dates)}")
+            print(f"  Successfully parsed: {len(parsed_dates)}/{non_empty}")
+    else:
+        values = [v for v in oemc.column(col) if v and v.strip()]
+        if values:
+            print(f"\n{col}:")
+            print(f"  Sample values: {values[:3]}")
+            print(f"  Non-empty count: {len(values)}")
+            print("  Not a datetime column (no format matched the sample)")
 
 # Check for cross-referenceable fields
 print("\n" + "-" * 80)
@@ -328,10 +299,35 @@ for col in columns:
     col_lower = col.lower()
     if any(word in col_lower for word in ['inventory', 'event', 'number', 'location', 'address', 'plate', 'license']):
         potential_match_fields.append(col)
-        sample_vals = [row[col] for row in oemc_rows[:10] if row[col] and row[col].strip()]
+        sample_vals = [str(v) for v in oemc.column(col)[:10] if v is not None and str(v).strip()]
         print(f"\n{col}:")
         print(f"  Sample values: {sample_vals[:5]}")
 
+# Join the two on place and time (sort-merge over hundred block + dispatch time)
+print("\n" + "-" * 80)
+print("DISPATCH TO TOW MATCHING")
+print("-" * 80)
+
+try:
+    matches, match_stats = match_dispatches(foia, oemc)
+except ValueError as e:
+    print(f"\n⚠ Could not match: {e}")
+    matches = {}
+else:
+    print(f"\nDispatch within {DEFAULT_BEFORE_MIN} min before to {DEFAULT_AFTER_MIN} min after the tow, "
+          f"same hundred block:")
+    for name, value in match_stats.items():
+        print(f"  {name}: {value}")
+
+if matches:
+    latencies = list(latency_rows(foia, oemc, matches))
+    print(f"\nLatencies for {len(latencies)} matched tows (minutes):")
+    for field in LATENCY_FIELDS:
+        latency_dist = Distribution(row[field] for row in latencies if row[field] is not None)
+        if latency_dist:
+            p25, p50, p75 = latency_dist.percentiles([25, 50, 75])
+            print(f"  {field:25} P25 {p25:7.1f}  Median {p50:7.1f}  P75 {p75:7.1f}  (n={len(latency_dist)})")
+
 # Calculate dispatch to completion duration if applicable
 print("\n" + "-" * 80)
 print("DISPATCH TO COMPLETION DURATION")
@@ -351,67 +347,34 @@ for col in columns:
 print(f"\nDispatch column: {dispatch_col}")
 print(f"Completion column: {completion_col}")
 
-if dispatch_col and completion_col:
-    durations = []
-
-    for row in oemc_rows:
-        dispatch_val = row.get(dispatch_col, '').strip()
-        completion_val = row.get(completion_col, '').strip()
-
-        if not dispatch_val or not completion_val:
-            continue
-
-        try:
-            for fmt in ["%Y-%m-%d %H:%M:%S", "%m/%d/%Y %H:%M:%S", "%Y-%m-%d", "%m/%d/%Y"]:
-                try:
-                    dispatch_dt = datetime.strptime(dispatch_val, fmt)
-                    completion_dt = datetime.strptime(completion_val, fmt)
-                    duration = completion_dt - dispatch_dt
-                    durations.append(duration.total_seconds() / 60)  # minutes
-                    break
-                except:
-                    continue
-        except:
-            pass
+if dispatch_col in oemc.formats and completion_col in oemc.formats:
+    # Straight from the parsed microsecond columns, in minutes
+    durations = [
+        (completion - dispatch) / 60e6
+        for dispatch, completion in zip(oemc.micros(dispatch_col), oemc.micros(completion_col))
+        if dispatch != MISSING and completion != MISSING
+    ]
 
     if durations:
         print(f"\nDuration statistics (n={len(durations)}):")
-        durations.sort()
-        print(f"  Min: {min(durations):.1f} minutes")
-        print(f"  Max: {max(durations):.1f} minutes")
-        print(f"  Median: {durations[len(durations)//2]:.1f} minutes")
-        print(f"  Mean: {sum(durations)/len(durations):.1f} minutes")
-
-        # Distribution
-        duration_buckets = {
-            '0-15min': 0,
-            '15-30min': 0,
-            '30-60min': 0,
-            '1-2h': 0,
-            '2-4h': 0,
-            '4h+': 0
-        }
-
-        for d in durations:
-            if d < 15:
-                duration_buckets['0-15min'] += 1
-            elif d < 30:
-                duration_buckets['15-30min'] += 1
-            elif d < 60:
-                duration_buckets['30-60min'] += 1
-            elif d < 120:
-                duration_buckets['1-2h'] += 1
-            elif d < 240:
-                duration_buckets['2-4h'] += 1
-            else:
-                duration_buckets['4h+'] += 1
+        duration_dist = Distribution(durations)
+        print(f"  Min: {duration_dist.min:.1f} minutes")
+        print(f"  Max: {duration_dist.max:.1f} minutes")
+        print(f"  Median: {duration_dist.percentile(50, method='lower'):.1f} minutes")
+        print(f"  Mean: {duration_dist.mean:.1f} minutes")
+
+        # Distribution (buckets split at 15, 30, 60, 120 and 240 minutes)
+        duration_buckets = dict(zip(
+            ['0-15min', '15-30min', '30-60min', '1-2h', '2-4h', '4h+'],
+            duration_dist.histogram([15, 30, 60, 120, 240])
+        ))
 
         print("\n  Distribution:")
         for bucket, count in duration_buckets.items():
             pct = count * 100 / len(durations)
             print(f"    {bucket:12} {count:6} ({pct:5.2f}%)")
 else:
-    print("\n⚠ Could not find both dispatch and completion columns")
+    print("\n⚠ Could not find both dispatch and completion datetime columns")
 
 print("\n" + "=" * 80)
 print("ANALYSIS COMPLETE")
@@ -4,16 +4,17 @@ Cross-reference FOIA towed vehicle data with Chicago Data Portal
 to determine the time gap between actual tow and portal publication.
 """
 
-import openpyxl
-import requests
 import pandas as pd
 from datetime import datetime, timedelta
 from collections import Counter, defaultdict
 import json
 
+from tow_data import FOIA_FILE, join_on_inventory, load_foia, parse_datetime_column, print_join_stats
+from tow_portal import PORTAL_URL, TOWED_DATASET, fetch_towed_vehicles
+
 # File paths
-FOIA_FILE = "/home/randy-vollrath/Downloads/25238_P150710_Towed_vehicles.xlsx"
-PORTAL_API = "https://data.cityofchicago.org/resource/ygr5-vcbg.json"
+# CHICAGO_PORTAL_URL can point at scripts/portal-standin-server.py for offline runs
+PORTAL_API = f"{PORTAL_URL}/resource/{TOWED_DATASET}.json"
 
 print("="*80)
 print("TOWED VEHICLE PORTAL DELAY ANALYSIS")
@@ -22,23 +23,15 @@ print()
 
 # Step 1: Load FOIA data
 print("Step 1: Loading FOIA dataset...")
-wb = openpyxl.load_workbook(FOIA_FILE, read_only=True)
-sheet = wb["Data"]
-
-# Read headers
-headers = [cell.value for cell in next(sheet.iter_rows(min_row=1, max_row=1))]
+foia = load_foia(FOIA_FILE)
+headers = foia.headers
 print(f"FOIA columns: {headers}")
 print()
 
-# Load all rows into a list
-foia_rows = []
-for row in sheet.iter_rows(min_row=2, values_only=True):
-    foia_rows.append(row)
+print(f"Total FOIA records: {len(foia):,}")
 
-print(f"Total FOIA records: {len(foia_rows):,}")
-
-# Create DataFrame
-foia_df = pd.DataFrame(foia_rows, columns=headers)
+# Create DataFrame (date columns come back as datetime64)
+foia_df = foia.to_dataframe()
 
 # Check for plate column and sample values
 plate_columns = [col for col in headers if 'plate' in col.lower() or 'license' in col.lower()]
@@ -72,22 +65,8 @@ foia_df = foia_df[foia_df[inv_col].notna()].copy()
 print(f"\nFOIA records with inventory numbers: {len(foia_df):,}")
 
 # Parse dates
-def safe_parse_date(val):
-    if pd.isna(val):
-        return None
-    if isinstance(val, datetime):
-        return val
-    if isinstance(val, str):
-        # Try various formats
-        for fmt in ["%Y-%m-%d %H:%M:%S", "%m/%d/%Y %H:%M:%S", "%Y-%m-%d", "%m/%d/%Y"]:
-            try:
-                return datetime.strptime(val, fmt)
-            except:
-                continue
-    return None
-
-foia_df['tow_date_parsed'] = foia_df[tow_date_col].apply(safe_parse_date)
-foia_df['created_date_parsed'] = foia_df[created_col].apply(safe_parse_date) if created_col else None
+foia_df['tow_date_parsed'] = parse_datetime_column(foia_df[tow_date_col])
+foia_df['created_date_parsed'] = parse_datetime_column(foia_df[created_col]) if created_col else None
 
 print(f"Successfully parsed tow dates: {foia_df['tow_date_parsed'].notna().sum():,}")
 if created_col:
@@ -106,38 +85,13 @@ print("="*80)
 print("\nStep 2: Fetching Chicago Data Portal data...")
 print(f"API: {PORTAL_API}")
 
-portal_records = []
-offset = 0
-batch_size = 50000
-
-while True:
-    url = f"{PORTAL_API}?$limit={batch_size}&$offset={offset}&$order=tow_date DESC"
-    print(f"  Fetching offset {offset}...")
-
-    try:
-        response = requests.get(url, timeout=60)
-        response.raise_for_status()
-        batch = response.json()
-
-        if not batch:
-            break
-
-        portal_records.extend(batch)
-        print(f"    Got {len(batch)} records (total: {len(portal_records):,})")
-
-        if len(batch) < batch_size:
-            break
-
-        offset += batch_size
-
-        # Safety limit
-        if len(portal_records) >= 200000:
-            print("    Reached 200k records, stopping.")
-            break
-
-    except Exception as e:
-        print(f"    Error: {e}")
-        break
+# tow_date ranges fetched in parallel (and cached once settled), so the
+# full history loads without the old $offset paging and 200k cap
+try:
+    portal_records = fetch_towed_vehicles()
+except Exception as e:
+    print(f"    Error: {e}")
+    exit(1)
 
 print(f"\nTotal Portal records fetched: {len(portal_records):,}")
 
@@ -162,48 +116,33 @@ print("="*80)
 # Step 3: Match records
 print("\nStep 3: Matching records by inventory_number...")
 
-# Create lookup dictionaries
-foia_by_inv = {}
-for idx, row in foia_df.iterrows():
-    inv = str(row[inv_col]).strip()
-    if inv and inv != 'nan':
-        foia_by_inv[inv] = row
-
-portal_by_inv = {}
-for idx, row in portal_df.iterrows():
-    inv = str(row.get('inventory_number', '')).strip()
-    if inv and inv != 'nan':
-        portal_by_inv[inv] = row
-
-print(f"FOIA unique inventory numbers: {len(foia_by_inv):,}")
-print(f"Portal unique inventory numbers: {len(portal_by_inv):,}")
-
-# Find matches
-matched = []
-for inv, foia_row in foia_by_inv.items():
-    if inv in portal_by_inv:
-        portal_row = portal_by_inv[inv]
-        matched.append({
-            'inventory_number': inv,
-            'foia_tow_date': foia_row['tow_date_parsed'],
-            'foia_created_date': foia_row.get('created_date_parsed'),
-            'portal_tow_date': portal_row.get('portal_tow_date_parsed'),
-            'foia_make': foia_row.get(make_col),
-            'portal_make': portal_row.get('make'),
-            'foia_color': foia_row.get(color_col),
-            'portal_color': portal_row.get('color'),
-            'pound': foia_row.get(pound_col),
-        })
-
-print(f"\nMatched records: {len(matched):,}")
-print(f"Match rate: {len(matched)/len(foia_by_inv)*100:.1f}% of FOIA records")
-print(f"Match rate: {len(matched)/len(portal_by_inv)*100:.1f}% of Portal records")
-
-if not matched:
+# One merge on normalized inventory numbers (a repeated number uses its last row)
+joined, join_stats = join_on_inventory(foia_df, portal_df, inv_col, 'inventory_number',
+                                       suffixes=('', '_portal'))
+
+print(f"FOIA unique inventory numbers: {join_stats['left_keys']:,}")
+print(f"Portal unique inventory numbers: {join_stats['right_keys']:,}")
+print_join_stats(join_stats, 'FOIA', 'Portal')
+
+print(f"\nMatched records: {join_stats['matched']:,}")
+print(f"Match rate: {join_stats['left_match_rate']*100:.1f}% of FOIA records")
+print(f"Match rate: {join_stats['right_match_rate']*100:.1f}% of Portal records")
+
+if not join_stats['matched']:
     print("\nNo matches found! Cannot continue analysis.")
     exit(1)
 
-matched_df = pd.DataFrame(matched)
+matched_df = pd.DataFrame({
+    'inventory_number': joined['inventory_number'],
+    'foia_tow_date': joined['tow_date_parsed'],
+    'foia_created_date': joined.get('created_date_parsed'),
+    'portal_tow_date': joined.get('portal_tow_date_parsed'),
+    'foia_make': joined.get(make_col),
+    'portal_make': joined.get('make'),
+    'foia_color': joined.get(color_col),
+    'portal_color': joined.get('color'),
+    'pound': joined.get(pound_col),
+})
 
 # Filter to records with all dates
 complete = matched_df[
@@ -363,8 +302,13 @@ results = {
     'summary': {
         'foia_records': len(foia_df),
         'portal_records': len(portal_df),
-        'matched_records': len(matched),
-        'match_rate_pct': len(matched)/len(foia_by_inv)*100,
+        'matched_records': join_stats['matched'],
+        'match_rate_pct': join_stats['left_match_rate']*100,
+        'portal_match_rate_pct': join_stats['right_match_rate']*100,
+        'duplicate_inventory_numbers': {
+            'foia': join_stats['left_duplicates']['keys'],
+            'portal': join_stats['right_duplicates']['keys'],
+        },
         'complete_date_records': len(complete)
     },
     'portal_vs_tow_delay_hours': {
@@ -8,22 +8,9 @@ within various time windows after the actual tow event.
 import sys
 from datetime import datetime, timedelta
 from collections import defaultdict
-from openpyxl import load_workbook
-
-def parse_datetime(cell_value):
-    """Parse datetime from Excel cell value."""
-    if cell_value is None:
-        return None
-    if isinstance(cell_value, datetime):
-        return cell_value
-    if isinstance(cell_value, str):
-        # Try common formats
-        for fmt in ['%m/%d/%Y %H:%M', '%Y-%m-%d %H:%M:%S', '%m/%d/%Y %I:%M:%S %p']:
-            try:
-                return datetime.strptime(cell_value.strip(), fmt)
-            except ValueError:
-                continue
-    return None
+
+from tow_data import FOIA_FILE, load_foia
+from tow_stats import Distribution
 
 def format_timedelta(td):
     """Format timedelta as human-readable string."""
@@ -40,24 +27,17 @@ def get_hour_bucket(dt):
     return dt.hour
 
 def main():
-    xlsx_path = '/home/randy-vollrath/Downloads/25238_P150710_Towed_vehicles.xlsx'
+    xlsx_path = FOIA_FILE
 
     print("Loading Excel file...")
-    wb = load_workbook(xlsx_path, read_only=True, data_only=True)
-    sheet = wb['Data']
-
-    # Find header row and column indices
-    headers = None
-    header_row_idx = None
-    for idx, row in enumerate(sheet.iter_rows(min_row=1, max_row=10, values_only=True), start=1):
-        if 'Tow Date' in row:
-            headers = row
-            header_row_idx = idx
-            break
-
-    if not headers:
-        print("ERROR: Could not find header row with 'Tow Date'")
+    # The loader finds the 'Tow Date' header row and parses the date columns
+    try:
+        foia = load_foia(xlsx_path)
+    except ValueError as e:
+        print(f"ERROR: {e}")
         sys.exit(1)
+    headers = foia.headers
+    header_row_idx = foia.header_row
 
     tow_date_col = None
     record_created_col = None
@@ -88,13 +68,10 @@ def main():
     skipped_outlier = 0
 
     print("\nParsing data rows...")
-    for row in sheet.iter_rows(min_row=header_row_idx + 1, values_only=True):
-        if len(row) <= max(tow_date_col, record_created_col):
-            continue
-
-        tow_date = parse_datetime(row[tow_date_col])
-        record_created = parse_datetime(row[record_created_col])
-        tow_reason = row[tow_reason_col] if tow_reason_col is not None and len(row) > tow_reason_col else None
+    for row in foia.rows():
+        tow_date = row[tow_date_col]
+        record_created = row[record_created_col]
+        tow_reason = row[tow_reason_col] if tow_reason_col is not None else None
 
         if not tow_date or not record_created:
             skipped_no_dates += 1
@@ -116,8 +93,6 @@ def main():
         delays.append(delay_seconds)
         delays_with_metadata.append((delay_seconds, tow_date, tow_reason))
 
-    wb.close()
-
     if not delays:
         print("ERROR: No valid data found")
         sys.exit(1)
@@ -129,18 +104,10 @@ def main():
     print(f"  Skipped (negative delay): {skipped_negative:,}")
     print(f"  Skipped (>72h outlier): {skipped_outlier:,}")
 
-    # Sort delays for percentile calculations
-    delays_sorted = sorted(delays)
-
-    # Calculate percentiles
-    def percentile(data, pct):
-        idx = int(len(data) * pct)
-        return data[min(idx, len(data) - 1)]
+    # Sorted once; percentiles index into it, window counts bisect it
+    delay_dist = Distribution(delays)
 
-    median = percentile(delays_sorted, 0.5)
-    p75 = percentile(delays_sorted, 0.75)
-    p90 = percentile(delays_sorted, 0.90)
-    p95 = percentile(delays_sorted, 0.95)
+    median, p75, p90, p95 = delay_dist.percentiles([50, 75, 90, 95], method='lower')
 
     print(f"\nOverall statistics:")
     print(f"  Median delay: {format_timedelta(timedelta(seconds=median))}")
@@ -168,7 +135,7 @@ def main():
     ]
 
     for window_seconds, window_label in windows:
-        count = sum(1 for d in delays if d <= window_seconds)
+        count = delay_dist.count_at_most(window_seconds)
         pct = (count / total_records) * 100
         print(f"  Within {window_label:12s}: {count:6,} / {total_records:,} ({pct:5.1f}%)")
 
@@ -190,7 +157,7 @@ def main():
 
     for notif_window, notif_label, record_threshold in notification_windows:
         # Count records created within threshold (leaving room for sync delay)
-        count = sum(1 for d in delays if d <= record_threshold)
+        count = delay_dist.count_at_most(record_threshold)
         pct = (count / total_records) * 100
         print(f"  Notified within {notif_label:8s}: {count:6,} / {total_records:,} ({pct:5.1f}%)")
 
@@ -211,12 +178,10 @@ def main():
         if hour not in hourly_delays:
             continue
 
-        hour_data = sorted(hourly_delays[hour])
+        hour_data = Distribution(hourly_delays[hour])
         count = len(hour_data)
-        median_sec = percentile(hour_data, 0.5)
-        within_2h = sum(1 for d in hour_data if d <= 2 * 3600)
-        within_4h = sum(1 for d in hour_data if d <= 4 * 3600)
-        within_6h = sum(1 for d in hour_data if d <= 6 * 3600)
+        median_sec = hour_data.percentile(50, method='lower')
+        within_2h, within_4h, within_6h = (hour_data.count_at_most(h * 3600) for h in (2, 4, 6))
 
         pct_2h = (within_2h / count) * 100
         pct_4h = (within_4h / count) * 100
@@ -246,9 +211,9 @@ def main():
 
         for reason, reason_data in reasons_by_volume[:10]:
             count = len(reason_data)
-            reason_sorted = sorted(reason_data)
-            median_sec = percentile(reason_sorted, 0.5)
-            within_4h = sum(1 for d in reason_data if d <= 4 * 3600)
+            reason_dist = Distribution(reason_data)
+            median_sec = reason_dist.percentile(50, method='lower')
+            within_4h = reason_dist.count_at_most(4 * 3600)
             pct_4h = (within_4h / count) * 100
 
             reason_truncated = reason[:38] if len(reason) > 38 else reason
@@ -11,25 +11,8 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from collections import Counter, defaultdict
 
-try:
-    from openpyxl import load_workbook
-except ImportError:
-    print("ERROR: openpyxl not installed. Run: pip3 install openpyxl")
-    sys.exit(1)
-
-
-def parse_excel_datetime(val):
-    """Parse Excel datetime value (either datetime object or string)."""
-    if isinstance(val, datetime):
-        return val
-    if isinstance(val, str):
-        # Try common formats
-        for fmt in ['%Y-%m-%d %H:%M:%S', '%m/%d/%Y %H:%M:%S', '%Y-%m-%d', '%m/%d/%Y']:
-            try:
-                return datetime.strptime(val, fmt)
-            except ValueError:
-                continue
-    return None
+from tow_data import FOIA_FILE, load_foia
+from tow_stats import Distribution
 
 
 def format_timedelta(td):
@@ -43,43 +26,17 @@ def format_timedelta(td):
         return f"{minutes}m"
 
 
-def percentile(data, p):
-    """Calculate percentile of sorted data."""
-    if not data:
-        return None
-    k = (len(data) - 1) * (p / 100.0)
-    f = int(k)
-    c = f + 1
-    if c >= len(data):
-        return data[-1]
-    d0 = data[f]
-    d1 = data[c]
-    return d0 + (d1 - d0) * (k - f)
-
-
 def main():
-    xlsx_path = Path("/home/randy-vollrath/Downloads/25238_P150710_Towed_vehicles.xlsx")
+    xlsx_path = Path(FOIA_FILE)
 
     if not xlsx_path.exists():
         print(f"ERROR: File not found: {xlsx_path}")
         sys.exit(1)
 
     print("Loading workbook...")
-    wb = load_workbook(xlsx_path, read_only=True, data_only=True)
-    ws = wb["Data"]
-
-    # Find header row and column indices
-    headers = {}
-    for row in ws.iter_rows(min_row=1, max_row=10, values_only=True):
-        if row[6] and "Tow Date" in str(row[6]):  # Column G
-            for idx, val in enumerate(row):
-                if val:
-                    headers[str(val).strip()] = idx
-            break
-
-    if not headers:
-        print("ERROR: Could not find header row")
-        sys.exit(1)
+    # Header row detection and date parsing happen once, in the cached loader
+    foia = load_foia(str(xlsx_path))
+    headers = {name: idx for idx, name in enumerate(foia.headers)}
 
     print(f"Found headers: {list(headers.keys())}")
 
@@ -108,11 +65,11 @@ def main():
     negative_delays = 0
     extreme_outliers = 0
 
-    for row in ws.iter_rows(min_row=2, values_only=True):
+    for row in foia.rows():
         total_rows += 1
 
-        tow_date = parse_excel_datetime(row[tow_date_col])
-        record_date = parse_excel_datetime(row[record_created_col])
+        tow_date = row[tow_date_col]
+        record_date = row[record_created_col]
 
         if not tow_date or not record_date:
             continue
@@ -163,23 +120,20 @@ def main():
     print("PART 1: NON-MIDNIGHT RECORDS (Real Timestamps from CPD)")
     print("="*80)
 
+    # Delays in seconds, sorted once; every percentile and threshold below reads from it
+    delay_dist = Distribution(non_midnight_delays)
+
     if non_midnight_delays:
-        non_midnight_delays_sorted = sorted(non_midnight_delays, key=lambda x: x.total_seconds())
-        count = len(non_midnight_delays_sorted)
+        count = len(delay_dist)
         pct = (count / valid_pairs * 100) if valid_pairs > 0 else 0
 
         print(f"\nCount: {count:,} records ({pct:.1f}% of valid pairs)")
 
         print("\nCPD Record Creation Delay Distribution:")
-        print(f"  Min:    {format_timedelta(non_midnight_delays_sorted[0])}")
-        print(f"  P10:    {format_timedelta(timedelta(seconds=percentile([d.total_seconds() for d in non_midnight_delays_sorted], 10)))}")
-        print(f"  P25:    {format_timedelta(timedelta(seconds=percentile([d.total_seconds() for d in non_midnight_delays_sorted], 25)))}")
-        print(f"  Median: {format_timedelta(timedelta(seconds=percentile([d.total_seconds() for d in non_midnight_delays_sorted], 50)))}")
-        print(f"  P75:    {format_timedelta(timedelta(seconds=percentile([d.total_seconds() for d in non_midnight_delays_sorted], 75)))}")
-        print(f"  P90:    {format_timedelta(timedelta(seconds=percentile([d.total_seconds() for d in non_midnight_delays_sorted], 90)))}")
-        print(f"  P95:    {format_timedelta(timedelta(seconds=percentile([d.total_seconds() for d in non_midnight_delays_sorted], 95)))}")
-        print(f"  P99:    {format_timedelta(timedelta(seconds=percentile([d.total_seconds() for d in non_midnight_delays_sorted], 99)))}")
-        print(f"  Max:    {format_timedelta(non_midnight_delays_sorted[-1])}")
+        print(f"  Min:    {format_timedelta(timedelta(seconds=delay_dist.min))}")
+        for label, p in [("P10", 10), ("P25", 25), ("Median", 50), ("P75", 75), ("P90", 90), ("P95", 95), ("P99", 99)]:
+            print(f"  {label + ':':7s} {format_timedelta(timedelta(seconds=delay_dist.percentile(p)))}")
+        print(f"  Max:    {format_timedelta(timedelta(seconds=delay_dist.max))}")
 
         # Percentages within time windows
         print("\n% of records created within:")
@@ -187,7 +141,7 @@ def main():
         labels = ["15 min", "30 min", "1 hour", "2 hours", "3 hours", "4 hours", "6 hours", "8 hours", "12 hours", "24 hours"]
 
         for threshold, label in zip(thresholds, labels):
-            within = sum(1 for d in non_midnight_delays_sorted if d.total_seconds() <= threshold)
+            within = delay_dist.count_at_most(threshold)
             pct = (within / count * 100)
             print(f"  {label:10s}: {pct:5.1f}%  ({within:,} records)")
 
@@ -198,7 +152,7 @@ def main():
         notification_labels = ["1 hour", "2 hours", "3 hours", "4 hours", "6 hours"]
 
         for threshold, label in zip(notification_thresholds, notification_labels):
-            within = sum(1 for d in non_midnight_delays_sorted if d.total_seconds() + SYNC_DELAY <= threshold)
+            within = delay_dist.count_at_most(threshold - SYNC_DELAY)
             pct = (within / count * 100)
             print(f"  {label:10s}: {pct:5.1f}%  ({within:,} users)")
 
@@ -244,11 +198,10 @@ def main():
 
         # Average/median time-of-day
         # Convert times to minutes since midnight for stats
-        minutes_since_midnight = [t.hour * 60 + t.minute for t in midnight_record_creation_times]
-        minutes_since_midnight.sort()
+        minutes_since_midnight = Distribution(t.hour * 60 + t.minute for t in midnight_record_creation_times)
 
-        avg_minutes = sum(minutes_since_midnight) / len(minutes_since_midnight)
-        median_minutes = percentile(minutes_since_midnight, 50)
+        avg_minutes = minutes_since_midnight.mean
+        median_minutes = minutes_since_midnight.percentile(50)
 
         avg_hour = int(avg_minutes // 60)
         avg_min = int(avg_minutes % 60)
@@ -277,12 +230,9 @@ def main():
             if speculative_delay.total_seconds() >= 0:  # Only positive delays
                 speculative_delays.append(speculative_delay)
 
-        speculative_delays.sort(key=lambda x: x.total_seconds())
-
         if speculative_delays:
-            spec_median = timedelta(seconds=percentile([d.total_seconds() for d in speculative_delays], 50))
-            spec_p25 = timedelta(seconds=percentile([d.total_seconds() for d in speculative_delays], 25))
-            spec_p75 = timedelta(seconds=percentile([d.total_seconds() for d in speculative_delays], 75))
+            spec_p25, spec_median, spec_p75 = (
+                timedelta(seconds=s) for s in Distribution(speculative_delays).percentiles([25, 50, 75]))
 
             print(f"\nAssuming tow at noon on the date-stamped day:")
             print(f"  P25 delay:    {format_timedelta(spec_p25)}")
@@ -308,10 +258,7 @@ def main():
 
     if non_midnight_delays:
         # Use non-midnight data as ground truth for CPD speed
-        delays_sorted = sorted(non_midnight_delays, key=lambda x: x.total_seconds())
-        cpd_p50 = timedelta(seconds=percentile([d.total_seconds() for d in delays_sorted], 50))
-        cpd_p25 = timedelta(seconds=percentile([d.total_seconds() for d in delays_sorted], 25))
-        cpd_p75 = timedelta(seconds=percentile([d.total_seconds() for d in delays_sorted], 75))
+        cpd_p25, cpd_p50, cpd_p75 = (timedelta(seconds=s) for s in delay_dist.percentiles([25, 50, 75]))
 
         print("\nCPD Record Entry Speed (from non-midnight data):")
         print(f"  Fast (P25):   {format_timedelta(cpd_p25)}")
@@ -377,12 +324,11 @@ def main():
 
     if non_midnight_delays:
         # Calculate key stats
-        delays_sorted = sorted(non_midnight_delays, key=lambda x: x.total_seconds())
-        within_2h = sum(1 for d in delays_sorted if d.total_seconds() + 30*60 <= 2*3600)
-        pct_2h = (within_2h / len(delays_sorted) * 100)
+        within_2h = delay_dist.count_at_most(2*3600 - 30*60)
+        pct_2h = (within_2h / len(delay_dist) * 100)
 
-        within_4h = sum(1 for d in delays_sorted if d.total_seconds() + 30*60 <= 4*3600)
-        pct_4h = (within_4h / len(delays_sorted) * 100)
+        within_4h = delay_dist.count_at_most(4*3600 - 30*60)
+        pct_4h = (within_4h / len(delay_dist) * 100)
 
         median_notify = cpd_p50.total_seconds() / 60 + 30 + 15  # CPD + sync + portal
 
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Run any selection of the tow analyses in one pass over the data.
+
+Loads the FOIA workbook and the OEMC dispatch export (both cached, see
+tow_data.py and oemc_data.py) and the portal towed-vehicles dataset once
+each, and only when a selected report reads them. Every report
+(tow_reports.py) is fed each row in the same pass. Prints the reports and writes all results to one JSON file.
+
+Reports:
+  record-lag     CPD record creation lag for non-midnight tow timestamps,
+                 with the end-to-end notification estimate
+  midnight       creation times and inferred delays for midnight-stamped tows
+  notification   record availability by window, tow hour and tow reason
+  portal-delay   portal tow_date vs FOIA dates (fetches the portal dataset)
+  dispatch       OEMC call-to-dispatch and dispatch-to-close durations
+  dispatch-latency
+                 call, dispatch, tow and record latencies for tows matched
+                 to OEMC dispatches by place and time (tow_join.py)
+
+USAGE:
+  python3 scripts/analyze-tow.py                          # all reports
+  python3 scripts/analyze-tow.py record-lag notification  # just these
+  python3 scripts/analyze-tow.py --json out.json --refresh
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+
+from oemc_data import load_oemc
+from tow_data import FOIA_FILE, OEMC_FILE, load_foia
+from tow_portal import fetch_towed_vehicles
+from tow_reports import REPORTS, portal_tow_dates, print_results, run_reports
+
+DEFAULT_JSON = 'tow-analysis.json'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='One-pass tow analyses')
+    parser.add_argument('reports', nargs='*', metavar='REPORT',
+                        help=f"Reports to run (default: all): {', '.join(REPORTS)}")
+    parser.add_argument('--json', default=DEFAULT_JSON, help=f'Results file (default: {DEFAULT_JSON})')
+    parser.add_argument('--foia', default=FOIA_FILE, help='FOIA towed vehicles workbook')
+    parser.add_argument('--oemc', default=OEMC_FILE, help='OEMC dispatch export (pipe-delimited)')
+    parser.add_argument('--refresh', action='store_true', help='Rebuild the FOIA/OEMC caches and refetch the portal')
+    args = parser.parse_args()
+
+    unknown = [name for name in args.reports if name not in REPORTS]
+    if unknown:
+        parser.error(f"unknown report(s) {', '.join(unknown)}; choose from {', '.join(REPORTS)}")
+    reports = [REPORTS[name]() for name in (args.reports or REPORTS)]
+    needed = {source for report in reports for source in report.sources}
+
+    started = time.time()
+    skipped = {}
+    sources = {}
+
+    def drop(source, reason):
+        print(f"  Skipping reports that need {source}: {reason}")
+        for report in [r for r in reports if source in r.sources]:
+            skipped[report.name] = reason
+            reports.remove(report)
+
+    foia = None
+    if 'foia' in needed:
+        print(f"Loading FOIA workbook: {args.foia}")
+        try:
+            foia = load_foia(args.foia, refresh=args.refresh)
+            sources['foia'] = {'path': args.foia, 'rows': len(foia)}
+            print(f"  {len(foia):,} rows")
+        except (OSError, ValueError) as e:
+            drop('foia', str(e))
+
+    portal = None
+    if 'portal' in needed and reports:
+        print("Fetching portal towed vehicles...")
+        try:
+            portal = portal_tow_dates(fetch_towed_vehicles(refresh=args.refresh))
+            sources['portal'] = {'inventory_numbers': len(portal)}
+        except (OSError, ValueError) as e:
+            drop('portal', str(e))
+
+    oemc = None
+    if 'oemc' in needed:
+        print(f"Loading OEMC dispatch export: {args.oemc}")
+        try:
+            oemc = load_oemc(args.oemc, refresh=args.refresh)
+            sources['oemc'] = {'path': args.oemc, 'rows': len(oemc)}
+            print(f"  {len(oemc):,} rows")
+        except (OSError, ValueError) as e:
+            drop('oemc', str(e))
+
+    if not reports:
+        print("ERROR: no report could run")
+        sys.exit(1)
+
+    print(f"Running {', '.join(r.name for r in reports)}...")
+    results = run_reports(reports, foia=foia, portal=portal, oemc=oemc)
+    print_results(reports, results)
+
+    output = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'sources': sources,
+        'reports': results,
+        'skipped': skipped,
+    }
+    with open(args.json, 'w') as f:
+        json.dump(output, f, indent=2, default=str)
+
+    print("\n" + "=" * 80)
+    print(f"Results saved to: {args.json} ({time.time() - started:.1f}s)")
+    print("=" * 80)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Array-based block aggregation for the neighborhood layers (requires numpy).
+
+Rows are read in chunks and transposed into columns. Each chunk is turned
+into a cell id array (grid.py packing), category ids and numeric arrays.
+These are then folded into dense per-cell counters with bincount, instead of
+updating one dict per row.
+
+BlockAggregator.blocks() returns the same {cell: block} table as the per-row
+loops: same counts, categories in first-seen order, and first non-empty
+ward/address. The existing output code can turn it into
+[lat, lng, count, score, {cats}, ...] rows unchanged.
+
+String columns with few distinct values (types, flags, dates) are decoded
+once per distinct value with map_distinct() rather than once per row.
+Parsing strings with numpy's own astype() turned out slower than float(),
+so coordinates still go through float() in a list comprehension.
+"""
+
+from itertools import islice
+
+import numpy as np
+
+from grid import BLOCK_SIZE, COL_OFFSET, ROW_OFFSET
+
+CHUNK_ROWS = 100000
+
+# Sentinel for "category not seen yet in this cell"
+_UNSEEN = np.iinfo(np.int64).max
+
+
+def iter_column_chunks(rows, chunk_rows=CHUNK_ROWS, progress_every=0):
+    """
+    Group row tuples into chunks and yield (n_rows, columns), one tuple
+    of strings per column.
+    """
+    row_count = 0
+    while True:
+        chunk = list(islice(rows, chunk_rows))
+        if not chunk:
+            return
+        before = row_count
+        row_count += len(chunk)
+        if progress_every and row_count // progress_every != before // progress_every:
+            print(f"  Processed {row_count // progress_every * progress_every:,} rows...")
+        yield len(chunk), tuple(zip(*chunk))
+
+
+def map_distinct(values, fn, dtype):
+    """Apply fn once per distinct value in values; return an array of results."""
+    if isinstance(values, np.ndarray):
+        values = values.tolist()
+    results = {value: fn(value) for value in set(values)}
+    return np.fromiter(map(results.__getitem__, values), dtype, len(values))
+
+
+def select(values, mask):
+    """Return the entries of a column (tuple of str) where mask is set."""
+    return np.array(values, dtype=object)[mask]
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except ValueError:
+        return np.nan
+
+
+def parse_floats(values):
+    """Parse a string column as float64; empty or unparseable values become NaN."""
+    try:
+        return np.array([float(v) if v else np.nan for v in values], dtype=np.float64)
+    except ValueError:
+        return np.fromiter(map(_to_float, values), np.float64, len(values))
+
+
+def in_chicago(lat, lng):
+    """Same bounding box test the per-row processors use; NaN is outside."""
+    return (lat > 41.6) & (lat < 42.1) & (lng > -88.0) & (lng < -87.5)
+
+
+def cell_ids(lat, lng, size=BLOCK_SIZE):
+    """Vectorized grid.cell_id(). np.rint rounds half to even like round()."""
+    rows = np.rint(lat / size).astype(np.int64) + ROW_OFFSET
+    cols = np.rint(lng / size).astype(np.int64) + COL_OFFSET
+    return (rows << 32) | cols
+
+
+class BlockAggregator:
+    """
+    Accumulate per-cell counters from chunks of column arrays.
+
+    categories:   category names, indexed by the category ids passed to add()
+    sum_fields:   integer counters summed per cell
+    first_fields: string fields that keep the first non-empty value per cell
+    """
+
+    def __init__(self, categories=None, sum_fields=(), first_fields=()):
+        self.categories = list(categories) if categories is not None else None
+        self.sum_fields = list(sum_fields)
+        self.first_fields = list(first_fields)
+
+        self.cell_index = {}  # cell id -> dense index, in first-seen order
+        self.cells = []
+        self.rows_added = 0
+
+        self._capacity = 0
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.sums = {field: np.zeros(0, dtype=np.int64) for field in self.sum_fields}
+        self.firsts = {field: [] for field in self.first_fields}
+        if self.categories is not None:
+            n_cats = len(self.categories)
+            self.cat_counts = np.zeros((0, n_cats), dtype=np.int64)
+            self.cat_first_seen = np.full((0, n_cats), _UNSEEN, dtype=np.int64)
+
+    def _grow(self, needed):
+        if needed <= self._capacity:
+            return
+        capacity = max(needed, self._capacity * 2, 1024)
+        extra = capacity - self._capacity
+
+        self.counts = np.concatenate([self.counts, np.zeros(extra, dtype=np.int64)])
+        for field in self.sum_fields:
+            self.sums[field] = np.concatenate([self.sums[field], np.zeros(extra, dtype=np.int64)])
+        if self.categories is not None:
+            n_cats = len(self.categories)
+            self.cat_counts = np.concatenate(
+                [self.cat_counts, np.zeros((extra, n_cats), dtype=np.int64)])
+            self.cat_first_seen = np.concatenate(
+                [self.cat_first_seen, np.full((extra, n_cats), _UNSEEN, dtype=np.int64)])
+        self._capacity = capacity
+
+    def _dense_indexes(self, cells):
+        """Map cell ids to dense indexes, registering new cells in first-seen order."""
+        distinct, first, inverse = np.unique(cells, return_index=True, return_inverse=True)
+        lookup = self.cell_index
+        dense = np.empty(len(distinct), dtype=np.int64)
+        for i in np.argsort(first, kind='stable').tolist():
+            cell = int(distinct[i])
+            index = lookup.get(cell)
+            if index is None:
+                index = lookup[cell] = len(self.cells)
+                self.cells.append(cell)
+                for field in self.first_fields:
+                    self.firsts[field].append(None)
+            dense[i] = index
+        self._grow(len(self.cells))
+        return dense[inverse]
+
+    def add(self, cells, category_ids=None, sums=None, firsts=None):
+        """
+        Add one chunk of already-filtered rows.
+
+        cells:        int64 cell ids
+        category_ids: int indexes into categories (required if categories set)
+        sums:         {field: integer array}
+        firsts:       {field: string array}, '' counts as empty
+        """
+        n = len(cells)
+        if not n:
+            return
+        dense = self._dense_indexes(cells)
+        size = len(self.cells)
+
+        self.counts[:size] += np.bincount(dense, minlength=size)
+
+        for field, values in (sums or {}).items():
+            self.sums[field][:size] += np.rint(
+                np.bincount(dense, weights=values, minlength=size)).astype(np.int64)
+
+        if self.categories is not None:
+            n_cats = len(self.categories)
+            flat = dense * n_cats + category_ids
+            self.cat_counts[:size] += np.bincount(
+                flat, minlength=size * n_cats).reshape(size, n_cats)
+
+            # Global row position of each (cell, category)'s first occurrence
+            distinct, first = np.unique(flat, return_index=True)
+            seen = self.cat_first_seen[:size].reshape(-1)
+            seen[distinct] = np.minimum(seen[distinct], self.rows_added + first)
+
+        for field, values in (firsts or {}).items():
+            store = self.firsts[field]
+            values = np.asarray(values)
+            rows = np.flatnonzero(values != '')
+            distinct, first = np.unique(dense[rows], return_index=True)
+            for index, row in zip(distinct.tolist(), rows[first].tolist()):
+                if not store[index]:
+                    store[index] = str(values[row])
+
+        self.rows_added += n
+
+    def blocks(self):
+        """Return {cell id: block dict} in first-seen cell order."""
+        size = len(self.cells)
+        counts = self.counts[:size].tolist()
+        sums = {field: self.sums[field][:size].tolist() for field in self.sum_fields}
+        if self.categories is not None:
+            names = self.categories
+            cat_counts = self.cat_counts[:size].tolist()
+            cat_orders = np.argsort(self.cat_first_seen[:size], axis=1, kind='stable').tolist()
+
+        result = {}
+        for index, cell in enumerate(self.cells):
+            block = {'count': counts[index]}
+            if self.categories is not None:
+                row = cat_counts[index]
+                block['categories'] = {names[c]: row[c] for c in cat_orders[index] if row[c]}
+            for field in self.sum_fields:
+                block[field] = sums[field][index]
+            for field in self.first_fields:
+                block[field] = self.firsts[field][index]
+            result[cell] = block
+        return result
@@ -27,6 +27,9 @@ import time
 from collections import defaultdict
 from datetime import datetime
 
+from quantile_sketch import BucketHistogram
+from tow_stats import Distribution
+
 # Supabase credentials from environment
 SUPABASE_URL = os.environ.get('NEXT_PUBLIC_SUPABASE_URL')
 SUPABASE_KEY = os.environ.get('SUPABASE_SERVICE_ROLE_KEY')
@@ -66,6 +69,9 @@ FINE_FALLBACK = {
 }
 DEFAULT_FINE = 60  # Fallback when violation code is unknown
 
+# Dollar buckets for the per-ticket payment distribution printout
+PAYMENT_BUCKETS = [0, 25, 50, 75, 100, 150, 200, 300, 500]
+
 
 def parse_block_address(location):
     """Parse a Chicago address into hundred-block components.
@@ -157,12 +163,25 @@ def load_payment_amounts():
     print(f"  Parse errors: {parse_errors:,}")
 
     # Stats
-    amounts = list(payments.values())
-    if amounts:
-        total = sum(amounts)
+    if payments:
+        amounts = Distribution(payments.values())
+        buckets = BucketHistogram(PAYMENT_BUCKETS)
+        for amount in amounts.values:
+            buckets.update(amount)
+        total = sum(amounts.values)
+        median, p90, p99 = amounts.percentiles([50, 90, 99])
         print(f"  Total payment amount: ${total:,.2f}")
         print(f"  Average per ticket: ${total / len(amounts):,.2f}")
-        print(f"  Max single ticket: ${max(amounts):,.2f}")
+        print(f"  Median / P90 / P99 per ticket: ${median:,.2f} / ${p90:,.2f} / ${p99:,.2f}")
+        print(f"  Max single ticket: ${amounts.max:,.2f}")
+        print("  Per-ticket distribution:")
+        lower = None
+        for edge, count in zip(PAYMENT_BUCKETS + [None], buckets.counts):
+            if count:
+                label = (f"<= ${edge}" if lower is None else
+                         f"${lower}-${edge}" if edge is not None else f"> ${lower}")
+                print(f"    {label:>12s}: {count:>10,} ({100 * count / len(payments):5.1f}%)")
+            lower = edge
 
     return payments
 
@@ -173,7 +192,9 @@ def load_location_tickets(payments):
     For each ticket, look up actual payment amount from the payments dict.
     Fall back to violation_code -> fine estimate if no payment found.
 
-    Returns aggregated block stats.
+    Returns aggregated block stats, the matched/unmatched counts, and the
+    actual payments on matched tickets per violation code (what the
+    FINE_FALLBACK medians are taken from).
     """
     import openpyxl
 
@@ -191,6 +212,7 @@ def load_location_tickets(payments):
     # Indices: 0, 1, 2, 3, 4
 
     blocks = {}  # block_address -> stats dict
+    payment_amounts = defaultdict(list)  # violation code -> matched payments
 
     total = 0
     matched_payments = 0
@@ -229,6 +251,7 @@ def load_location_tickets(payments):
         if tnum and tnum in payments:
             revenue = payments[tnum]
             matched_payments += 1
+            payment_amounts[viol_code].append(revenue)
         else:
             # Fallback to violation code estimate
             revenue = FINE_FALLBACK.get(viol_code, DEFAULT_FINE)
@@ -336,7 +359,7 @@ def load_location_tickets(payments):
     for i, b in enumerate(sorted_blocks):
         b['city_rank'] = i + 1
 
-    return sorted_blocks, matched_payments, unmatched_payments
+    return sorted_blocks, matched_payments, unmatched_payments, payment_amounts
 
 
 def upsert_to_supabase(blocks):
@@ -448,7 +471,7 @@ def main():
     payments = load_payment_amounts()
 
     # Step 2: Load location tickets and join with payments
-    blocks, matched, unmatched = load_location_tickets(payments)
+    blocks, matched, unmatched, payment_amounts = load_location_tickets(payments)
 
     # Step 3: Print summary before upload
     print("\n" + "=" * 70)
@@ -496,6 +519,15 @@ def main():
     else:
         print(f"    → Actual revenue is LOWER (contested/reduced/unpaid tickets)")
 
+    # Median actual payment per violation code, to keep FINE_FALLBACK current
+    print("\n  Actual payment by violation code (matched tickets, top 15):")
+    print(f"    {'Code':<10s} {'Tickets':>9s} {'Median':>8s} {'P90':>8s} {'Fallback':>9s}")
+    by_volume = sorted(payment_amounts.items(), key=lambda x: len(x[1]), reverse=True)
+    for code, amounts in by_volume[:15]:
+        median, p90 = Distribution(amounts).percentiles([50, 90])
+        print(f"    {code:<10s} {len(amounts):>9,} ${median:>7,.0f} ${p90:>7,.0f} "
+              f"${FINE_FALLBACK.get(code, DEFAULT_FINE):>8,}")
+
     # Step 4: Upsert to Supabase
     upserted, errors = upsert_to_supabase(blocks)
 
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Build the tow record delay lookup cube for the tow alerts.
+
+The notification service needs a latency estimate for a single tow. The
+tow analyses (analyze-tow.py) only print one distribution for all tows, and
+computing quantiles per request would mean shipping the FOIA data.
+This script aggregates record creation delay (Date Tow Record Created minus
+Tow Date) once. The quantiles are grouped by four dimensions:
+
+  reason   Reason for Tow (upper case), values with at least MIN_CELL_COUNT tows
+  pound    Pound Number, same threshold
+  hour     hour of day of the tow, 0-23
+  dow      day of week of the tow, 0 = Monday .. 6 = Sunday
+
+Each dimension also has an "all" slot ('*', the last value), and the cube
+holds every combination of values and "all" slots. Cells with fewer than
+MIN_CELL_COUNT tows fall back when the cube is built. The fallback moves one
+more dimension to "all" at a time, in FALLBACK_ORDER, until the cell has
+enough tows. Every cell therefore points at a usable row, and a lookup
+(lib/tow-delay-cube.ts) is one index computation, O(1).
+
+Only tows with a real timestamp are used. Midnight-stamped tows have no
+hour, and their delays are mostly the unknown time of day. Delays outside
+0-72h are dropped, as in the record-lag report.
+
+Output (compact JSON, data/tow-delay-cube.json by default):
+  dimensions   {name: [values..., '*']} in DIMENSIONS order
+  cells        flat list, row-major over DIMENSIONS, of indexes into stats
+  stats        [n, p50, p75, p90] rows in minutes, de-duplicated
+  plus the build time, the row counts, MIN_CELL_COUNT, FALLBACK_ORDER and
+  the portal sync delay the lookup adds for the notification estimate
+
+Standard library only.
+
+USAGE:
+  python3 scripts/build-tow-delay-cube.py [--foia path] [--out data/tow-delay-cube.json] [--min-cell 30]
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import Counter, defaultdict
+from datetime import datetime
+from itertools import product
+
+from tow_data import FOIA_FILE, load_foia
+from tow_reports import MAX_DELAY, SYNC_DELAY, iter_tows
+from tow_stats import Distribution
+
+DEFAULT_OUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'tow-delay-cube.json')
+
+CUBE_VERSION = 1
+
+DIMENSIONS = ('reason', 'pound', 'hour', 'dow')
+ALL = '*'
+
+# Fewer tows than this and a cell's quantiles fall back to a coarser cell
+MIN_CELL_COUNT = 30
+
+# Dimensions given up first when a cell is too sparse: weekday matters
+# least, then the pound; the reason for tow matters most
+FALLBACK_ORDER = ('dow', 'pound', 'hour', 'reason')
+
+PERCENTILES = (50, 75, 90)
+
+
+def _category(value):
+    if value is None:
+        return None
+    text = str(value).strip()
+    # The workbook stores pound numbers as floats ('3.0')
+    if text.endswith('.0') and text[:-2].isdigit():
+        text = text[:-2]
+    return text or None
+
+
+def timed_tows(foia):
+    """(reason, pound, hour, dow, delay minutes) for timed tows with a 0-72h record delay, and counts."""
+    counts = Counter()
+    out = []
+    for tow in iter_tows(foia):
+        if tow.delay is None:
+            counts['missing_dates'] += 1
+        elif tow.tow_date.time() == datetime.min.time():
+            counts['midnight_stamped'] += 1
+        elif not 0 <= tow.delay <= MAX_DELAY:
+            counts['delay_out_of_range'] += 1
+        else:
+            reason = _category(tow.reason)
+            out.append((reason and reason.upper(), _category(tow.pound), tow.tow_date.hour, tow.tow_date.weekday(),
+                        tow.delay / 60))
+    counts['used'] = len(out)
+    return out, counts
+
+
+def dimension_values(tows, min_count):
+    """{dimension: values in cube order, ALL last}; rare reasons and pounds only count toward ALL."""
+    reasons = Counter(t[0] for t in tows if t[0] is not None)
+    pounds = Counter(t[1] for t in tows if t[1] is not None)
+    return {
+        'reason': [r for r, n in reasons.most_common() if n >= min_count] + [ALL],
+        'pound': sorted((p for p, n in pounds.items() if n >= min_count),
+                        key=lambda p: (not p.isdigit(), int(p) if p.isdigit() else 0, p)) + [ALL],
+        'hour': list(range(24)) + [ALL],
+        'dow': list(range(7)) + [ALL],
+    }
+
+
+def build_cube(tows, min_count=MIN_CELL_COUNT):
+    """(dimensions, cells, stats) for the cube; see the module docstring."""
+    dims = dimension_values(tows, min_count)
+    slots = [{v: i for i, v in enumerate(dims[name][:-1])} for name in DIMENSIONS]
+    all_slot = [len(dims[name]) - 1 for name in DIMENSIONS]
+
+    # Every tow counts toward its own cell and each of its 15 roll-ups
+    samples = defaultdict(list)
+    for tow in tows:
+        own = [slots[d].get(tow[d], all_slot[d]) for d in range(len(DIMENSIONS))]
+        for rolled in product(*((i, all_slot[d]) if i != all_slot[d] else (i,) for d, i in enumerate(own))):
+            samples[rolled].append(tow[4])
+
+    summaries = {}
+    for key, delays in samples.items():
+        if len(delays) >= min_count:
+            dist = Distribution(delays)
+            summaries[key] = (len(dist),) + tuple(round(v, 1) for v in dist.percentiles(PERCENTILES))
+    if not summaries:
+        raise ValueError(f"fewer than {min_count} usable tows, nothing to build")
+
+    fallback = [DIMENSIONS.index(name) for name in FALLBACK_ORDER]
+    rows = {}
+    cells = []
+    for key in product(*(range(len(dims[name])) for name in DIMENSIONS)):
+        key = list(key)
+        summary = summaries.get(tuple(key))
+        for d in fallback:
+            if summary is not None:
+                break
+            key[d] = all_slot[d]
+            summary = summaries.get(tuple(key))
+        if summary is None:
+            # Only the all-slots cell is left; it has every tow
+            summary = summaries[tuple(all_slot)]
+        cells.append(rows.setdefault(summary, len(rows)))
+
+    return dims, cells, [list(row) for row in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the tow record delay lookup cube')
+    parser.add_argument('--foia', default=FOIA_FILE, help='FOIA towed vehicles workbook')
+    parser.add_argument('--out', default=DEFAULT_OUT, help='Cube JSON (default: data/tow-delay-cube.json)')
+    parser.add_argument('--min-cell', type=int, default=MIN_CELL_COUNT,
+                        help=f'Tows a cell needs before it stops falling back (default: {MIN_CELL_COUNT})')
+    parser.add_argument('--refresh', action='store_true', help='Rebuild the FOIA cache')
+    args = parser.parse_args()
+
+    try:
+        foia = load_foia(args.foia, refresh=args.refresh)
+        tows, counts = timed_tows(foia)
+        dims, cells, stats = build_cube(tows, args.min_cell)
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
+    print(f"{len(foia):,} FOIA rows")
+    for name, value in counts.items():
+        print(f"  {name:25s} {value:,}")
+    print("Dimensions: " + ', '.join(f"{name} {len(dims[name]) - 1}" for name in DIMENSIONS))
+    print(f"{len(cells):,} cells, {len(stats):,} distinct stats rows")
+
+    cube = {
+        'version': CUBE_VERSION,
+        'built_at': datetime.now().isoformat(timespec='seconds'),
+        'source': {'file': os.path.basename(args.foia), 'rows': len(foia), **counts},
+        'min_cell_count': args.min_cell,
+        'sync_delay_minutes': SYNC_DELAY / 60,
+        'fallback_order': list(FALLBACK_ORDER),
+        'dimensions': {name: dims[name] for name in DIMENSIONS},
+        'stats_fields': ['n'] + [f'p{p}' for p in PERCENTILES],
+        'cells': cells,
+        'stats': stats,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    tmp_path = f"{args.out}.tmp-{os.getpid()}"
+    with open(tmp_path, 'w') as f:
+        json.dump(cube, f, separators=(',', ':'))
+    os.replace(tmp_path, args.out)
+    print(f"Wrote {args.out} ({os.path.getsize(args.out) / 1024:.0f} KB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Keyword -> category classification for the neighborhood data processors.
+
+The city exports repeat a few hundred distinct type strings (SR_TYPE,
+PERMIT_TYPE, LICENSE DESCRIPTION) across millions of rows, so each distinct
+raw string is resolved once and memoized. New strings are resolved with an
+Aho-Corasick automaton over every keyword, which finds all keyword hits in a
+single pass over the string instead of one substring test per keyword.
+
+Matching semantics are the same as the loops this replaces: the keyword
+listed first (category order, then keyword order) wins.
+"""
+
+from collections import deque
+
+# Stop memoizing past this many distinct strings (free-text columns)
+MAX_MEMO_ENTRIES = 100000
+
+# Marker result for exclude keywords
+_EXCLUDED = object()
+
+
+class CategoryMatcher:
+    """
+    Classify strings into categories by substring keywords.
+
+    categories: {category: [keyword, ...]} in priority order
+    default:    returned when no keyword matches
+    normalize:  applied to the raw string before matching (e.g. str.upper)
+    exclude:    keywords that force the default result when present
+    """
+
+    def __init__(self, categories, default=None, normalize=None, exclude=()):
+        self.default = default
+        self.normalize = normalize
+        self.memo = {}
+
+        patterns = []
+        for category, keywords in categories.items():
+            for keyword in keywords:
+                patterns.append((keyword, category))
+        # Exclusions outrank every category keyword
+        patterns = [(keyword, _EXCLUDED) for keyword in exclude] + patterns
+
+        self.results = [category for _, category in patterns]
+        self._build([keyword for keyword, _ in patterns])
+
+    def _build(self, keywords):
+        # State 0 is the root. goto[s] maps a character to the next state,
+        # best[s] is the lowest (highest priority) pattern index that ends at
+        # s or at any suffix state reachable through failure links.
+        goto = [{}]
+        best = [None]
+        for index, keyword in enumerate(keywords):
+            state = 0
+            for ch in keyword:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    best.append(None)
+                state = nxt
+            if best[state] is None or index < best[state]:
+                best[state] = index
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0) if state else 0
+                inherited = best[fail[nxt]]
+                if inherited is not None and (best[nxt] is None or inherited < best[nxt]):
+                    best[nxt] = inherited
+
+        self.goto = goto
+        self.fail = fail
+        self.best = best
+
+    def _match(self, text):
+        goto = self.goto
+        fail = self.fail
+        best = self.best
+        state = 0
+        found = None
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            hit = best[state]
+            if hit is not None and (found is None or hit < found):
+                found = hit
+                if found == 0:
+                    break
+        if found is None:
+            return self.default
+        result = self.results[found]
+        return self.default if result is _EXCLUDED else result
+
+    def classify(self, raw):
+        """Return the category for raw (memoized per distinct raw string)."""
+        try:
+            return self.memo[raw]
+        except KeyError:
+            pass
+        text = raw or ''
+        if self.normalize:
+            text = self.normalize(text)
+        result = self._match(text)
+        if len(self.memo) < MAX_MEMO_ENTRIES:
+            self.memo[raw] = result
+        return result
+
+    __call__ = classify
+
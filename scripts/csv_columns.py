@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Column-projected CSV reading for the multi-GB city exports.
+
+csv.DictReader builds a dict of every column (311 has about 40) for every
+row, only for the processors to read a handful of them. read_columns()
+resolves the wanted columns against the header once and yields plain tuples
+of just those values, in the order requested.
+
+Behaves like DictReader for our purposes: blank lines are skipped, duplicate
+header names resolve to the last occurrence, and a column that is missing
+from the header or from a short row reads as ''.
+"""
+
+import csv
+from operator import itemgetter
+
+
+def read_columns(f, columns, header=None, **reader_kwargs):
+    """
+    Yield a tuple of the named columns for every data row in f.
+
+    Pass header when f starts mid-file (e.g. a shard from csv_shards) and
+    has no header row of its own.
+    """
+    reader = csv.reader(f, **reader_kwargs)
+    if header is None:
+        header = next(reader, None)
+        if header is None:
+            return
+
+    positions = {name: i for i, name in enumerate(header)}
+    indexes = [positions.get(name) for name in columns]
+
+    if None in indexes:
+        missing = [name for name, i in zip(columns, indexes) if i is None]
+        print(f"  Warning: columns not in header: {missing}")
+        yield from _read_padded(reader, indexes)
+        return
+
+    width = max(indexes) + 1
+    if len(indexes) == 1:
+        only = indexes[0]
+        for row in reader:
+            if len(row) >= width:
+                yield (row[only],)
+            elif row:
+                yield ('',)
+        return
+
+    project = itemgetter(*indexes)
+    for row in reader:
+        if len(row) >= width:
+            yield project(row)
+        elif row:
+            yield tuple(row[i] if i < len(row) else '' for i in indexes)
+
+
+def _read_padded(reader, indexes):
+    for row in reader:
+        if row:
+            n = len(row)
+            yield tuple(row[i] if i is not None and i < n else '' for i in indexes)
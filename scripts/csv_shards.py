@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Split large CSV exports into record-aligned byte ranges and aggregate them on
+several cores.
+
+A range boundary is only placed right after a newline that sits outside a
+quoted field. Quote state is tracked by the parity of '"' bytes seen since the
+start of the data (an escaped "" flips it twice), which holds for well-formed
+CSV such as the Socrata exports. UTF-8 never uses 0x0A or 0x22 inside a
+multi-byte sequence, so byte-level splitting is safe for the text decode.
+
+Each range is read back through a bounded stream and handed to an aggregate
+function in a worker process. Results come back in file order, so the caller
+can merge them with the same "first value wins" semantics as a serial pass.
+"""
+
+import csv
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+SCAN_CHUNK_SIZE = 16 * 1024 * 1024
+
+# Don't bother splitting below this much data per shard
+MIN_SHARD_BYTES = 8 * 1024 * 1024
+
+
+def _record_starts(f, start, targets):
+    """
+    For each target offset (ascending), find the first record boundary at or
+    after it, scanning from `start`, which must itself be a record boundary.
+    """
+    f.seek(start)
+    pending = list(targets)
+    found = []
+    pos = start
+    parity = 0
+    searching = False
+
+    while pending:
+        chunk = f.read(SCAN_CHUNK_SIZE)
+        if not chunk:
+            break
+        chunk_end = pos + len(chunk)
+        i = 0
+        while pending:
+            if not searching:
+                if pending[0] >= chunk_end:
+                    break
+                t = max(pending[0] - pos, i)
+                parity ^= chunk.count(b'"', i, t) & 1
+                i = t
+                searching = True
+            nl = chunk.find(b'\n', i)
+            if nl == -1:
+                break
+            parity ^= chunk.count(b'"', i, nl) & 1
+            i = nl + 1
+            if parity == 0:
+                found.append(pos + i)
+                pending.pop(0)
+                searching = False
+        parity ^= chunk.count(b'"', i) & 1
+        pos = chunk_end
+
+    end = f.seek(0, os.SEEK_END)
+    return found + [end] * len(pending)
+
+
+def read_header(path, encoding='utf-8', errors='ignore'):
+    """Return (header fields, byte offset where the first data record starts)."""
+    with open(path, 'rb') as f:
+        data_start = _record_starts(f, 0, [0])[0]
+        f.seek(0)
+        raw = f.read(data_start)
+    header = next(csv.reader(io.StringIO(raw.decode(encoding, errors))), [])
+    return header, data_start
+
+
+def shard_ranges(path, shards, data_start):
+    """Split [data_start, EOF) into up to `shards` record-aligned ranges."""
+    size = os.path.getsize(path)
+    shards = max(1, min(shards, (size - data_start) // MIN_SHARD_BYTES or 1))
+    step = (size - data_start) / shards
+    targets = [int(data_start + step * k) for k in range(1, shards)]
+
+    with open(path, 'rb') as f:
+        bounds = [data_start] + _record_starts(f, data_start, targets) + [size]
+
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+
+class _RangeReader(io.RawIOBase):
+    """Raw binary stream over path[start:end]."""
+
+    def __init__(self, path, start, end):
+        self._f = open(path, 'rb')
+        self._f.seek(start)
+        self._remaining = end - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        if self._remaining <= 0:
+            return 0
+        view = memoryview(b)[:min(len(b), self._remaining)]
+        n = self._f.readinto(view)
+        self._remaining -= n
+        return n
+
+    def close(self):
+        self._f.close()
+        super().close()
+
+
+def open_range(path, start, end, encoding='utf-8', errors='ignore'):
+    """Open path[start:end] as text, decoded the same way as open(path, 'r')."""
+    raw = io.BufferedReader(_RangeReader(path, start, end), buffer_size=1024 * 1024)
+    return io.TextIOWrapper(raw, encoding=encoding, errors=errors)
+
+
+def _run_shard(task):
+    path, start, end, read_rows, aggregate, args, encoding, errors = task
+    with open_range(path, start, end, encoding, errors) as f:
+        return aggregate(read_rows(f), *args)
+
+
+def map_csv_shards(path, read_rows, aggregate, args=(), workers=None, encoding='utf-8', errors='ignore'):
+    """
+    Run aggregate(read_rows(text_stream), *args) over record-aligned shards
+    of path in a process pool and return the results in file order.
+
+    read_rows(f, header=...) turns a header-less text stream into rows,
+    e.g. functools.partial(read_columns, columns=[...]).
+    read_rows and aggregate must be picklable (module-level functions).
+    """
+    workers = workers or os.cpu_count() or 1
+    header, data_start = read_header(path, encoding, errors)
+    ranges = shard_ranges(path, workers, data_start)
+    print(f"  Split into {len(ranges)} shards across {workers} workers")
+
+    tasks = [
+        (path, start, end, _HeaderBound(read_rows, header), aggregate, args, encoding, errors)
+        for start, end in ranges
+    ]
+    if len(tasks) == 1:
+        return [_run_shard(tasks[0])]
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        return list(pool.map(_run_shard, tasks))
+
+
+class _HeaderBound:
+    """Picklable read_rows(f) with the file's header pre-bound."""
+
+    def __init__(self, read_rows, header):
+        self.read_rows = read_rows
+        self.header = header
+
+    def __call__(self, f):
+        return self.read_rows(f, header=self.header)
@@ -3,45 +3,27 @@
 Investigate the surprising finding that portal dates appear BEFORE FOIA dates.
 """
 
-import openpyxl
+import os
 import requests
 import pandas as pd
-from datetime import datetime
+
+from tow_data import FOIA_FILE, join_on_inventory, load_foia, parse_datetime_column, print_join_stats
 
 # File paths
-FOIA_FILE = "/home/randy-vollrath/Downloads/25238_P150710_Towed_vehicles.xlsx"
-PORTAL_API = "https://data.cityofchicago.org/resource/ygr5-vcbg.json"
+# CHICAGO_PORTAL_URL can point at scripts/portal-standin-server.py for offline runs
+PORTAL_URL = os.environ.get("CHICAGO_PORTAL_URL", "https://data.cityofchicago.org")
+PORTAL_API = f"{PORTAL_URL}/resource/ygr5-vcbg.json"
 
 print("="*80)
 print("INVESTIGATING PORTAL vs FOIA TIMING")
 print("="*80)
 
 # Load FOIA data
-wb = openpyxl.load_workbook(FOIA_FILE, read_only=True)
-sheet = wb["Data"]
-headers = [cell.value for cell in next(sheet.iter_rows(min_row=1, max_row=1))]
-foia_rows = []
-for row in sheet.iter_rows(min_row=2, values_only=True):
-    foia_rows.append(row)
-
-foia_df = pd.DataFrame(foia_rows, columns=headers)
+foia_df = load_foia(FOIA_FILE).to_dataframe()
 
 # Parse dates
-def safe_parse_date(val):
-    if pd.isna(val):
-        return None
-    if isinstance(val, datetime):
-        return val
-    if isinstance(val, str):
-        for fmt in ["%Y-%m-%d %H:%M:%S", "%m/%d/%Y %H:%M:%S", "%Y-%m-%d", "%m/%d/%Y"]:
-            try:
-                return datetime.strptime(val, fmt)
-            except:
-                continue
-    return None
-
-foia_df['tow_date_parsed'] = foia_df['Tow Date'].apply(safe_parse_date)
-foia_df['created_date_parsed'] = foia_df['Date Tow Record Created'].apply(safe_parse_date)
+foia_df['tow_date_parsed'] = parse_datetime_column(foia_df['Tow Date'])
+foia_df['created_date_parsed'] = parse_datetime_column(foia_df['Date Tow Record Created'])
 
 # Fetch portal data
 print("Fetching portal data...")
@@ -51,26 +33,18 @@ portal_df['portal_tow_date_parsed'] = pd.to_datetime(portal_df['tow_date'], erro
 
 # Match by inventory number
 print("\nMatching records...")
-foia_by_inv = {}
-for idx, row in foia_df.iterrows():
-    inv = str(row['Inventory Number']).strip()
-    if inv and inv != 'nan':
-        foia_by_inv[inv] = row
-
-matched = []
-for idx, row in portal_df.iterrows():
-    inv = str(row.get('inventory_number', '')).strip()
-    if inv and inv != 'nan' and inv in foia_by_inv:
-        foia_row = foia_by_inv[inv]
-        matched.append({
-            'inventory_number': inv,
-            'foia_tow_date': foia_row['tow_date_parsed'],
-            'foia_created_date': foia_row['created_date_parsed'],
-            'portal_tow_date': row['portal_tow_date_parsed'],
-            'portal_tow_date_str': row['tow_date']
-        })
-
-matched_df = pd.DataFrame(matched)
+# Every portal row, joined to the last FOIA row with its inventory number
+joined, join_stats = join_on_inventory(portal_df, foia_df, 'inventory_number', 'Inventory Number',
+                                       dedupe_left=False)
+print_join_stats(join_stats, 'Portal', 'FOIA')
+
+matched_df = pd.DataFrame({
+    'inventory_number': joined['inventory_number'],
+    'foia_tow_date': joined['tow_date_parsed'],
+    'foia_created_date': joined['created_date_parsed'],
+    'portal_tow_date': joined['portal_tow_date_parsed'],
+    'portal_tow_date_str': joined['tow_date'],
+})
 complete = matched_df[
     matched_df['foia_tow_date'].notna() &
     matched_df['portal_tow_date'].notna()
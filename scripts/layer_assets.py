@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Publish generated map layers as immutable, content-hashed assets.
+
+For each layer file (e.g. public/311-data.json) this writes
+
+    public/layers/311-data.<hash>.json      same bytes as the plain file
+
+and records them in public/layer-manifest.json:
+
+    {"updated": "...", "layers": {"311-data.json": {"path": "/layers/311-data.<hash>.json",
+                                                    "hash": ..., "bytes": ...}}}
+
+A hashed name never changes content, so it can be cached forever; only the
+small manifest has to be revalidated. The plain files are still written for
+older clients. Per layer, the current and the previous hashed version are
+kept on disk (pages loaded before an update still resolve); older ones are
+removed. A hashed copy has the same bytes as the plain file, so git stores
+both as one blob.
+
+No compressed siblings are written: Vercel compresses responses itself and
+never serves .gz/.br files. Siblings left by earlier runs are removed.
+
+Standard library only (used by the GitHub Action).
+"""
+
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+
+from processor_runner import write_json_atomic
+
+ASSETS_DIR = 'layers'
+MANIFEST_FILE = 'layer-manifest.json'
+HASH_LENGTH = 12
+
+
+def content_hash(data):
+    """Short hex digest of a file's bytes."""
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+
+def hashed_path(filename, digest):
+    """'311-data.json' -> 'layers/311-data.<digest>.json'"""
+    base, ext = os.path.splitext(filename)
+    return f"{ASSETS_DIR}/{base}.{digest}{ext}"
+
+
+def _is_companion(name, filename):
+    """Whether manifest entry name was published alongside filename (its .bin copy or pyramid levels)."""
+    base = os.path.splitext(filename)[0]
+    stem = os.path.basename(name)
+    return name != filename and (stem.startswith(base + '.') or stem.startswith(base + '-'))
+
+
+def _prune(public_dir, filename, keep):
+    """Remove hashed copies of filename whose digest isn't in keep, and any compressed siblings."""
+    base, ext = os.path.splitext(filename)
+    directory = os.path.join(public_dir, ASSETS_DIR, os.path.dirname(base))
+    if not os.path.isdir(directory):
+        return
+    pattern = re.compile(re.escape(os.path.basename(base)) + r'\.([0-9a-f]{%d})' % HASH_LENGTH
+                         + re.escape(ext) + r'(\.gz|\.br)?$')
+    for name in os.listdir(directory):
+        match = pattern.match(name)
+        if match and (match.group(1) not in keep or match.group(2)):
+            os.unlink(os.path.join(directory, name))
+
+
+def publish_asset(public_dir, filename, previous=None):
+    """
+    Write the hashed copy of public_dir/filename. previous is its current
+    manifest entry, if any. Returns the new entry.
+    """
+    with open(os.path.join(public_dir, filename), 'rb') as f:
+        data = f.read()
+    digest = content_hash(data)
+    path = hashed_path(filename, digest)
+    full_path = os.path.join(public_dir, path)
+    entry = {'path': '/' + path, 'hash': digest, 'bytes': len(data)}
+
+    if not os.path.exists(full_path):
+        write_json_atomic(full_path, data)
+
+    # Remember the version this one replaces, so it survives one more update
+    if previous and previous.get('hash') != digest:
+        entry['previous'] = previous['hash']
+    elif previous and previous.get('previous'):
+        entry['previous'] = previous['previous']
+    _prune(public_dir, filename, {digest, entry.get('previous')})
+    return entry
+
+
+def publish_layers(public_dir, filenames):
+    """
+    Publish each layer and update the manifest. Layers whose file is
+    missing are skipped. Returns the number of assets.
+    """
+    manifest_path = os.path.join(public_dir, MANIFEST_FILE)
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    layers = manifest.setdefault('layers', {})
+
+    published = 0
+    for filename in filenames:
+        if not os.path.exists(os.path.join(public_dir, filename)):
+            continue
+        layers[filename] = publish_asset(public_dir, filename, layers.get(filename))
+        published += 1
+        # Files earlier runs published alongside the layer, no longer written
+        for name in [n for n in layers if _is_companion(n, filename)]:
+            _prune(public_dir, name, set())
+            del layers[name]
+
+    manifest['updated'] = datetime.now().strftime('%Y-%m-%dT%H:%M:%S')
+    manifest['layers'] = dict(sorted(layers.items()))
+    write_json_atomic(manifest_path, manifest)
+    return published
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Typed, cached loader for the OEMC dispatch export
+(FOIA_F261085_TOW_AUG_OCT_2025.csv).
+
+analyze-tow-data.py used to read the whole export into a list of dicts, scan
+it again for every candidate datetime column and once more for the dispatch
+durations, trying four strptime formats on every value. load_oemc() instead:
+
+  - sniffs the delimiter from the first lines of the file
+  - decides from the first SAMPLE_ROWS rows which columns hold datetimes and
+    in which format (the one format that parses most of the column's sample)
+  - reads the file in one streaming pass, parsing datetime columns straight
+    into int64 microsecond arrays (array 'q', MISSING for blanks, as in
+    tow_data); other columns stay strings
+  - caches the result keyed by the file's SHA-256, like load_foia()
+
+The result is an OemcTable, a tow_data.TowTable, so .datetimes(), .micros(),
+.find(), .rows() and .to_dataframe() work as they do on the FOIA table.
+table.formats and table.unparsed record, per datetime column, the detected
+format and the number of non-empty values that matched no format.
+
+Standard library only.
+
+USAGE:
+  from oemc_data import load_oemc
+  oemc = load_oemc()
+  dispatched = oemc.datetimes(oemc.find('dispatch'))
+
+  python3 scripts/oemc_data.py [--refresh] [path]
+"""
+
+import csv
+import os
+import pickle
+import sys
+from array import array
+from datetime import datetime
+
+from tow_data import (CACHE_DIR, DATETIME_FORMATS, MISSING, OEMC_FILE, TowTable, _header_names, _to_micros,
+                      file_sha256, parse_tow_datetime)
+
+# Bump when the cache layout or parsing changes
+OEMC_CACHE_VERSION = 2
+
+SAMPLE_ROWS = 1000
+SNIFF_BYTES = 64 * 1024
+DELIMITERS = '|,\t;'
+
+# Share of a column's non-empty sample values that must parse for it to be a datetime column
+DATETIME_SAMPLE_MATCH = 0.9
+
+# Zero-padded formats parsed by slicing: (year, month, day, hour, minute,
+# second) slices and the separator expected at each other position
+FIXED_WIDTH = {
+    '%m/%d/%Y %H:%M:%S': (((6, 10), (0, 2), (3, 5), (11, 13), (14, 16), (17, 19)),
+                          ((2, '/'), (5, '/'), (10, ' '), (13, ':'), (16, ':'))),
+    '%Y-%m-%d %H:%M:%S': (((0, 4), (5, 7), (8, 10), (11, 13), (14, 16), (17, 19)),
+                          ((4, '-'), (7, '-'), (10, ' '), (13, ':'), (16, ':'))),
+}
+FIXED_WIDTH_LENGTH = 19
+
+
+class OemcTable(TowTable):
+    """
+    TowTable of the OEMC export, plus what the loader detected:
+
+    formats:  datetime column -> the format chosen from the sample
+    unparsed: datetime column -> number of non-empty values that matched no format
+    """
+
+    def __init__(self, headers, columns, dates, formats, unparsed, source=None):
+        super().__init__(headers, 1, columns, dates, source=source)
+        self.formats = formats
+        self.unparsed = unparsed
+
+
+def sniff_delimiter(path):
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        sample = f.read(SNIFF_BYTES)
+    try:
+        return csv.Sniffer().sniff(sample.split('\n', 1)[0], delimiters=DELIMITERS).delimiter
+    except csv.Error:
+        return ','
+
+
+def _matches(value, fmt):
+    try:
+        datetime.strptime(value, fmt)
+        return True
+    except ValueError:
+        return False
+
+
+def detect_datetime_formats(headers, sample):
+    """{column index: format} for sample columns that are mostly datetimes in one format."""
+    formats = {}
+    for idx, header in enumerate(headers):
+        values = [row[idx].strip() for row in sample if idx < len(row) and row[idx].strip()]
+        if not values:
+            continue
+        best, best_count = None, 0
+        for fmt in DATETIME_FORMATS:
+            count = sum(_matches(v, fmt) for v in values)
+            if count > best_count:
+                best, best_count = fmt, count
+        if best and best_count >= DATETIME_SAMPLE_MATCH * len(values):
+            formats[idx] = best
+    return formats
+
+
+def datetime_parser(fmt):
+    """
+    Parser for one column's format: string -> datetime or None. Zero-padded
+    formats are sliced instead of strptime'd; anything that does not fit the
+    column's format falls back to parse_tow_datetime() and its format list.
+    """
+    slices, separators = FIXED_WIDTH.get(fmt, (None, ()))
+
+    def parse(value):
+        # isdigit(): int() would also take ' 8' or '+8' and hide a misaligned value
+        if (slices and len(value) == FIXED_WIDTH_LENGTH
+                and all(value[i] == sep for i, sep in separators)
+                and all(value[a:b].isdigit() for a, b in slices)):
+            try:
+                return datetime(*(int(value[a:b]) for a, b in slices))
+            except ValueError:
+                pass
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            return parse_tow_datetime(value)
+
+    return parse
+
+
+def convert_csv(path=OEMC_FILE):
+    """Read the export in one pass and return an OemcTable (datetime columns typed)."""
+    delimiter = sniff_delimiter(path)
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        headers = _header_names(next(reader, []))
+        if not headers:
+            raise ValueError(f"no header row in {path}")
+
+        sample = []
+        for row in reader:
+            if row:
+                sample.append(row)
+                if len(sample) >= SAMPLE_ROWS:
+                    break
+        formats = detect_datetime_formats(headers, sample)
+        print(f"Converting {os.path.basename(path)} (delimiter {delimiter!r}, datetime columns: "
+              f"{', '.join(f'{headers[i]} {fmt}' for i, fmt in formats.items()) or 'none'})...")
+
+        width = len(headers)
+        text = {idx: [] for idx in range(width) if idx not in formats}
+        dates = {idx: array('q') for idx in formats}
+        parsers = {idx: datetime_parser(fmt) for idx, fmt in formats.items()}
+        unparsed = {idx: 0 for idx in formats}
+
+        def add(row):
+            if len(row) < width:
+                row = row + [''] * (width - len(row))
+            for idx, values in text.items():
+                values.append(row[idx])
+            for idx, values in dates.items():
+                value = row[idx].strip()
+                if not value:
+                    values.append(MISSING)
+                    continue
+                dt = parsers[idx](value)
+                if dt is None:
+                    unparsed[idx] += 1
+                values.append(_to_micros(dt))
+
+        for row in sample:
+            add(row)
+        for row in reader:
+            if row:
+                add(row)
+
+    return OemcTable(headers,
+                     {headers[i]: v for i, v in text.items()},
+                     {headers[i]: v for i, v in dates.items()},
+                     {headers[i]: fmt for i, fmt in formats.items()},
+                     {headers[i]: n for i, n in unparsed.items()},
+                     source=path)
+
+
+def load_oemc(path=OEMC_FILE, refresh=False, cache_dir=CACHE_DIR):
+    """Return the OEMC export as an OemcTable, from cache when the file is unchanged."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"OEMC export not found: {path}")
+
+    digest = file_sha256(path)
+    cache_path = os.path.join(cache_dir, f"oemc-{digest[:16]}.pickle")
+
+    if not refresh and os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'rb') as f:
+                cached = pickle.load(f)
+            if cached.get('version') == OEMC_CACHE_VERSION and cached.get('sha256') == digest:
+                return OemcTable(cached['headers'], cached['columns'], cached['dates'], cached['formats'],
+                                 cached['unparsed'], source=path)
+        except (OSError, pickle.UnpicklingError, EOFError, KeyError, AttributeError):
+            pass
+
+    table = convert_csv(path)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{cache_path}.tmp-{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump({
+            'version': OEMC_CACHE_VERSION,
+            'sha256': digest,
+            'headers': table.headers,
+            'columns': table._columns,
+            'dates': table._dates,
+            'unparsed': table.unparsed,
+            'formats': table.formats,
+        }, f, pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, cache_path)
+    return table
+
+
+if __name__ == '__main__':
+    args = [a for a in sys.argv[1:] if a != '--refresh']
+    started = datetime.now()
+    oemc = load_oemc(args[0] if args else OEMC_FILE, refresh='--refresh' in sys.argv[1:])
+    print(f"Loaded {len(oemc):,} rows in {(datetime.now() - started).total_seconds():.2f}s")
+    for header in oemc.headers:
+        if header in oemc.formats:
+            print(f"  {header:25} datetime {oemc.formats[header]} ({oemc.unparsed[header]:,} unparsed)")
+        else:
+            print(f"  {header:25} text")
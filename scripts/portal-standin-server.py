@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Chicago Data Portal (data.cityofchicago.org).
+
+Replays recorded or synthetic Socrata datasets over HTTP so the portal fetch
+loops (update-neighborhood-data.py, analyze-tow-delay.py,
+investigate-tow-timing.py) can be benchmarked, profiled and regression-tested
+without touching the real API.
+
+Supported SoQL subset:
+  $select   comma-separated field list
+  $where    clauses joined with AND: field =, !=, <, <=, >, >= 'literal',
+            field IS [NOT] NULL, field IN ('a', 'b', ...)
+  $order    single field, optional ASC/DESC
+  $limit / $offset
+Both /resource/<id>.json and /resource/<id>.csv are served, gzip-encoded when
+the client sends Accept-Encoding: gzip.
+
+USAGE:
+  # Generate synthetic datasets (all neighborhood layers + towed vehicles)
+  python3 scripts/portal-standin-server.py synth --data-dir /tmp/portal --rows 50000
+
+  # Record a real dataset slice for replay
+  python3 scripts/portal-standin-server.py record ijzp-q8t2 --data-dir /tmp/portal \\
+      --where "date > '2025-01-01T00:00:00'" --max-rows 200000
+
+  # Serve with 150ms +/- 50ms of injected latency
+  python3 scripts/portal-standin-server.py serve --data-dir /tmp/portal --latency-ms 150 --jitter-ms 50
+
+  # Point the fetch layers at it
+  CHICAGO_PORTAL_URL=http://127.0.0.1:8765 python3 scripts/update-neighborhood-data.py
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+import random
+import re
+import sys
+import time
+import urllib.parse
+import urllib.request
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PORTAL_URL = "https://data.cityofchicago.org"
+
+# ============================================
+# SoQL SUBSET
+# ============================================
+_TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<string>'(?:[^']|'')*')
+      | (?P<number>-?\d+(?:\.\d+)?)
+      | (?P<op><=|>=|!=|<>|=|<|>)
+      | (?P<punct>[(),])
+      | (?P<word>[A-Za-z_][A-Za-z0-9_.:]*)
+    )""", re.VERBOSE)
+
+
+def _tokenize(text):
+    tokens = []
+    pos = 0
+    text = text.strip()
+    while pos < len(text):
+        m = _TOKEN_RE.match(text, pos)
+        if not m or m.end() == pos:
+            raise ValueError(f"Unsupported $where syntax near: {text[pos:pos + 30]!r}")
+        pos = m.end()
+        kind = m.lastgroup
+        value = m.group(kind)
+        if kind == 'string':
+            value = value[1:-1].replace("''", "'")
+        tokens.append((kind, value))
+    return tokens
+
+
+def _compare(a, op, b):
+    try:
+        a, b = float(a), float(b)
+    except (TypeError, ValueError):
+        a, b = str(a), str(b)
+    if op == '=':
+        return a == b
+    if op in ('!=', '<>'):
+        return a != b
+    if op == '<':
+        return a < b
+    if op == '<=':
+        return a <= b
+    if op == '>':
+        return a > b
+    return a >= b
+
+
+def parse_where(where):
+    """Compile a $where expression into a row predicate."""
+    if not where:
+        return lambda row: True
+
+    tokens = _tokenize(where)
+    clauses = []
+    i = 0
+
+    def expect_word(word):
+        nonlocal i
+        if i >= len(tokens) or tokens[i][1].upper() != word:
+            raise ValueError(f"Expected {word} in $where: {where!r}")
+        i += 1
+
+    while i < len(tokens):
+        kind, field = tokens[i]
+        if kind != 'word':
+            raise ValueError(f"Expected field name in $where: {where!r}")
+        i += 1
+        keyword = tokens[i][1].upper() if i < len(tokens) else ''
+
+        if keyword == 'IS':
+            i += 1
+            negate = i < len(tokens) and tokens[i][1].upper() == 'NOT'
+            if negate:
+                i += 1
+            expect_word('NULL')
+            if negate:
+                clauses.append(lambda row, f=field: row.get(f) not in (None, ''))
+            else:
+                clauses.append(lambda row, f=field: row.get(f) in (None, ''))
+        elif keyword == 'IN':
+            i += 1
+            if tokens[i][1] != '(':
+                raise ValueError(f"Expected ( after IN in $where: {where!r}")
+            i += 1
+            values = set()
+            while tokens[i][1] != ')':
+                if tokens[i][0] in ('string', 'number'):
+                    values.add(tokens[i][1])
+                i += 1
+            i += 1
+            clauses.append(lambda row, f=field, v=frozenset(values): str(row.get(f)) in v)
+        elif i < len(tokens) and tokens[i][0] == 'op':
+            op = tokens[i][1]
+            literal = tokens[i + 1][1]
+            i += 2
+            clauses.append(
+                lambda row, f=field, o=op, v=literal: row.get(f) not in (None, '') and _compare(row[f], o, v)
+            )
+        else:
+            raise ValueError(f"Unsupported $where clause for {field!r}: {where!r}")
+
+        if i < len(tokens):
+            expect_word('AND')
+
+    return lambda row: all(clause(row) for clause in clauses)
+
+
+def run_query(rows, params):
+    """Apply $where, $order, $offset, $limit and $select to a list of rows."""
+    predicate = parse_where(params.get('$where'))
+    result = [row for row in rows if predicate(row)]
+
+    order = params.get('$order')
+    if order:
+        parts = order.split()
+        field = parts[0]
+        descending = len(parts) > 1 and parts[1].upper() == 'DESC'
+        result.sort(key=lambda row: str(row.get(field, '')), reverse=descending)
+
+    offset = int(params.get('$offset', 0))
+    limit = int(params.get('$limit', 1000))  # Socrata's default page size
+    result = result[offset:offset + limit]
+
+    select = params.get('$select')
+    if select and select.strip() != '*':
+        fields = [f.strip() for f in select.split(',')]
+        result = [{f: row[f] for f in fields if f in row} for row in result]
+        return result, fields
+
+    fields = []
+    for row in result:
+        for f in row:
+            if f not in fields:
+                fields.append(f)
+    return result, fields
+
+
+# ============================================
+# SERVER
+# ============================================
+class DatasetStore:
+    """Lazily loads <dataset_id>.json arrays from a directory and keeps them."""
+
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+        self.datasets = {}
+
+    def get(self, dataset_id):
+        if dataset_id not in self.datasets:
+            path = os.path.join(self.data_dir, f"{dataset_id}.json")
+            if not os.path.exists(path):
+                return None
+            with open(path) as f:
+                self.datasets[dataset_id] = json.load(f)
+        return self.datasets[dataset_id]
+
+
+def make_handler(store, latency_ms, jitter_ms):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            parsed = urllib.parse.urlparse(self.path)
+            m = re.fullmatch(r'/resource/([a-z0-9]{4}-[a-z0-9]{4})\.(json|csv)', parsed.path)
+            if not m:
+                return self.send_error_body(404, f"Unknown path {parsed.path}")
+            dataset_id, fmt = m.groups()
+
+            rows = store.get(dataset_id)
+            if rows is None:
+                return self.send_error_body(404, f"Dataset {dataset_id} not loaded")
+
+            params = dict(urllib.parse.parse_qsl(parsed.query, keep_blank_values=True))
+            try:
+                result, fields = run_query(rows, params)
+            except (ValueError, IndexError) as e:
+                return self.send_error_body(400, str(e))
+
+            if latency_ms or jitter_ms:
+                delay = latency_ms + random.uniform(-jitter_ms, jitter_ms)
+                time.sleep(max(0, delay) / 1000)
+
+            if fmt == 'csv':
+                out = io.StringIO()
+                writer = csv.writer(out)
+                writer.writerow(fields)
+                for row in result:
+                    writer.writerow([_csv_value(row.get(f)) for f in fields])
+                body = out.getvalue().encode('utf-8')
+                content_type = 'text/csv; charset=utf-8'
+            else:
+                body = json.dumps(result).encode('utf-8')
+                content_type = 'application/json; charset=utf-8'
+
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            if 'gzip' in self.headers.get('Accept-Encoding', ''):
+                body = gzip.compress(body, 6)
+                self.send_header('Content-Encoding', 'gzip')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def send_error_body(self, status, message):
+            body = json.dumps({'error': True, 'message': message}).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            sys.stderr.write(f"  [{self.log_date_time_string()}] {fmt % args}\n")
+
+    return Handler
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return value
+
+
+def serve(args):
+    store = DatasetStore(args.data_dir)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(store, args.latency_ms, args.jitter_ms))
+    print(f"Portal stand-in serving {args.data_dir} on http://{args.host}:{args.port}")
+    print(f"  Latency: {args.latency_ms}ms +/- {args.jitter_ms}ms")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+# ============================================
+# RECORD
+# ============================================
+def record(args):
+    os.makedirs(args.data_dir, exist_ok=True)
+    rows = []
+    offset = 0
+    while len(rows) < args.max_rows:
+        params = {'$limit': min(args.page_size, args.max_rows - len(rows)), '$offset': offset, '$order': ':id'}
+        if args.where:
+            params['$where'] = args.where
+        url = f"{PORTAL_URL}/resource/{args.dataset_id}.json?{urllib.parse.urlencode(params)}"
+        print(f"  Fetching offset {offset}...")
+        with urllib.request.urlopen(url, timeout=120) as response:
+            batch = json.loads(response.read().decode('utf-8'))
+        rows.extend(batch)
+        if len(batch) < params['$limit']:
+            break
+        offset += len(batch)
+
+    path = os.path.join(args.data_dir, f"{args.dataset_id}.json")
+    with open(path, 'w') as f:
+        json.dump(rows, f, separators=(',', ':'))
+    print(f"Recorded {len(rows):,} rows to {path}")
+
+
+# ============================================
+# SYNTHETIC DATA
+# ============================================
+def _synth_datasets(rng):
+    """Row generators shaped like the real portal datasets we query."""
+    now = datetime.now()
+
+    def ts(max_days=365):
+        dt = now - timedelta(days=rng.uniform(0, max_days))
+        return dt.strftime('%Y-%m-%dT%H:%M:%S.000')
+
+    def point():
+        # Cluster around block centers so aggregation has realistic duplication
+        lat = 41.65 + rng.randint(0, 200) * 0.002 + rng.uniform(-0.0008, 0.0008)
+        lng = -87.90 + rng.randint(0, 170) * 0.002 + rng.uniform(-0.0008, 0.0008)
+        return f"{lat:.9f}", f"{lng:.9f}"
+
+    def street():
+        return rng.choice(['CLARK', 'STATE', 'HALSTED', 'ASHLAND', 'WESTERN', 'PULASKI', 'CICERO'])
+
+    sr_types = [
+        'Pothole in Street Complaint', 'Street Light Out Complaint', 'Graffiti Removal Request',
+        'Fly Dumping Complaint', 'Rodent Baiting/Rat Complaint', 'Abandoned Vehicle Complaint',
+        'Tree Trim Request', 'Water On Street Complaint', 'Sewer Cleaning Inspection Request',
+        'Weed Removal Request', 'Sanitation Code Violation', 'Stray Animal Complaint',
+    ]
+
+    def sr_row(i):
+        lat, lng = point()
+        return {'sr_number': f"SR25-{i:08d}", 'sr_type': rng.choice(sr_types), 'created_date': ts(),
+                'latitude': lat, 'longitude': lng, 'ward': str(rng.randint(1, 50)),
+                'street_address': f"{rng.randint(1, 9999)} N {street()} ST"}
+
+    def crime_row(i):
+        lat, lng = point()
+        return {'id': str(13000000 + i), 'date': ts(), 'block': f"0{rng.randint(0, 99):02d}XX N {street()} ST",
+                'primary_type': rng.choice(['THEFT', 'BATTERY', 'ASSAULT', 'NARCOTICS', 'ROBBERY',
+                                            'CRIMINAL DAMAGE', 'WEAPONS VIOLATION', 'DECEPTIVE PRACTICE']),
+                'latitude': lat, 'longitude': lng, 'ward': str(rng.randint(1, 50)), 'arrest': rng.random() < 0.12}
+
+    def crash_row(i):
+        lat, lng = point()
+        return {'crash_record_id': f"{i:064x}"[-40:], 'crash_date': ts(), 'latitude': lat, 'longitude': lng,
+                'injuries_total': str(rng.choice([0, 0, 0, 1, 2])), 'injuries_fatal': str(int(rng.random() < 0.002)),
+                'hit_and_run_i': 'Y' if rng.random() < 0.2 else 'N', 'street_no': str(rng.randint(1, 9999)),
+                'street_direction': rng.choice(['N', 'S', 'E', 'W']), 'street_name': f"{street()} ST"}
+
+    def violation_row(i):
+        lat, lng = point()
+        return {'id': str(i), 'violation_date': ts(), 'violation_code': f"CN{rng.randint(10000, 19999)}",
+                'violation_description': rng.choice(['ARRANGE PREMISE INSPECTION', 'SMOKE DETECTORS',
+                                                     'REPAIR EXTERIOR WALL', 'ELECTRICAL HAZARD']),
+                'violation_status': rng.choice(['OPEN', 'COMPLIED', 'NO ENTRY']),
+                'address': f"{rng.randint(1, 9999)} N {street()} ST", 'latitude': lat, 'longitude': lng}
+
+    def pothole_row(i):
+        lat, lng = point()
+        row = {'service_request_number': f"SR25-{i:08d}", 'request_date': ts(),
+               'number_of_potholes_filled_on_block': str(rng.randint(0, 12)),
+               'address': f"{rng.randint(1, 9999)} N {street()} ST", 'latitude': lat, 'longitude': lng}
+        if rng.random() < 0.8:
+            row['completion_date'] = ts()
+        return row
+
+    def permit_row(i):
+        lat, lng = point()
+        return {'id': str(i), 'application_start_date': ts(),
+                'permit_status': rng.choice(['ISSUED', 'COMPLETE', 'ACTIVE', 'CANCELLED']),
+                'reported_cost': str(rng.randint(500, 500000)), 'latitude': lat, 'longitude': lng,
+                'street_number': str(rng.randint(1, 9999)), 'street_direction': rng.choice(['N', 'S', 'E', 'W']),
+                'street_name': street()}
+
+    def license_row(i):
+        lat, lng = point()
+        return {'id': str(i), 'date_issued': ts(), 'license_status': rng.choice(['AAI', 'AAC', 'REV']),
+                'address': f"{rng.randint(1, 9999)} N {street()} ST", 'latitude': lat, 'longitude': lng}
+
+    def tow_row(i):
+        return {'tow_date': ts(90)[:10] + 'T00:00:00.000', 'make': rng.choice(['TOYT', 'HOND', 'CHEV', 'FORD']),
+                'style': '4D', 'color': rng.choice(['BLK', 'WHI', 'SIL', 'GRY']),
+                'plate': f"{rng.randint(100000, 999999)}", 'state': 'IL',
+                'towed_to_address': rng.choice(['10300 S. Doty', '701 N. Sacramento', '400 E. Lower Wacker']),
+                'tow_facility_phone': '(773) 265-7605', 'inventory_number': str(7000000 + i)}
+
+    return {
+        'v6vf-nfxy': sr_row,
+        'ijzp-q8t2': crime_row,
+        '85ca-t3if': crash_row,
+        '22u3-xenr': violation_row,
+        'wqdh-9gek': pothole_row,
+        'ydr8-5enu': permit_row,
+        'r5kz-chrr': license_row,
+        'ygr5-vcbg': tow_row,
+    }
+
+
+def synth(args):
+    os.makedirs(args.data_dir, exist_ok=True)
+    rng = random.Random(args.seed)
+    for dataset_id, make_row in _synth_datasets(rng).items():
+        if args.datasets and dataset_id not in args.datasets:
+            continue
+        rows = [make_row(i) for i in range(args.rows)]
+        path = os.path.join(args.data_dir, f"{dataset_id}.json")
+        with open(path, 'w') as f:
+            json.dump(rows, f, separators=(',', ':'))
+        print(f"  {dataset_id}: {len(rows):,} rows -> {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chicago Data Portal stand-in server")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('serve', help='Serve datasets from a directory')
+    p.add_argument('--data-dir', required=True)
+    p.add_argument('--host', default='127.0.0.1')
+    p.add_argument('--port', type=int, default=8765)
+    p.add_argument('--latency-ms', type=float, default=0, help='Added delay per request')
+    p.add_argument('--jitter-ms', type=float, default=0, help='Random +/- variation on the delay')
+    p.set_defaults(func=serve)
+
+    p = sub.add_parser('record', help='Save a real dataset slice for replay')
+    p.add_argument('dataset_id')
+    p.add_argument('--data-dir', required=True)
+    p.add_argument('--where', default=None, help='SoQL $where to restrict the slice')
+    p.add_argument('--max-rows', type=int, default=200000)
+    p.add_argument('--page-size', type=int, default=50000)
+    p.set_defaults(func=record)
+
+    p = sub.add_parser('synth', help='Generate synthetic datasets')
+    p.add_argument('--data-dir', required=True)
+    p.add_argument('--rows', type=int, default=50000, help='Rows per dataset')
+    p.add_argument('--seed', type=int, default=42)
+    p.add_argument('--datasets', nargs='*', help='Only these dataset ids')
+    p.set_defaults(func=synth)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
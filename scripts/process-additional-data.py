@@ -8,16 +8,16 @@ Process additional Chicago neighborhood data:
 - Potholes Patched
 """
 
-import csv
 import json
 from collections import defaultdict
 from datetime import datetime, timedelta
 
-# Block size: ~0.002 degrees ≈ 220m ≈ 720 ft ≈ 1.5 Chicago blocks
-BLOCK_SIZE = 0.002
+from category_matcher import CategoryMatcher
+from csv_columns import read_columns
+from grid import cell_center, cell_id
+from layer_assets import publish_layers
 
-def round_to_block(lat, lng):
-    return (round(lat / BLOCK_SIZE) * BLOCK_SIZE, round(lng / BLOCK_SIZE) * BLOCK_SIZE)
+PUBLIC_DIR = '/home/randy-vollrath/ticketless-chicago/public'
 
 # ============================================
 # BUILDING PERMITS
@@ -35,13 +35,7 @@ def process_permits():
         'other': []
     }
 
-    def get_permit_type(permit_type_str):
-        pt = permit_type_str.upper() if permit_type_str else ''
-        for cat, keywords in PERMIT_TYPES.items():
-            for kw in keywords:
-                if kw in pt:
-                    return cat
-        return 'other'
+    get_permit_type = CategoryMatcher(PERMIT_TYPES, default='other', normalize=str.upper)
 
     blocks = defaultdict(lambda: {
         'count': 0,
@@ -56,42 +50,42 @@ def process_permits():
     row_count = 0
 
     with open('/home/randy-vollrath/Downloads/Building_Permits_20251224.csv', 'r', encoding='utf-8', errors='ignore') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
+        rows = read_columns(f, ['LATITUDE', 'LONGITUDE', 'PERMIT_TYPE', 'WARD', 'STREET_NUMBER',
+                                'STREET_DIRECTION', 'STREET_NAME', 'REPORTED_COST', 'ISSUE_DATE'])
+        for lat_str, lng_str, permit_type, ward, num, direction, name, cost, issue_date in rows:
             row_count += 1
             if row_count % 200000 == 0:
                 print(f"  Processed {row_count:,} rows...")
 
             try:
-                lat = float(row.get('LATITUDE', 0) or 0)
-                lng = float(row.get('LONGITUDE', 0) or 0)
+                lat = float(lat_str or 0)
+                lng = float(lng_str or 0)
             except:
                 continue
 
             if not (41.6 < lat < 42.1 and -88.0 < lng < -87.5):
                 continue
 
-            block_key = round_to_block(lat, lng)
+            block_key = cell_id(lat, lng)
             blocks[block_key]['count'] += 1
 
-            ptype = get_permit_type(row.get('PERMIT_TYPE', ''))
+            ptype = get_permit_type(permit_type)
             blocks[block_key]['categories'][ptype] += 1
 
             if not blocks[block_key]['ward']:
-                blocks[block_key]['ward'] = row.get('WARD', '')
+                blocks[block_key]['ward'] = ward
             if not blocks[block_key]['address']:
-                addr = f"{row.get('STREET_NUMBER', '')} {row.get('STREET_DIRECTION', '')} {row.get('STREET_NAME', '')}".strip()
+                addr = f"{num} {direction} {name}".strip()
                 blocks[block_key]['address'] = addr
 
             try:
-                cost = row.get('REPORTED_COST', '').replace('$', '').replace(',', '')
+                cost = cost.replace('$', '').replace(',', '')
                 if cost:
                     blocks[block_key]['total_cost'] += float(cost)
             except:
                 pass
 
             try:
-                issue_date = row.get('ISSUE_DATE', '')
                 if issue_date:
                     dt = datetime.strptime(issue_date, '%m/%d/%Y')
                     if dt >= cutoff:
@@ -106,10 +100,11 @@ def process_permits():
     print(f"  Blocks with 5+ permits: {len(filtered):,}")
 
     data = []
-    for (lat, lng), block in filtered.items():
+    for cell, block in filtered.items():
+        lat, lng = cell_center(cell)
         score = min(100, int(block['count'] / 100 * 50 + (block['total_cost'] / 1000000) * 50))
         data.append([
-            round(lat, 4), round(lng, 4), block['count'], score,
+            lat, lng, block['count'], score,
             dict(block['categories']), block['ward'] or '', block['address'] or '',
             int(block['total_cost']), block['recent_count']
         ])
@@ -134,7 +129,7 @@ def process_permits():
         'data': data
     }
 
-    with open('/home/randy-vollrath/ticketless-chicago/public/permits-data.json', 'w') as f:
+    with open(f'{PUBLIC_DIR}/permits-data.json', 'w') as f:
         json.dump(output, f, separators=(',', ':'))
 
     print(f"  Output: permits-data.json ({len(json.dumps(output)) / 1024:.1f} KB)")
@@ -154,13 +149,7 @@ def process_licenses():
         'other': []
     }
 
-    def get_license_type(desc):
-        d = desc.upper() if desc else ''
-        for cat, keywords in LICENSE_TYPES.items():
-            for kw in keywords:
-                if kw in d:
-                    return cat
-        return 'other'
+    get_license_type = CategoryMatcher(LICENSE_TYPES, default='other', normalize=str.upper)
 
     blocks = defaultdict(lambda: {
         'count': 0,
@@ -173,33 +162,33 @@ def process_licenses():
     row_count = 0
 
     with open('/home/randy-vollrath/Downloads/Business_Licenses_20251224.csv', 'r', encoding='utf-8', errors='ignore') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
+        rows = read_columns(f, ['LATITUDE', 'LONGITUDE', 'LICENSE DESCRIPTION', 'WARD', 'ADDRESS', 'LICENSE STATUS'])
+        for lat_str, lng_str, description, ward, address, status in rows:
             row_count += 1
             if row_count % 200000 == 0:
                 print(f"  Processed {row_count:,} rows...")
 
             try:
-                lat = float(row.get('LATITUDE', 0) or 0)
-                lng = float(row.get('LONGITUDE', 0) or 0)
+                lat = float(lat_str or 0)
+                lng = float(lng_str or 0)
             except:
                 continue
 
             if not (41.6 < lat < 42.1 and -88.0 < lng < -87.5):
                 continue
 
-            block_key = round_to_block(lat, lng)
+            block_key = cell_id(lat, lng)
             blocks[block_key]['count'] += 1
 
-            ltype = get_license_type(row.get('LICENSE DESCRIPTION', ''))
+            ltype = get_license_type(description)
             blocks[block_key]['categories'][ltype] += 1
 
             if not blocks[block_key]['ward']:
-                blocks[block_key]['ward'] = row.get('WARD', '')
+                blocks[block_key]['ward'] = ward
             if not blocks[block_key]['address']:
-                blocks[block_key]['address'] = row.get('ADDRESS', '')
+                blocks[block_key]['address'] = address
 
-            status = row.get('LICENSE STATUS', '').upper()
+            status = status.upper()
             if status in ['AAI', 'AAC', 'ISSUED']:
                 blocks[block_key]['active'] += 1
 
@@ -210,10 +199,11 @@ def process_licenses():
     print(f"  Blocks with 3+ licenses: {len(filtered):,}")
 
     data = []
-    for (lat, lng), block in filtered.items():
+    for cell, block in filtered.items():
+        lat, lng = cell_center(cell)
         score = min(100, int(block['count'] / 50 * 100))
         data.append([
-            round(lat, 4), round(lng, 4), block['count'], score,
+            lat, lng, block['count'], score,
             dict(block['categories']), block['ward'] or '', block['address'] or '',
             block['active']
         ])
@@ -237,7 +227,7 @@ def process_licenses():
         'data': data
     }
 
-    with open('/home/randy-vollrath/ticketless-chicago/public/licenses-data.json', 'w') as f:
+    with open(f'{PUBLIC_DIR}/licenses-data.json', 'w') as f:
         json.dump(output, f, separators=(',', ':'))
 
     print(f"  Output: licenses-data.json ({len(json.dumps(output)) / 1024:.1f} KB)")
@@ -252,20 +242,19 @@ def process_camera_violations():
     rl_cameras = defaultdict(lambda: {'violations': 0, 'lat': 0, 'lng': 0, 'address': '', 'intersection': ''})
 
     with open('/home/randy-vollrath/Downloads/Red_Light_Camera_Violations_20251224.csv', 'r', encoding='utf-8', errors='ignore') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
+        rows = read_columns(f, ['CAMERA ID', 'VIOLATIONS', 'LATITUDE', 'LONGITUDE', 'ADDRESS', 'INTERSECTION'])
+        for camera_id, violations_str, lat_str, lng_str, address, intersection in rows:
             try:
-                camera_id = row.get('CAMERA ID', '')
-                violations = int(float(row.get('VIOLATIONS', 0) or 0))
-                lat = float(row.get('LATITUDE', 0) or 0)
-                lng = float(row.get('LONGITUDE', 0) or 0)
+                violations = int(float(violations_str or 0))
+                lat = float(lat_str or 0)
+                lng = float(lng_str or 0)
 
                 if camera_id and violations > 0 and lat and lng:
                     rl_cameras[camera_id]['violations'] += violations
                     rl_cameras[camera_id]['lat'] = lat
                     rl_cameras[camera_id]['lng'] = lng
-                    rl_cameras[camera_id]['address'] = row.get('ADDRESS', '')
-                    rl_cameras[camera_id]['intersection'] = row.get('INTERSECTION', '')
+                    rl_cameras[camera_id]['address'] = address
+                    rl_cameras[camera_id]['intersection'] = intersection
             except:
                 continue
 
@@ -275,19 +264,18 @@ def process_camera_violations():
     speed_cameras = defaultdict(lambda: {'violations': 0, 'lat': 0, 'lng': 0, 'address': ''})
 
     with open('/home/randy-vollrath/Downloads/Speed_Camera_Violations_20251224.csv', 'r', encoding='utf-8', errors='ignore') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
+        rows = read_columns(f, ['CAMERA ID', 'VIOLATIONS', 'LATITUDE', 'LONGITUDE', 'ADDRESS'])
+        for camera_id, violations_str, lat_str, lng_str, address in rows:
             try:
-                camera_id = row.get('CAMERA ID', '')
-                violations = int(float(row.get('VIOLATIONS', 0) or 0))
-                lat = float(row.get('LATITUDE', 0) or 0)
-                lng = float(row.get('LONGITUDE', 0) or 0)
+                violations = int(float(violations_str or 0))
+                lat = float(lat_str or 0)
+                lng = float(lng_str or 0)
 
                 if camera_id and violations > 0 and lat and lng:
                     speed_cameras[camera_id]['violations'] += violations
                     speed_cameras[camera_id]['lat'] = lat
                     speed_cameras[camera_id]['lng'] = lng
-                    speed_cameras[camera_id]['address'] = row.get('ADDRESS', '')
+                    speed_cameras[camera_id]['address'] = address
             except:
                 continue
 
@@ -309,7 +297,7 @@ def process_camera_violations():
         'data': rl_data
     }
 
-    with open('/home/randy-vollrath/ticketless-chicago/public/redlight-violations.json', 'w') as f:
+    with open(f'{PUBLIC_DIR}/redlight-violations.json', 'w') as f:
         json.dump(rl_output, f, separators=(',', ':'))
 
     print(f"  Output: redlight-violations.json ({len(json.dumps(rl_output)) / 1024:.1f} KB)")
@@ -330,7 +318,7 @@ def process_camera_violations():
         'data': speed_data
     }
 
-    with open('/home/randy-vollrath/ticketless-chicago/public/speed-violations.json', 'w') as f:
+    with open(f'{PUBLIC_DIR}/speed-violations.json', 'w') as f:
         json.dump(speed_output, f, separators=(',', ':'))
 
     print(f"  Output: speed-violations.json ({len(json.dumps(speed_output)) / 1024:.1f} KB)")
@@ -352,33 +340,33 @@ def process_potholes():
     row_count = 0
 
     with open('/home/randy-vollrath/Downloads/Potholes_Patched_20251224.csv', 'r', encoding='utf-8', errors='ignore') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
+        rows = read_columns(f, ['LATITUDE', 'LONGITUDE', 'NUMBER OF POTHOLES FILLED ON BLOCK', 'ADDRESS', 'REQUEST DATE'])
+        for lat_str, lng_str, filled, address, request_date in rows:
             row_count += 1
 
             try:
-                lat = float(row.get('LATITUDE', 0) or 0)
-                lng = float(row.get('LONGITUDE', 0) or 0)
+                lat = float(lat_str or 0)
+                lng = float(lng_str or 0)
             except:
                 continue
 
             if not (41.6 < lat < 42.1 and -88.0 < lng < -87.5):
                 continue
 
-            block_key = round_to_block(lat, lng)
+            block_key = cell_id(lat, lng)
             blocks[block_key]['count'] += 1
 
             try:
-                potholes = int(row.get('NUMBER OF POTHOLES FILLED ON BLOCK', 1) or 1)
+                potholes = int(filled or 1)
                 blocks[block_key]['potholes_filled'] += potholes
             except:
                 blocks[block_key]['potholes_filled'] += 1
 
             if not blocks[block_key]['address']:
-                blocks[block_key]['address'] = row.get('ADDRESS', '')
+                blocks[block_key]['address'] = address
 
             try:
-                req_date = row.get('REQUEST DATE', '').split()[0]
+                req_date = request_date.split()[0]
                 if req_date:
                     dt = datetime.strptime(req_date, '%m/%d/%Y')
                     if dt >= cutoff:
@@ -393,10 +381,11 @@ def process_potholes():
     print(f"  Blocks with 3+ repairs: {len(filtered):,}")
 
     data = []
-    for (lat, lng), block in filtered.items():
+    for cell, block in filtered.items():
+        lat, lng = cell_center(cell)
         score = min(100, int(block['potholes_filled'] / 50 * 100))
         data.append([
-            round(lat, 4), round(lng, 4), block['count'],
+            lat, lng, block['count'],
             block['potholes_filled'], score, block['address'] or '', block['recent_count']
         ])
 
@@ -412,7 +401,7 @@ def process_potholes():
         'data': data
     }
 
-    with open('/home/randy-vollrath/ticketless-chicago/public/potholes-data.json', 'w') as f:
+    with open(f'{PUBLIC_DIR}/potholes-data.json', 'w') as f:
         json.dump(output, f, separators=(',', ':'))
 
     print(f"  Output: potholes-data.json ({len(json.dumps(output)) / 1024:.1f} KB)")
@@ -427,6 +416,10 @@ if __name__ == '__main__':
     process_camera_violations()
     process_potholes()
 
+    published = publish_layers(PUBLIC_DIR, ['permits-data.json', 'licenses-data.json', 'redlight-violations.json',
+                                            'speed-violations.json', 'potholes-data.json'])
+    print(f"\n  Published {published} hashed assets (manifest: public/layer-manifest.json)")
+
     print("\n" + "=" * 50)
     print("All additional data processed!")
     print("=" * 50)
@@ -1,122 +1,213 @@
 #!/usr/bin/env python3
 """
 Process Chicago neighborhood data (311, Crimes, Crashes) into aggregated blocks for the map.
+
+USAGE:
+  python3 scripts/process-neighborhood-data.py                 # single process
+  python3 scripts/process-neighborhood-data.py --workers 8     # shard each CSV across 8 cores
+  python3 scripts/process-neighborhood-data.py --engine rows   # per-row loops, no numpy
+
+The default engine aggregates chunks of rows with numpy (block_engine.py) and
+falls back to the per-row loops when numpy is not installed.
 """
 
-import csv
+import argparse
 import json
-from collections import defaultdict
 from datetime import datetime, timedelta
-
-# Block size: ~0.002 degrees ≈ 220m ≈ 720 ft ≈ 1.5 Chicago blocks
-BLOCK_SIZE = 0.002
-
-def round_to_block(lat, lng):
-    """Round coordinates to block grid."""
-    return (round(lat / BLOCK_SIZE) * BLOCK_SIZE, round(lng / BLOCK_SIZE) * BLOCK_SIZE)
+from functools import partial
+
+from category_matcher import CategoryMatcher
+from csv_columns import read_columns
+from csv_shards import map_csv_shards
+from grid import cell_center, cell_id
+from layer_assets import publish_layers
+
+try:
+    import numpy as np
+    from block_engine import (BlockAggregator, cell_ids, in_chicago, iter_column_chunks, map_distinct,
+                              parse_floats, select)
+except ImportError:  # numpy not installed: per-row aggregation only
+    np = None
+
+DOWNLOADS_DIR = '/home/randy-vollrath/Downloads'
+PUBLIC_DIR = '/home/randy-vollrath/ticketless-chicago/public'
+
+def merge_block_partials(parts, sum_fields, first_fields):
+    """
+    Merge per-shard block tables (in file order) into one table, exactly as if
+    the shards had been aggregated in a single pass: counters and category
+    counts add up, and first_fields keep the first non-empty value seen.
+    """
+    merged = {}
+    for part in parts:
+        for key, block in part.items():
+            into = merged.get(key)
+            if into is None:
+                merged[key] = block
+                continue
+            for field in sum_fields:
+                into[field] += block[field]
+            if 'categories' in into:
+                cats = into['categories']
+                for cat, n in block['categories'].items():
+                    cats[cat] = cats.get(cat, 0) + n
+            for field in first_fields:
+                if not into[field]:
+                    into[field] = block[field]
+    return merged
+
+def aggregate_csv(path, columns, aggregate, args, workers, sum_fields, first_fields):
+    """Run aggregate over path, sharded across workers when workers > 1."""
+    if workers <= 1:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            return aggregate(read_columns(f, columns), *args, progress=True)
+
+    parts = map_csv_shards(path, partial(read_columns, columns=columns), aggregate, args, workers)
+    blocks = merge_block_partials([blocks for blocks, _ in parts], sum_fields, first_fields)
+    return blocks, sum(row_count for _, row_count in parts)
 
 # ============================================
 # 311 SERVICE REQUESTS
 # ============================================
-def process_311():
-    print("Processing 311 Service Requests...")
-
-    # Categories we care about (relevant to neighborhood quality)
-    RELEVANT_CATEGORIES = {
-        'infrastructure': [
-            'Pothole in Street Complaint', 'Alley Pothole Complaint',
-            'Street Light Out Complaint', 'Alley Light Out Complaint',
-            'Traffic Signal Out Complaint', 'Sign Repair Request',
-            'Sidewalk Inspection Request'
-        ],
-        'sanitation': [
-            'Graffiti Removal Request', 'Garbage Cart Maintenance',
-            'Fly Dumping Complaint', 'Sanitation Code Violation',
-            'Dead Animal Pick-Up Request'
-        ],
-        'pests': [
-            'Rodent Baiting/Rat Complaint', 'Stray Animal Complaint'
-        ],
-        'vehicles': [
-            'Abandoned Vehicle Complaint'
-        ],
-        'trees': [
-            'Tree Trim Request', 'Tree Debris Clean-Up Request',
-            'Tree Emergency', 'Weed Removal Request'
-        ],
-        'water': [
-            'Water On Street Complaint', 'Sewer Cleaning Inspection Request',
-            'Check for Leak'
-        ]
-    }
-
-    # Flatten for quick lookup
-    type_to_category = {}
-    for cat, types in RELEVANT_CATEGORIES.items():
-        for t in types:
-            type_to_category[t] = cat
-
-    blocks = defaultdict(lambda: {
-        'count': 0,
-        'categories': defaultdict(int),
-        'ward': None,
-        'address': None,
-        'recent_count': 0  # last 90 days
-    })
 
-    cutoff_date = datetime.now() - timedelta(days=90)
+# Categories we care about (relevant to neighborhood quality)
+RELEVANT_CATEGORIES = {
+    'infrastructure': [
+        'Pothole in Street Complaint', 'Alley Pothole Complaint',
+        'Street Light Out Complaint', 'Alley Light Out Complaint',
+        'Traffic Signal Out Complaint', 'Sign Repair Request',
+        'Sidewalk Inspection Request'
+    ],
+    'sanitation': [
+        'Graffiti Removal Request', 'Garbage Cart Maintenance',
+        'Fly Dumping Complaint', 'Sanitation Code Violation',
+        'Dead Animal Pick-Up Request'
+    ],
+    'pests': [
+        'Rodent Baiting/Rat Complaint', 'Stray Animal Complaint'
+    ],
+    'vehicles': [
+        'Abandoned Vehicle Complaint'
+    ],
+    'trees': [
+        'Tree Trim Request', 'Tree Debris Clean-Up Request',
+        'Tree Emergency', 'Weed Removal Request'
+    ],
+    'water': [
+        'Water On Street Complaint', 'Sewer Cleaning Inspection Request',
+        'Check for Leak'
+    ]
+}
+
+# Memoized per distinct SR_TYPE; info-only calls and aircraft noise are skipped
+classify_sr_type = CategoryMatcher(RELEVANT_CATEGORIES, exclude=['INFORMATION ONLY', 'Aircraft'])
+
+COLUMNS_311 = ['SR_TYPE', 'LATITUDE', 'LONGITUDE', 'WARD', 'STREET_ADDRESS', 'CREATED_DATE']
+SUM_FIELDS_311 = ['count', 'recent_count']
+FIRST_FIELDS_311 = ['ward', 'address']
+
+def aggregate_311(rows, cutoff_date, progress=False):
+    """Aggregate 311 rows into {block_key: block}. Returns (blocks, row_count)."""
+    blocks = {}
     row_count = 0
 
-    with open('/home/randy-vollrath/Downloads/311_Service_Requests_20251224.csv', 'r', encoding='utf-8', errors='ignore') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            row_count += 1
-            if row_count % 500000 == 0:
-                print(f"  Processed {row_count:,} rows...")
+    for sr_type, lat_str, lng_str, ward, address, created in rows:
+        row_count += 1
+        if progress and row_count % 500000 == 0:
+            print(f"  Processed {row_count:,} rows...")
+
+        category = classify_sr_type(sr_type)
+        if not category:
+            continue
+
+        try:
+            lat = float(lat_str)
+            lng = float(lng_str)
+        except:
+            continue
+
+        if not (41.6 < lat < 42.1 and -88.0 < lng < -87.5):
+            continue
+
+        block_key = cell_id(lat, lng)
+        block = blocks.get(block_key)
+        if block is None:
+            block = blocks[block_key] = {
+                'count': 0,
+                'categories': {},
+                'ward': None,
+                'address': None,
+                'recent_count': 0  # last 90 days
+            }
+        block['count'] += 1
+        block['categories'][category] = block['categories'].get(category, 0) + 1
+
+        if not block['ward']:
+            block['ward'] = ward
+        if not block['address']:
+            block['address'] = address
+
+        # Check if recent
+        try:
+            if created:
+                dt = datetime.strptime(created.split()[0], '%m/%d/%Y')
+                if dt >= cutoff_date:
+                    block['recent_count'] += 1
+        except:
+            pass
+
+    return blocks, row_count
+
+def aggregate_311_arrays(rows, cutoff_date, progress=False):
+    """Chunked numpy version of aggregate_311 with identical results."""
+    categories = list(RELEVANT_CATEGORIES)
+    category_ids = {name: i for i, name in enumerate(categories)}
+    agg = BlockAggregator(categories, sum_fields=['recent_count'], first_fields=['ward', 'address'])
+
+    def category_id(sr_type):
+        return category_ids.get(classify_sr_type(sr_type), -1)
+
+    recent_by_date = {}
+
+    def is_recent(created):
+        try:
+            if created:
+                day = created.split()[0]
+                recent = recent_by_date.get(day)
+                if recent is None:
+                    recent = recent_by_date[day] = datetime.strptime(day, '%m/%d/%Y') >= cutoff_date
+                return recent
+        except:
+            pass
+        return False
 
-            sr_type = row.get('SR_TYPE', '')
+    row_count = 0
+    for n, columns in iter_column_chunks(rows, progress_every=500000 if progress else 0):
+        row_count += n
+        sr_type, lat_str, lng_str, ward, address, created = columns
 
-            # Skip info-only calls and aircraft noise
-            if 'INFORMATION ONLY' in sr_type or 'Aircraft' in sr_type:
-                continue
+        cats = map_distinct(sr_type, category_id, np.int64)
+        lat = parse_floats(lat_str)
+        lng = parse_floats(lng_str)
+        keep = (cats >= 0) & in_chicago(lat, lng)
 
-            # Find matching category
-            category = None
-            for type_name, cat in type_to_category.items():
-                if type_name in sr_type:
-                    category = cat
-                    break
+        agg.add(
+            cell_ids(lat[keep], lng[keep]),
+            category_ids=cats[keep],
+            sums={'recent_count': map_distinct(select(created, keep), is_recent, np.int64)},
+            firsts={'ward': select(ward, keep), 'address': select(address, keep)},
+        )
 
-            if not category:
-                continue
+    return agg.blocks(), row_count
 
-            try:
-                lat = float(row.get('LATITUDE', 0))
-                lng = float(row.get('LONGITUDE', 0))
-            except:
-                continue
-
-            if not (41.6 < lat < 42.1 and -88.0 < lng < -87.5):
-                continue
+def process_311(workers=1, engine='rows'):
+    print("Processing 311 Service Requests...")
 
-            block_key = round_to_block(lat, lng)
-            blocks[block_key]['count'] += 1
-            blocks[block_key]['categories'][category] += 1
-
-            if not blocks[block_key]['ward']:
-                blocks[block_key]['ward'] = row.get('WARD', '')
-            if not blocks[block_key]['address']:
-                blocks[block_key]['address'] = row.get('STREET_ADDRESS', '')
-
-            # Check if recent
-            try:
-                created = row.get('CREATED_DATE', '')
-                if created:
-                    dt = datetime.strptime(created.split()[0], '%m/%d/%Y')
-                    if dt >= cutoff_date:
-                        blocks[block_key]['recent_count'] += 1
-            except:
-                pass
+    cutoff_date = datetime.now() - timedelta(days=90)
+    blocks, row_count = aggregate_csv(
+        f'{DOWNLOADS_DIR}/311_Service_Requests_20251224.csv', COLUMNS_311,
+        aggregate_311_arrays if engine == 'numpy' else aggregate_311, (cutoff_date,), workers,
+        sum_fields=SUM_FIELDS_311, first_fields=FIRST_FIELDS_311)
 
     print(f"  Total rows: {row_count:,}")
     print(f"  Total blocks with data: {len(blocks):,}")
@@ -127,13 +218,14 @@ def process_311():
 
     # Build output data
     data = []
-    for (lat, lng), block in filtered.items():
+    for cell, block in filtered.items():
+        lat, lng = cell_center(cell)
         # Calculate activity score (0-100)
         score = min(100, int(block['count'] / 50 * 100))
 
         data.append([
-            round(lat, 4),
-            round(lng, 4),
+            lat,
+            lng,
             block['count'],
             score,
             dict(block['categories']),
@@ -162,7 +254,7 @@ def process_311():
         'data': data
     }
 
-    with open('/home/randy-vollrath/ticketless-chicago/public/311-data.json', 'w') as f:
+    with open(f'{PUBLIC_DIR}/311-data.json', 'w') as f:
         json.dump(output, f, separators=(',', ':'))
 
     print(f"  Output: public/311-data.json ({len(json.dumps(output)) / 1024:.1f} KB)")
@@ -171,62 +263,103 @@ def process_311():
 # ============================================
 # CRIMES
 # ============================================
-def process_crimes():
-    print("\nProcessing Crimes data...")
-
-    CRIME_CATEGORIES = {
-        'violent': ['HOMICIDE', 'ROBBERY', 'ASSAULT', 'BATTERY', 'CRIMINAL SEXUAL ASSAULT'],
-        'property': ['THEFT', 'BURGLARY', 'MOTOR VEHICLE THEFT', 'CRIMINAL DAMAGE', 'ARSON'],
-        'drugs': ['NARCOTICS'],
-        'weapons': ['WEAPONS VIOLATION'],
-        'other': ['OTHER OFFENSE', 'DECEPTIVE PRACTICE', 'CRIMINAL TRESPASS']
-    }
-
-    type_to_category = {}
-    for cat, types in CRIME_CATEGORIES.items():
-        for t in types:
-            type_to_category[t] = cat
-
-    blocks = defaultdict(lambda: {
-        'count': 0,
-        'categories': defaultdict(int),
-        'ward': None,
-        'address': None,
-        'arrests': 0
-    })
 
+CRIME_CATEGORIES = {
+    'violent': ['HOMICIDE', 'ROBBERY', 'ASSAULT', 'BATTERY', 'CRIMINAL SEXUAL ASSAULT'],
+    'property': ['THEFT', 'BURGLARY', 'MOTOR VEHICLE THEFT', 'CRIMINAL DAMAGE', 'ARSON'],
+    'drugs': ['NARCOTICS'],
+    'weapons': ['WEAPONS VIOLATION'],
+    'other': ['OTHER OFFENSE', 'DECEPTIVE PRACTICE', 'CRIMINAL TRESPASS']
+}
+
+CRIME_TYPE_TO_CATEGORY = {}
+for cat, types in CRIME_CATEGORIES.items():
+    for t in types:
+        CRIME_TYPE_TO_CATEGORY[t] = cat
+
+COLUMNS_CRIMES = [' PRIMARY DESCRIPTION', 'LATITUDE', 'LONGITUDE', 'WARD', 'BLOCK', 'ARREST']
+SUM_FIELDS_CRIMES = ['count', 'arrests']
+FIRST_FIELDS_CRIMES = ['ward', 'address']
+
+def aggregate_crimes(rows, progress=False):
+    """Aggregate crime rows into {block_key: block}. Returns (blocks, row_count)."""
+    blocks = {}
     row_count = 0
 
-    with open('/home/randy-vollrath/Downloads/Crimes_-_One_year_prior_to_present_20251224.csv', 'r', encoding='utf-8', errors='ignore') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            row_count += 1
-            if row_count % 50000 == 0:
-                print(f"  Processed {row_count:,} rows...")
+    for crime_type, lat_str, lng_str, ward, address, arrest in rows:
+        row_count += 1
+        if progress and row_count % 50000 == 0:
+            print(f"  Processed {row_count:,} rows...")
+
+        category = CRIME_TYPE_TO_CATEGORY.get(crime_type.strip(), 'other')
+
+        try:
+            lat = float(lat_str)
+            lng = float(lng_str)
+        except:
+            continue
+
+        if not (41.6 < lat < 42.1 and -88.0 < lng < -87.5):
+            continue
+
+        block_key = cell_id(lat, lng)
+        block = blocks.get(block_key)
+        if block is None:
+            block = blocks[block_key] = {
+                'count': 0,
+                'categories': {},
+                'ward': None,
+                'address': None,
+                'arrests': 0
+            }
+        block['count'] += 1
+        block['categories'][category] = block['categories'].get(category, 0) + 1
+
+        if not block['ward']:
+            block['ward'] = ward
+        if not block['address']:
+            block['address'] = address
+
+        if arrest.upper() == 'Y':
+            block['arrests'] += 1
+
+    return blocks, row_count
+
+def aggregate_crimes_arrays(rows, progress=False):
+    """Chunked numpy version of aggregate_crimes with identical results."""
+    categories = list(CRIME_CATEGORIES)
+    category_ids = {name: i for i, name in enumerate(categories)}
+    other = category_ids['other']
+    agg = BlockAggregator(categories, sum_fields=['arrests'], first_fields=['ward', 'address'])
+
+    def category_id(crime_type):
+        return category_ids.get(CRIME_TYPE_TO_CATEGORY.get(crime_type.strip()), other)
 
-            crime_type = row.get(' PRIMARY DESCRIPTION', '').strip()
-            category = type_to_category.get(crime_type, 'other')
+    row_count = 0
+    for n, columns in iter_column_chunks(rows, progress_every=50000 if progress else 0):
+        row_count += n
+        crime_type, lat_str, lng_str, ward, address, arrest = columns
 
-            try:
-                lat = float(row.get('LATITUDE', 0))
-                lng = float(row.get('LONGITUDE', 0))
-            except:
-                continue
+        lat = parse_floats(lat_str)
+        lng = parse_floats(lng_str)
+        keep = in_chicago(lat, lng)
 
-            if not (41.6 < lat < 42.1 and -88.0 < lng < -87.5):
-                continue
+        agg.add(
+            cell_ids(lat[keep], lng[keep]),
+            category_ids=map_distinct(crime_type, category_id, np.int64)[keep],
+            sums={'arrests': map_distinct(arrest, lambda a: a.upper() == 'Y', np.int64)[keep]},
+            firsts={'ward': select(ward, keep), 'address': select(address, keep)},
+        )
 
-            block_key = round_to_block(lat, lng)
-            blocks[block_key]['count'] += 1
-            blocks[block_key]['categories'][category] += 1
+    return agg.blocks(), row_count
 
-            if not blocks[block_key]['ward']:
-                blocks[block_key]['ward'] = row.get('WARD', '')
-            if not blocks[block_key]['address']:
-                blocks[block_key]['address'] = row.get('BLOCK', '')
+def process_crimes(workers=1, engine='rows'):
+    print("\nProcessing Crimes data...")
 
-            if row.get('ARREST', '').upper() == 'Y':
-                blocks[block_key]['arrests'] += 1
+    blocks, row_count = aggregate_csv(
+        f'{DOWNLOADS_DIR}/Crimes_-_One_year_prior_to_present_20251224.csv', COLUMNS_CRIMES,
+        aggregate_crimes_arrays if engine == 'numpy' else aggregate_crimes, (), workers,
+        sum_fields=SUM_FIELDS_CRIMES, first_fields=FIRST_FIELDS_CRIMES)
 
     print(f"  Total crimes: {row_count:,}")
     print(f"  Total blocks with crimes: {len(blocks):,}")
@@ -236,15 +369,16 @@ def process_crimes():
     print(f"  Blocks with 5+ crimes: {len(filtered):,}")
 
     data = []
-    for (lat, lng), block in filtered.items():
+    for cell, block in filtered.items():
+        lat, lng = cell_center(cell)
         # Calculate crime severity score (0-100)
         violent = block['categories'].get('violent', 0)
         property_crime = block['categories'].get('property', 0)
         score = min(100, int((violent * 3 + property_crime) / block['count'] * 50 + block['count'] / 20 * 25))
 
         data.append([
-            round(lat, 4),
-            round(lng, 4),
+            lat,
+            lng,
             block['count'],
             score,
             dict(block['categories']),
@@ -272,7 +406,7 @@ def process_crimes():
         'data': data
     }
 
-    with open('/home/randy-vollrath/ticketless-chicago/public/crimes-data.json', 'w') as f:
+    with open(f'{PUBLIC_DIR}/crimes-data.json', 'w') as f:
         json.dump(output, f, separators=(',', ':'))
 
     print(f"  Output: public/crimes-data.json ({len(json.dumps(output)) / 1024:.1f} KB)")
@@ -281,52 +415,104 @@ def process_crimes():
 # ============================================
 # TRAFFIC CRASHES
 # ============================================
-def process_crashes():
-    print("\nProcessing Traffic Crashes...")
 
-    blocks = defaultdict(lambda: {
-        'count': 0,
-        'injuries': 0,
-        'fatal': 0,
-        'hit_and_run': 0,
-        'address': None
-    })
+COLUMNS_CRASHES = ['LATITUDE', 'LONGITUDE', 'INJURIES_TOTAL', 'INJURIES_FATAL', 'HIT_AND_RUN_I',
+                   'STREET_NAME', 'STREET_DIRECTION', 'STREET_NO']
+SUM_FIELDS_CRASHES = ['count', 'injuries', 'fatal', 'hit_and_run']
+FIRST_FIELDS_CRASHES = ['address']
 
+def aggregate_crashes(rows, progress=False):
+    """Aggregate crash rows into {block_key: block}. Returns (blocks, row_count)."""
+    blocks = {}
     row_count = 0
 
-    with open('/home/randy-vollrath/Downloads/Traffic_Crashes_-_Crashes_20251224.csv', 'r', encoding='utf-8', errors='ignore') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            row_count += 1
-            if row_count % 100000 == 0:
-                print(f"  Processed {row_count:,} rows...")
-
-            try:
-                lat = float(row.get('LATITUDE', 0))
-                lng = float(row.get('LONGITUDE', 0))
-            except:
-                continue
-
-            if not (41.6 < lat < 42.1 and -88.0 < lng < -87.5):
-                continue
-
-            block_key = round_to_block(lat, lng)
-            blocks[block_key]['count'] += 1
-
-            try:
-                blocks[block_key]['injuries'] += int(row.get('INJURIES_TOTAL', 0) or 0)
-                blocks[block_key]['fatal'] += int(row.get('INJURIES_FATAL', 0) or 0)
-            except:
-                pass
+    for lat_str, lng_str, injuries, fatal, hit_and_run, street, direction, num in rows:
+        row_count += 1
+        if progress and row_count % 100000 == 0:
+            print(f"  Processed {row_count:,} rows...")
+
+        try:
+            lat = float(lat_str)
+            lng = float(lng_str)
+        except:
+            continue
+
+        if not (41.6 < lat < 42.1 and -88.0 < lng < -87.5):
+            continue
+
+        block_key = cell_id(lat, lng)
+        block = blocks.get(block_key)
+        if block is None:
+            block = blocks[block_key] = {
+                'count': 0,
+                'injuries': 0,
+                'fatal': 0,
+                'hit_and_run': 0,
+                'address': None
+            }
+        block['count'] += 1
+
+        try:
+            block['injuries'] += int(injuries or 0)
+            block['fatal'] += int(fatal or 0)
+        except:
+            pass
+
+        if hit_and_run.upper() == 'Y':
+            block['hit_and_run'] += 1
+
+        if not block['address']:
+            block['address'] = f"{num} {direction} {street}".strip()
+
+    return blocks, row_count
+
+def _parse_int(value):
+    try:
+        return int(value or 0)
+    except:
+        return None
+
+def aggregate_crashes_arrays(rows, progress=False):
+    """Chunked numpy version of aggregate_crashes with identical results."""
+    agg = BlockAggregator(sum_fields=['injuries', 'fatal', 'hit_and_run'], first_fields=['address'])
 
-            if row.get('HIT_AND_RUN_I', '').upper() == 'Y':
-                blocks[block_key]['hit_and_run'] += 1
+    row_count = 0
+    for n, columns in iter_column_chunks(rows, progress_every=100000 if progress else 0):
+        row_count += n
+        lat_str, lng_str, injuries, fatal, hit_and_run, street, direction, num = columns
+
+        lat = parse_floats(lat_str)
+        lng = parse_floats(lng_str)
+        keep = in_chicago(lat, lng)
+
+        # Per-row path adds injuries once they parse, and fatal only if both parse
+        injuries = map_distinct(injuries, _parse_int, object)[keep]
+        fatal = map_distinct(fatal, _parse_int, object)[keep]
+        injuries_parsed = injuries != None
+        both_parsed = injuries_parsed & (fatal != None)
+
+        address = np.char.add(np.char.add(np.char.add(np.char.add(
+            np.asarray(num)[keep], ' '), np.asarray(direction)[keep]), ' '), np.asarray(street)[keep])
+
+        agg.add(
+            cell_ids(lat[keep], lng[keep]),
+            sums={
+                'injuries': np.where(injuries_parsed, injuries, 0).astype(np.int64),
+                'fatal': np.where(both_parsed, fatal, 0).astype(np.int64),
+                'hit_and_run': map_distinct(hit_and_run, lambda h: h.upper() == 'Y', np.int64)[keep],
+            },
+            firsts={'address': np.char.strip(address)},
+        )
+
+    return agg.blocks(), row_count
+
+def process_crashes(workers=1, engine='rows'):
+    print("\nProcessing Traffic Crashes...")
 
-            if not blocks[block_key]['address']:
-                street = row.get('STREET_NAME', '')
-                direction = row.get('STREET_DIRECTION', '')
-                num = row.get('STREET_NO', '')
-                blocks[block_key]['address'] = f"{num} {direction} {street}".strip()
+    blocks, row_count = aggregate_csv(
+        f'{DOWNLOADS_DIR}/Traffic_Crashes_-_Crashes_20251224.csv', COLUMNS_CRASHES,
+        aggregate_crashes_arrays if engine == 'numpy' else aggregate_crashes, (), workers,
+        sum_fields=SUM_FIELDS_CRASHES, first_fields=FIRST_FIELDS_CRASHES)
 
     print(f"  Total crashes: {row_count:,}")
     print(f"  Total blocks with crashes: {len(blocks):,}")
@@ -336,7 +522,8 @@ def process_crashes():
     print(f"  Blocks with 10+ crashes: {len(filtered):,}")
 
     data = []
-    for (lat, lng), block in filtered.items():
+    for cell, block in filtered.items():
+        lat, lng = cell_center(cell)
         # Calculate danger score (0-100)
         injury_rate = block['injuries'] / block['count'] if block['count'] > 0 else 0
         score = min(100, int(
@@ -346,8 +533,8 @@ def process_crashes():
         ))
 
         data.append([
-            round(lat, 4),
-            round(lng, 4),
+            lat,
+            lng,
             block['count'],
             score,
             block['injuries'],
@@ -369,20 +556,32 @@ def process_crashes():
         'data': data
     }
 
-    with open('/home/randy-vollrath/ticketless-chicago/public/crashes-data.json', 'w') as f:
+    with open(f'{PUBLIC_DIR}/crashes-data.json', 'w') as f:
         json.dump(output, f, separators=(',', ':'))
 
     print(f"  Output: public/crashes-data.json ({len(json.dumps(output)) / 1024:.1f} KB)")
     return output
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Aggregate 311, crime and crash CSVs into map blocks')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Processes per CSV; >1 splits each file into shards (default: 1)')
+    parser.add_argument('--engine', choices=['numpy', 'rows'], default='numpy' if np else 'rows',
+                        help='Chunked numpy aggregation or per-row loops (default: numpy if installed)')
+    args = parser.parse_args()
+    if args.engine == 'numpy' and np is None:
+        parser.error('--engine numpy requires numpy (pip3 install numpy)')
+
     print("=" * 50)
     print("Processing Chicago Neighborhood Data")
     print("=" * 50)
 
-    process_311()
-    process_crimes()
-    process_crashes()
+    process_311(args.workers, args.engine)
+    process_crimes(args.workers, args.engine)
+    process_crashes(args.workers, args.engine)
+
+    published = publish_layers(PUBLIC_DIR, ['311-data.json', 'crimes-data.json', 'crashes-data.json'])
+    print(f"\n  Published {published} hashed assets (manifest: public/layer-manifest.json)")
 
     print("\n" + "=" * 50)
     print("All data processed successfully!")
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Run neighborhood layer processors in isolated worker processes.
+
+Each processor runs in its own process with a wall-clock timeout, an address
+space cap and a retry budget, so one hung or runaway dataset cannot hold up
+or take down the others. Workers write their output file themselves (temp
+file + rename) and only send a small summary back to the parent.
+
+Standard library only.
+"""
+
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from collections import deque
+from multiprocessing.connection import wait
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _temp_prefix(pid):
+    return f'.tmp-{pid}-'
+
+
+def remove_temp_files(directory, pid):
+    """
+    Delete the temp files process pid left anywhere under directory. A worker
+    killed mid-write never reaches write_json_atomic's cleanup.
+    """
+    prefix = _temp_prefix(pid)
+    removed = 0
+    for root, _, names in os.walk(directory):
+        for name in names:
+            if name.startswith(prefix):
+                try:
+                    os.unlink(os.path.join(root, name))
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+    return removed
+
+
+def write_json_atomic(path, data):
+    """
+    Write compact JSON to path via a temp file in the same directory.
+    bytes are written as-is (layer_assets copies files byte for byte).
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=_temp_prefix(os.getpid()),
+                                    suffix=os.path.splitext(path)[1])
+    try:
+        if isinstance(data, bytes):
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+        else:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f, separators=(',', ':'))
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return os.path.getsize(path)
+
+
+def _worker(filename, processor, output_dir, memory_mb, conn):
+    """Child process entry point: run one processor and report back."""
+    if resource is not None and memory_mb:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    try:
+        data = processor()
+        if not data:
+            conn.send({'ok': False, 'error': 'processor returned no data'})
+            return
+        size = write_json_atomic(os.path.join(output_dir, filename), data)
+        conn.send({'ok': True, 'blocks': len(data.get('data', [])), 'bytes': size})
+    except MemoryError:
+        conn.send({'ok': False, 'error': f'exceeded {memory_mb} MB memory cap'})
+    except Exception as e:
+        conn.send({'ok': False, 'error': f'{type(e).__name__}: {e}'})
+    finally:
+        conn.close()
+
+
+def run_processors(processors, output_dir, workers=4, timeout=600, memory_mb=2048, retries=1):
+    """
+    Run (filename, processor) pairs concurrently.
+
+    Returns one report entry per processor with status, attempts, duration,
+    output blocks (entries in the layer's data list) and output bytes. A
+    processor that times out, crashes or returns no data is retried up to
+    `retries` more times.
+    """
+    ctx = multiprocessing.get_context()
+    pending = deque((filename, processor, 1) for filename, processor in processors)
+    running = {}
+    reports = {filename: {'file': filename, 'status': 'pending', 'attempts': 0}
+               for filename, _ in processors}
+
+    def finish(conn, result):
+        filename, processor, attempt, proc, started = running.pop(conn)
+        proc.join(5)
+        if proc.is_alive():
+            proc.kill()
+            proc.join()
+        conn.close()
+
+        report = reports[filename]
+        report['attempts'] = attempt
+        report['duration_s'] = round(time.monotonic() - started, 2)
+
+        if result.get('ok'):
+            report.update(status='ok', blocks=result['blocks'], bytes=result['bytes'])
+            report.pop('error', None)
+            print(f"  Written: {filename} ({result['bytes'] / 1024:.1f} KB, "
+                  f"{result['blocks']} blocks, {report['duration_s']}s)")
+            return
+
+        report.update(status='failed', error=result.get('error'))
+        removed = remove_temp_files(output_dir, proc.pid)
+        if removed:
+            print(f"  Removed {removed} temp files left by {filename}")
+        if attempt <= retries:
+            print(f"  RETRYING {filename} after attempt {attempt}: {report['error']}")
+            pending.append((filename, processor, attempt + 1))
+        else:
+            print(f"  FAILED: {filename} ({report['error']})")
+
+    while pending or running:
+        while pending and len(running) < workers:
+            filename, processor, attempt = pending.popleft()
+            parent_conn, child_conn = ctx.Pipe(duplex=False)
+            proc = ctx.Process(
+                target=_worker,
+                args=(filename, processor, output_dir, memory_mb, child_conn),
+                name=f"processor-{filename}",
+            )
+            # Anything still buffered would be duplicated into a forked child
+            sys.stdout.flush()
+            proc.start()
+            child_conn.close()
+            running[parent_conn] = (filename, processor, attempt, proc, time.monotonic())
+
+        for conn in wait(list(running), timeout=1):
+            try:
+                result = conn.recv()
+            except EOFError:
+                exitcode = running[conn][3].exitcode
+                result = {'ok': False, 'error': f'worker exited without a result (exit code {exitcode})'}
+            finish(conn, result)
+
+        now = time.monotonic()
+        for conn, (filename, _, _, proc, started) in list(running.items()):
+            if now - started > timeout:
+                proc.kill()
+                finish(conn, {'ok': False, 'error': f'timed out after {timeout}s'})
+
+    return [reports[filename] for filename, _ in processors]
@@ -0,0 +1,66 @@
+#!/usr/bin/env npx tsx
+/**
+ * Smoke test for the tow record delay lookup (lib/tow-delay-cube.ts).
+ *
+ * Verifies, whatever the server timezone (try TZ=UTC and TZ=Asia/Tokyo):
+ *   1. Zone-less portal timestamps are read as Chicago wall-clock time, and
+ *      a midnight stamp has no known hour.
+ *   2. Real instants are converted to Chicago time.
+ *   3. A lookup lands on the right cell of a small hand-built cube, with
+ *      unknown values falling to the "all" slots.
+ *
+ *   npm run qa:tow-delay-cube   (npx tsx scripts/smoke-test-tow-delay-cube.ts)
+ */
+import { chicagoHourAndWeekday, estimateTowRecordDelay, TowDelayCube } from '../lib/tow-delay-cube';
+
+let pass = 0;
+let fail = 0;
+
+function check(label: string, ok: boolean, detail?: string) {
+  if (ok) { console.log(`  PASS  ${label}${detail ? ' — ' + detail : ''}`); pass++; }
+  else    { console.log(`  FAIL  ${label}${detail ? ' — ' + detail : ''}`); fail++; }
+}
+
+function same(label: string, actual: unknown, expected: unknown) {
+  check(label, JSON.stringify(actual) === JSON.stringify(expected), JSON.stringify(actual));
+}
+
+console.log(`=== Tow Delay Cube Smoke Test (TZ=${process.env.TZ || 'system'}) ===\n`);
+
+// 2025-10-20 is a Monday (cube weekday 0)
+console.log('1. Zone-less portal timestamps');
+same('midnight stamp has no hour', chicagoHourAndWeekday('2025-10-20T00:00:00.000'), { hour: null, dow: 0 });
+same('date only', chicagoHourAndWeekday('2025-10-20'), { hour: null, dow: 0 });
+same('afternoon stamp', chicagoHourAndWeekday('2025-10-20 14:30:00'), { hour: 14, dow: 0 });
+
+console.log('\n2. Instants');
+same('UTC string', chicagoHourAndWeekday('2025-10-20T19:30:00Z'), { hour: 14, dow: 0 });
+same('Date late Monday in Chicago', chicagoHourAndWeekday(new Date('2025-10-21T04:59:00Z')), { hour: 23, dow: 0 });
+same('unparseable', chicagoHourAndWeekday('not a date'), { hour: null, dow: null });
+
+console.log('\n3. Lookup');
+// reason [A, *] x pound [1, *] x hour [0..23, *] x dow [0..6, *]; stats row 1
+// only for (A, 1, 14, Monday), row 0 everywhere else
+const hours = Array.from({ length: 24 }, (_, h) => h);
+const cube: TowDelayCube = {
+  version: 1,
+  built_at: '2025-10-20T00:00:00',
+  min_cell_count: 30,
+  sync_delay_minutes: 30,
+  dimensions: { reason: ['A', '*'], pound: ['1', '*'], hour: [...hours, '*'], dow: [0, 1, 2, 3, 4, 5, 6, '*'] },
+  stats_fields: ['n', 'p50', 'p75', 'p90'],
+  cells: Array.from({ length: 2 * 2 * 25 * 8 }, (_, i) => (i === ((0 * 2 + 0) * 25 + 14) * 8 + 0 ? 1 : 0)),
+  stats: [[1000, 120, 240, 400], [40, 60, 90, 150]],
+};
+same('matching cell', estimateTowRecordDelay({ reason: ' a ', pound: 1, towDate: '2025-10-20T14:30:00' }, cube), {
+  sampleSize: 40, p50Minutes: 60, p75Minutes: 90, p90Minutes: 150, expectedNotificationMinutes: 90,
+  matchedOn: ['reason', 'pound', 'hour', 'dow'],
+});
+same('portal date-only stamp matches on weekday only',
+  estimateTowRecordDelay({ towDate: '2025-10-20T00:00:00.000' }, cube)?.matchedOn, ['dow']);
+same('unknown reason uses the all slot',
+  estimateTowRecordDelay({ reason: 'B', pound: 1, towDate: '2025-10-20T14:30:00' }, cube)?.sampleSize, 1000);
+same('no cube', estimateTowRecordDelay({}, null), null);
+
+console.log(`\n${pass} passed, ${fail} failed`);
+process.exit(fail > 0 ? 1 : 0);
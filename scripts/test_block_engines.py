@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+The numpy block engine must give the same blocks as the per-row loops in
+process-neighborhood-data.py, for 311, crimes and crashes, including the
+rows whose numbers or coordinates don't parse.
+
+USAGE:
+  python3 -m pytest scripts/test_block_engines.py
+  python3 scripts/test_block_engines.py
+"""
+
+import importlib.util
+import os
+import random
+import sys
+import unittest
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+spec = importlib.util.spec_from_file_location(
+    'process_neighborhood_data',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'process-neighborhood-data.py'))
+pnd = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(pnd)
+
+ROWS = 3000
+
+
+def _coordinates(rng):
+    """A few dozen blocks near the Loop, plus some rows the engines must drop."""
+    pick = rng.random()
+    if pick < 0.03:
+        return '', ''
+    if pick < 0.05:
+        return 'n/a', '-87.63'
+    if pick < 0.07:
+        return '40.0', '-87.63'         # outside Chicago
+    return f"{41.88 + rng.randrange(6) * 0.0013:.6f}", f"{-87.63 - rng.randrange(6) * 0.0017:.6f}"
+
+
+def _number(rng):
+    return rng.choice(['0', '1', '2', '5', '', ' 3 ', 'x', '1.5'])
+
+
+def crash_rows(rng):
+    return [(*_coordinates(rng), _number(rng), _number(rng), rng.choice(['Y', 'y', 'N', '']),
+             rng.choice(['CLARK ST', 'STATE ST', '']), rng.choice(['N', 'S', '']), str(rng.randrange(1, 99) * 100))
+            for _ in range(ROWS)]
+
+
+def crime_rows(rng):
+    types = [t for types in pnd.CRIME_CATEGORIES.values() for t in types] + ['SOMETHING ELSE', ' THEFT ']
+    return [(rng.choice(types), *_coordinates(rng), rng.choice(['42', '1', '']),
+             rng.choice(['001XX N STATE ST', '']), rng.choice(['true', 'false', 'Y', '']))
+            for _ in range(ROWS)]
+
+
+def sr_rows(rng):
+    types = [t for types in pnd.RELEVANT_CATEGORIES.values() for t in types]
+    types += ['INFORMATION ONLY - 311', 'Aircraft Noise Complaint', 'Something Unlisted']
+    return [(rng.choice(types), *_coordinates(rng), rng.choice(['42', '']), rng.choice(['100 N STATE ST', '']),
+             rng.choice(['12/01/2025 10:00:00 AM', '06/01/2025 10:00:00 AM', '', 'garbage']))
+            for _ in range(ROWS)]
+
+
+@unittest.skipIf(pnd.np is None, 'numpy not installed')
+class EngineParityTest(unittest.TestCase):
+
+    def assertSameBlocks(self, rows_result, arrays_result):
+        blocks, row_count = rows_result
+        array_blocks, array_row_count = arrays_result
+        self.assertEqual(row_count, array_row_count)
+        self.assertEqual(sorted(blocks), sorted(array_blocks))
+        for key, block in blocks.items():
+            self.assertEqual(block, array_blocks[key], f"block {key}")
+
+    def test_crashes(self):
+        rows = crash_rows(random.Random(1))
+        self.assertSameBlocks(pnd.aggregate_crashes(rows), pnd.aggregate_crashes_arrays(iter(rows)))
+
+    def test_crashes_unparsed_fatal_keeps_injuries(self):
+        rows = [('41.88', '-87.63', '2', 'x', 'N', 'CLARK ST', 'N', '100'),
+                ('41.88', '-87.63', 'x', '1', 'N', 'CLARK ST', 'N', '100'),
+                ('41.88', '-87.63', '1', '1', 'Y', 'CLARK ST', 'N', '100')]
+        blocks, _ = pnd.aggregate_crashes_arrays(iter(rows))
+        (block,) = blocks.values()
+        self.assertEqual((block['count'], block['injuries'], block['fatal'], block['hit_and_run']), (3, 3, 1, 1))
+        self.assertSameBlocks(pnd.aggregate_crashes(rows), (blocks, 3))
+
+    def test_crimes(self):
+        rows = crime_rows(random.Random(2))
+        self.assertSameBlocks(pnd.aggregate_crimes(rows), pnd.aggregate_crimes_arrays(iter(rows)))
+
+    def test_311(self):
+        rows = sr_rows(random.Random(3))
+        cutoff = datetime(2025, 10, 1)
+        self.assertSameBlocks(pnd.aggregate_311(rows, cutoff), pnd.aggregate_311_arrays(iter(rows), cutoff))
+
+    def test_shard_merge_matches_single_pass(self):
+        rows = crash_rows(random.Random(4))
+        single, _ = pnd.aggregate_crashes(rows)
+        parts = [pnd.aggregate_crashes_arrays(iter(rows[i:i + 700]))[0] for i in range(0, ROWS, 700)]
+        merged = pnd.merge_block_partials(parts, pnd.SUM_FIELDS_CRASHES, pnd.FIRST_FIELDS_CRASHES)
+        self.assertSameBlocks((single, ROWS), (merged, ROWS))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+build-tow-delay-cube.py: every cell must hold its own quantiles when it has
+enough tows, and otherwise those of the first coarser cell in FALLBACK_ORDER
+that does.
+
+USAGE:
+  python3 -m pytest scripts/test_build_tow_delay_cube.py
+  python3 scripts/test_build_tow_delay_cube.py
+"""
+
+import importlib.util
+import os
+import random
+import sys
+import unittest
+from functools import lru_cache
+from itertools import product
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from tow_stats import Distribution
+
+spec = importlib.util.spec_from_file_location(
+    'build_tow_delay_cube',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'build-tow-delay-cube.py'))
+cube_builder = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(cube_builder)
+
+DIMENSIONS = cube_builder.DIMENSIONS
+ALL = cube_builder.ALL
+
+
+def lookup(dims, cells, stats, **values):
+    """What lib/tow-delay-cube.ts does: unknown or missing values use the ALL slot."""
+    index = 0
+    for name in DIMENSIONS:
+        options = dims[name]
+        value = values.get(name)
+        slot = options.index(value) if value in options[:-1] else len(options) - 1
+        index = index * len(options) + slot
+    return stats[cells[index]]
+
+
+class FallbackTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tows = [
+            ('A', '1', 10, 0, 10), ('A', '1', 10, 0, 20), ('A', '1', 10, 0, 30),
+            ('A', '1', 10, 1, 100),
+            ('B', '1', 5, 2, 50), ('B', '1', 5, 2, 50), ('B', '1', 5, 2, 50),
+            ('C', '9', 5, 2, 70),
+        ]
+        self.dims, self.cells, self.stats = cube_builder.build_cube(self.tows, min_count=3)
+
+    def find(self, **values):
+        return lookup(self.dims, self.cells, self.stats, **values)
+
+    def test_rare_values_only_count_toward_all(self):
+        self.assertEqual(self.dims['reason'], ['A', 'B', ALL])
+        self.assertEqual(self.dims['pound'], ['1', ALL])
+
+    def test_full_cell_keeps_its_own_quantiles(self):
+        self.assertEqual(self.find(reason='A', pound='1', hour=10, dow=0), [3, 20.0, 25.0, 28.0])
+
+    def test_sparse_cell_drops_weekday_first(self):
+        self.assertEqual(self.find(reason='A', pound='1', hour=10, dow=1)[0], 4)
+
+    def test_falls_back_through_pound_and_hour_to_reason(self):
+        self.assertEqual(self.find(reason='B', pound='1', hour=10, dow=0), [3, 50.0, 50.0, 50.0])
+        self.assertEqual(self.find(reason='A', hour=23, dow=6)[0], 4)
+
+    def test_unknown_values_use_all_slots(self):
+        self.assertEqual(self.find(reason='C', pound='9', hour=5, dow=2)[0], 4)
+        self.assertEqual(self.find()[0], len(self.tows))
+
+    def test_too_few_tows(self):
+        with self.assertRaises(ValueError):
+            cube_builder.build_cube(self.tows[:2], min_count=3)
+
+
+class BruteForceTest(unittest.TestCase):
+
+    def test_every_cell_matches_a_direct_scan(self):
+        rng = random.Random(7)
+        tows = [(rng.choice('ABC'), rng.choice('123'), rng.randrange(24), rng.randrange(7),
+                 rng.expovariate(1 / 120)) for _ in range(1500)]
+        min_count = 8
+        dims, cells, stats = cube_builder.build_cube(tows, min_count)
+        fallback = [DIMENSIONS.index(name) for name in cube_builder.FALLBACK_ORDER]
+
+        @lru_cache(maxsize=None)
+        def scan(key):
+            return [t[4] for t in tows if all(key[i] == ALL or t[i] == key[i] for i in range(len(DIMENSIONS)))]
+
+        def expected(key):
+            key = list(key)
+            for d in [None] + fallback:
+                if d is not None:
+                    key[d] = ALL
+                delays = scan(tuple(key))
+                if len(delays) >= min_count:
+                    break
+            dist = Distribution(delays)
+            return [len(dist)] + [round(v, 1) for v in dist.percentiles(cube_builder.PERCENTILES)]
+
+        for key in product(*(dims[name] for name in DIMENSIONS)):
+            self.assertEqual(lookup(dims, cells, stats, **dict(zip(DIMENSIONS, key))), expected(key), key)
+
+
+if __name__ == '__main__':
+    unittest.main()
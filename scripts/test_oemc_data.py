@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+oemc_data: the sliced datetime parser must agree with strptime and reject
+values int() would wrongly accept, a repeated header must not lose its
+column, and a cached load must give back the same table.
+
+USAGE:
+  python3 -m pytest scripts/test_oemc_data.py
+  python3 scripts/test_oemc_data.py
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from oemc_data import FIXED_WIDTH, convert_csv, datetime_parser, load_oemc
+
+ROWS = 1500
+
+
+def write_export(path):
+    """Pipe-delimited export with two 'Unit' columns and a few misaligned or blank dispatch times."""
+    rng = random.Random(5)
+    start = datetime(2025, 8, 1)
+    with open(path, 'w', newline='') as f:
+        f.write('Event|Unit|Dispatched|Unit|Closed\n')
+        for i in range(ROWS):
+            dispatched = start + timedelta(seconds=rng.randrange(90 * 24 * 3600))
+            closed = dispatched + timedelta(minutes=rng.randrange(5, 240))
+            text = dispatched.strftime('%m/%d/%Y %H:%M:%S')
+            if i % 300 == 1:
+                text = '+' + text[1:]
+            elif i % 300 == 2:
+                text = ''
+            f.write(f"E{i}|A{i % 7}|{text}|B{i % 5}|{closed:%Y-%m-%d %H:%M:%S}\n")
+
+
+class DatetimeParserTest(unittest.TestCase):
+
+    def test_slices_agree_with_strptime(self):
+        rng = random.Random(6)
+        for fmt in FIXED_WIDTH:
+            parse = datetime_parser(fmt)
+            for _ in range(2000):
+                dt = datetime(2020, 1, 1) + timedelta(seconds=rng.randrange(6 * 365 * 24 * 3600))
+                self.assertEqual(parse(dt.strftime(fmt)), dt)
+
+    def test_non_digit_slices_are_not_read(self):
+        parse = datetime_parser('%m/%d/%Y %H:%M:%S')
+        self.assertIsNone(parse('+8/16/2025 09:08:45'))
+        self.assertIsNone(parse('08/16/2025 09:08:-5'))
+        self.assertIsNone(parse('13/16/2025 09:08:45'))
+
+
+class ConvertCsvTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp()
+        cls.path = os.path.join(cls.tmp, 'oemc.csv')
+        write_export(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp)
+
+    def test_repeated_header_keeps_both_columns(self):
+        table = convert_csv(self.path)
+        self.assertEqual(table.headers, ['Event', 'Unit', 'Dispatched', 'Unit.1', 'Closed'])
+        self.assertEqual(table.column('Unit')[:2], ['A0', 'A1'])
+        self.assertEqual(table.column('Unit.1')[:2], ['B0', 'B1'])
+
+    def test_datetime_columns(self):
+        table = convert_csv(self.path)
+        self.assertEqual(table.formats, {'Dispatched': '%m/%d/%Y %H:%M:%S', 'Closed': '%Y-%m-%d %H:%M:%S'})
+        self.assertEqual(table.unparsed, {'Dispatched': ROWS // 300, 'Closed': 0})
+        dispatched = table.datetimes('Dispatched')
+        self.assertEqual(sum(dt is None for dt in dispatched), 2 * ROWS // 300)
+        self.assertIsInstance(dispatched[0], datetime)
+
+    def test_cached_load_matches(self):
+        cache_dir = os.path.join(self.tmp, 'cache')
+        first = load_oemc(self.path, cache_dir=cache_dir)
+        cached = load_oemc(self.path, cache_dir=cache_dir)
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+        self.assertEqual(cached.headers, first.headers)
+        self.assertEqual((cached.formats, cached.unparsed), (first.formats, first.unparsed))
+        self.assertEqual(list(cached.rows()), list(first.rows()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+processor_runner: a worker killed by the timeout must not leave its temp
+files behind, while temp files of other processes and finished outputs stay.
+
+USAGE:
+  python3 -m pytest scripts/test_processor_runner.py
+  python3 scripts/test_processor_runner.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import processor_runner
+
+OUTPUT_DIR = None
+
+
+def hang_mid_write():
+    """Start a layer file the way write_json_atomic does, then hang past the timeout."""
+    directory = os.path.join(OUTPUT_DIR, 'layers')
+    os.makedirs(directory, exist_ok=True)
+    fd, _ = tempfile.mkstemp(dir=directory, prefix=processor_runner._temp_prefix(os.getpid()), suffix='.json')
+    os.write(fd, b'{"meta":')
+    time.sleep(60)
+
+
+def finish():
+    return {'meta': {}, 'data': [[41.88, -87.63, 1], [41.89, -87.64, 2]]}
+
+
+class RunProcessorsTest(unittest.TestCase):
+
+    def setUp(self):
+        global OUTPUT_DIR
+        OUTPUT_DIR = tempfile.mkdtemp()
+        self.other = os.path.join(OUTPUT_DIR, '.tmp-1-other.json')
+        open(self.other, 'w').close()
+
+    def tearDown(self):
+        shutil.rmtree(OUTPUT_DIR)
+
+    def test_killed_worker_leaves_no_temp_files(self):
+        reports = processor_runner.run_processors(
+            [('hung.json', hang_mid_write), ('done.json', finish)], OUTPUT_DIR, timeout=1, retries=1)
+        self.assertEqual([(r['file'], r['status'], r['attempts']) for r in reports],
+                         [('hung.json', 'failed', 2), ('done.json', 'ok', 1)])
+        self.assertEqual(reports[1]['blocks'], 2)
+        self.assertEqual(os.listdir(os.path.join(OUTPUT_DIR, 'layers')), [])
+        self.assertEqual(sorted(os.listdir(OUTPUT_DIR)), ['.tmp-1-other.json', 'done.json', 'layers'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+quantile_sketch: QuantileSketch rank error stays within its documented
+bound, also after merging sketches of parts of the stream; BucketHistogram
+counts are exact.
+
+USAGE:
+  python3 -m pytest scripts/test_quantile_sketch.py
+  python3 scripts/test_quantile_sketch.py
+"""
+
+import os
+import pickle
+import random
+import sys
+import unittest
+from bisect import bisect_left, bisect_right
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from quantile_sketch import BucketHistogram, QuantileSketch
+
+N = 100000
+QS = [q / 100 for q in range(1, 100)]
+
+# Worst case measured over 20 seeds was 0.82% of n (see the module docstring)
+MAX_RANK_ERROR = 0.015
+
+
+def rank_error(values, q, estimate):
+    """How far estimate's rank range in the sorted values lies from q * n, as a fraction of n."""
+    lo, hi = bisect_left(values, estimate), bisect_right(values, estimate)
+    target = q * len(values)
+    return 0.0 if lo <= target <= hi else min(abs(lo - target), abs(hi - target)) / len(values)
+
+
+def streams(seed):
+    rng = random.Random(seed)
+    yield 'uniform', [rng.random() * 72 * 3600 for _ in range(N)]
+    yield 'lognormal', [rng.lognormvariate(8, 1.2) for _ in range(N)]
+
+
+class QuantileSketchTest(unittest.TestCase):
+
+    def assertWithinBound(self, sketch, values):
+        ordered = sorted(values)
+        for q, estimate in zip(QS, sketch.quantiles(QS)):
+            self.assertLessEqual(rank_error(ordered, q, estimate), MAX_RANK_ERROR, f"q={q}")
+
+    def test_exact_below_k(self):
+        rng = random.Random(1)
+        values = [rng.random() for _ in range(150)]
+        sketch = QuantileSketch()
+        for v in values:
+            sketch.update(v)
+        ordered = sorted(values)
+        self.assertEqual(sketch.quantiles(QS), [ordered[min(int(q * 150), 149)] for q in QS])
+        self.assertEqual(sketch.count_at_most(ordered[40]), 41)
+
+    def test_rank_error(self):
+        for name, values in streams(2):
+            with self.subTest(name):
+                sketch = QuantileSketch()
+                for v in values:
+                    sketch.update(v)
+                self.assertEqual((sketch.n, sketch.min, sketch.max), (N, min(values), max(values)))
+                self.assertLess(sum(len(level) for level in sketch.levels), 1000)
+                self.assertWithinBound(sketch, values)
+                ordered = sorted(values)
+                threshold = ordered[N // 3]
+                self.assertLessEqual(abs(sketch.count_at_most(threshold) - (N // 3 + 1)), MAX_RANK_ERROR * N)
+
+    def test_merge(self):
+        for name, values in streams(3):
+            with self.subTest(name):
+                parts = [QuantileSketch(seed=i) for i in range(4)]
+                for i, v in enumerate(values):
+                    parts[i * 4 // N].update(v)
+                merged = parts[0]
+                for part in parts[1:]:
+                    merged.merge(pickle.loads(pickle.dumps(part)))
+                self.assertEqual((merged.n, merged.min, merged.max), (N, min(values), max(values)))
+                self.assertWithinBound(merged, values)
+
+    def test_merge_empty_and_mismatched(self):
+        sketch = QuantileSketch()
+        sketch.update(5)
+        self.assertEqual(sketch.merge(QuantileSketch()).n, 1)
+        self.assertEqual(QuantileSketch().merge(sketch).quantile(0.5), 5)
+        with self.assertRaises(ValueError):
+            sketch.merge(QuantileSketch(k=100))
+        self.assertEqual(QuantileSketch().quantiles([0.5]), [None])
+
+
+class BucketHistogramTest(unittest.TestCase):
+
+    def test_exact_counts(self):
+        rng = random.Random(4)
+        values = [rng.randrange(0, 100) for _ in range(5000)]
+        right = BucketHistogram([10, 50, 90])
+        left = BucketHistogram([10, 50, 90], closed='left')
+        for v in values:
+            right.update(v)
+            left.update(v)
+        for edge in (10, 50, 90):
+            self.assertEqual(right.count_at_most(edge), sum(v <= edge for v in values))
+            self.assertEqual(left.count_below(edge), sum(v < edge for v in values))
+        self.assertEqual(sum(right.counts), len(values))
+        with self.assertRaises(ValueError):
+            right.count_below(10)
+        with self.assertRaises(ValueError):
+            right.count_at_most(11)
+
+    def test_merge(self):
+        a, b = BucketHistogram([1, 2]), BucketHistogram([1, 2])
+        for v in (0, 1, 2, 3):
+            a.update(v)
+        b.update(2)
+        self.assertEqual(a.merge(b).counts, [2, 2, 1])
+        self.assertEqual(len(a), 5)
+        with self.assertRaises(ValueError):
+            a.merge(BucketHistogram([1, 3]))
+
+
+if __name__ == '__main__':
+    unittest.main()
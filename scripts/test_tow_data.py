@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+tow_data: load_foia() must find the header row, parse date cells of every
+kind the workbook holds, and give back the same table from its cache;
+parse_datetime_column() must agree with parse_tow_datetime() cell by cell.
+
+USAGE:
+  python3 -m pytest scripts/test_tow_data.py
+  python3 scripts/test_tow_data.py
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from tow_data import load_foia, parse_datetime_column, parse_tow_datetime
+
+ROWS = 500
+
+
+def date_cell(rng, dt):
+    """The same moment as the workbook might hold it: a datetime, a date, one of the string formats, or blank."""
+    pick = rng.randrange(8)
+    if pick == 0:
+        return None
+    if pick == 1:
+        return dt.date()
+    if pick == 2:
+        return dt.strftime('%m/%d/%Y %I:%M:%S %p')
+    if pick == 3:
+        return f" {dt:%Y-%m-%d %H:%M:%S} "
+    if pick == 4:
+        return 'pending'
+    return dt
+
+
+def write_workbook(path):
+    from openpyxl import Workbook
+
+    rng = random.Random(8)
+    wb = Workbook()
+    ws = wb.active
+    ws.title = 'Data'
+    ws.append(['Towed vehicles export'])
+    ws.append([])
+    ws.append(['Inventory Number', 'Tow Date', 'Notes', None, 'Notes', 'Date Tow Record Created'])
+    start = datetime(2025, 1, 1)
+    for i in range(ROWS):
+        towed = start + timedelta(seconds=rng.randrange(300 * 24 * 3600))
+        created = towed + timedelta(minutes=rng.randrange(10, 3000))
+        ws.append([str(9000000 + i), date_cell(rng, towed), f"a{i}", None, f"b{i}", date_cell(rng, created)])
+    ws.append([])
+    wb.save(path)
+
+
+class LoadFoiaTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp()
+        cls.path = os.path.join(cls.tmp, 'towed.xlsx')
+        write_workbook(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp)
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp(dir=self.tmp)
+
+    def test_headers_and_dates(self):
+        from openpyxl import load_workbook
+
+        foia = load_foia(self.path, cache_dir=self.cache_dir)
+        self.assertEqual(foia.header_row, 3)
+        self.assertEqual(foia.headers, ['Inventory Number', 'Tow Date', 'Notes', 'Column 4', 'Notes.1',
+                                        'Date Tow Record Created'])
+        self.assertEqual(len(foia), ROWS)
+        self.assertEqual(foia.column('Notes.1')[:2], ['b0', 'b1'])
+
+        ws = load_workbook(self.path, read_only=True).active
+        cells = list(ws.iter_rows(min_row=4, values_only=True))[:ROWS]
+        for idx, header in ((1, 'Tow Date'), (5, 'Date Tow Record Created')):
+            self.assertEqual(foia.datetimes(header), [parse_tow_datetime(row[idx]) for row in cells])
+        self.assertIn(None, foia.datetimes('Tow Date'))
+
+    def test_cached_load_matches(self):
+        first = load_foia(self.path, cache_dir=self.cache_dir)
+        cached = load_foia(self.path, cache_dir=self.cache_dir)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+        self.assertEqual((cached.headers, cached.header_row), (first.headers, first.header_row))
+        self.assertEqual(list(cached.rows()), list(first.rows()))
+
+    def test_dataframe(self):
+        foia = load_foia(self.path, cache_dir=self.cache_dir)
+        df = foia.to_dataframe()
+        self.assertEqual(list(df.columns), foia.headers)
+        self.assertEqual(str(df['Tow Date'].dtype), 'datetime64[ns]')
+        self.assertEqual(foia.datetimes('Tow Date'),
+                         [None if ts != ts else ts.to_pydatetime() for ts in df['Tow Date']])
+
+
+class ParseDatetimeColumnTest(unittest.TestCase):
+
+    def test_matches_per_cell_parser(self):
+        rng = random.Random(9)
+        start = datetime(2025, 1, 1)
+        cells = [date_cell(rng, start + timedelta(seconds=rng.randrange(10 ** 7))) for _ in range(2000)]
+        cells += [12345, True, '13/40/2025', date(2025, 3, 1)]
+        parsed = parse_datetime_column(cells)
+        self.assertEqual([None if ts != ts else ts.to_pydatetime() for ts in parsed],
+                         [parse_tow_datetime(v) for v in cells])
+
+
+if __name__ == '__main__':
+    unittest.main()
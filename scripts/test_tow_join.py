@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+tow_join: interval_join() must pick the same match as a nested loop over all
+pairs (nearest in time, the earlier one on a tie), and match_dispatches()
+must key and filter tows and events as documented.
+
+USAGE:
+  python3 -m pytest scripts/test_tow_join.py
+  python3 scripts/test_tow_join.py
+"""
+
+import os
+import random
+import sys
+import unittest
+from array import array
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from oemc_data import OemcTable
+from tow_data import MISSING, TowTable, _to_micros
+from tow_join import interval_join, latency_rows, location_key, match_dispatches, normalize_address
+
+
+def nested_loop(left, right, before, after):
+    """Every left item against every right item; ties go to the earlier time, then input order."""
+    matches = {}
+    for key, time, left_id in left:
+        candidates = [(abs(time - r_time), r_time, i, r_id) for i, (r_key, r_time, r_id) in enumerate(right)
+                      if r_key == key and time - before <= r_time <= time + after]
+        if candidates:
+            matches[left_id] = min(candidates)[3]
+    return matches
+
+
+class IntervalJoinTest(unittest.TestCase):
+
+    def test_matches_nested_loop(self):
+        for seed in range(5):
+            with self.subTest(seed=seed):
+                rng = random.Random(seed)
+                keys = ['A', 'B', 'C', '']
+                # Coarse times so ties and shared windows are common
+                left = [(rng.choice(keys), rng.randrange(0, 2000, 5), f"t{i}") for i in range(400)]
+                right = [(rng.choice(keys), rng.randrange(0, 2000, 5), f"e{i}") for i in range(600)]
+                self.assertEqual(interval_join(left, right, 60, 15), nested_loop(left, right, 60, 15))
+
+    def test_tie_goes_to_the_earlier_dispatch(self):
+        right = [('A', 110, 'later'), ('A', 90, 'earlier'), ('B', 100, 'other key')]
+        self.assertEqual(interval_join([('A', 100, 't')], right, 30, 30), {'t': 'earlier'})
+
+    def test_window_edges_are_inclusive(self):
+        right = [('A', 40, 'first'), ('A', 115, 'last')]
+        self.assertEqual(interval_join([('A', 100, 't')], right[:1], 60, 15), {'t': 'first'})
+        self.assertEqual(interval_join([('A', 100, 't')], right[1:], 60, 15), {'t': 'last'})
+        self.assertEqual(interval_join([('A', 100, 't')], [('A', 39, 'x'), ('A', 116, 'y')], 60, 15), {})
+
+    def test_datetimes(self):
+        tow = datetime(2025, 8, 16, 9, 30)
+        right = [('A', tow - timedelta(hours=3), 'e1'), ('A', tow - timedelta(minutes=20), 'e2'),
+                 ('A', tow + timedelta(minutes=20), 'e3')]
+        self.assertEqual(interval_join([('A', tow, 't')], right, timedelta(hours=4), timedelta(minutes=15)),
+                         {'t': 'e2'})
+
+
+class LocationKeyTest(unittest.TestCase):
+
+    def test_normalize_address(self):
+        self.assertEqual(normalize_address(' 7104 n. Clark  Street '), '7104 N CLARK ST')
+        self.assertEqual(normalize_address('1200 W Madison Avenue'), '1200 W MADISON AVE')
+        self.assertIsNone(normalize_address(''))
+        self.assertIsNone(normalize_address('--'))
+
+    def test_keys(self):
+        self.assertEqual(location_key('7104 N Clark Street'), '7100 N CLARK ST')
+        self.assertEqual(location_key('7104 N Clark Street', 'address'), '7104 N CLARK ST')
+        self.assertEqual(location_key(None, 'none'), '')
+        self.assertEqual(location_key('CLARK / DIVISION'), 'CLARK DIVISION')
+        self.assertIsNone(location_key(None))
+
+
+class MatchDispatchesTest(unittest.TestCase):
+
+    def test_keys_filters_and_stats(self):
+        def micros(*stamps):
+            return array('q', (_to_micros(dt) if dt else MISSING for dt in stamps))
+
+        day = datetime(2025, 8, 16)
+        foia = TowTable(
+            ['Inventory Number', 'Tow Date', 'Tow Address'], 1,
+            {'Inventory Number': ['1', '2', '3', '4', '5'],
+             'Tow Address': ['7104 N Clark St', '7150 n clark street', '100 W Madison', '', '1 E Main']},
+            {'Tow Date': micros(day.replace(hour=10), day.replace(hour=11), day, day.replace(hour=9), None)})
+        oemc = OemcTable(
+            ['EVENT_NUMBER', 'ENTRY_DATE', 'DISPATCH_DATE', 'LOCATION'],
+            {'EVENT_NUMBER': ['E1', 'E2', 'E3'], 'LOCATION': ['7100 N CLARK ST', '100 W MADISON ST', '']},
+            {'ENTRY_DATE': micros(day.replace(hour=9), day.replace(hour=8), day.replace(hour=8)),
+             'DISPATCH_DATE': micros(None, day.replace(hour=8, minute=5), day.replace(hour=8))},
+            {'ENTRY_DATE': '%m/%d/%Y %H:%M:%S', 'DISPATCH_DATE': '%m/%d/%Y %H:%M:%S'}, {})
+
+        matches, stats = match_dispatches(foia, oemc)
+        # Tow 2 is two hours after E1, inside the four-hour window; E1 has no dispatch, so its entry counts
+        self.assertEqual(matches, {0: 0, 1: 0})
+        self.assertEqual(stats['tows_midnight_stamped'], 1)
+        self.assertEqual(stats['tows_without_date'], 1)
+        self.assertEqual(stats['tows_without_location'], 1)
+        self.assertEqual(stats['events_unusable'], 1)
+        self.assertEqual((stats['matched'], stats['events_matched'], stats['events_reused']), (2, 1, 1))
+        with self.assertRaises(ValueError):
+            match_dispatches(foia, oemc, key='street')
+
+        rows = list(latency_rows(foia, oemc, matches))
+        self.assertEqual([(r['inventory_number'], r['event_number'], r['dispatch_to_tow_min']) for r in rows],
+                         [('1', 'E1', 60.0), ('2', 'E1', 120.0)])
+
+        # No datetime dispatch column: a ValueError for the caller to report, not a KeyError
+        oemc.formats.pop('DISPATCH_DATE')
+        with self.assertRaisesRegex(ValueError, 'dispatch'):
+            match_dispatches(foia, oemc)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+tow_portal.fetch_towed_vehicles() against the portal stand-in
+(portal-standin-server.py) on a small dataset: the partitioned fetch must
+return the same rows, in the same tow_date DESC order, as one $offset-paged
+query, keep repeated inventory numbers so the last (oldest) row still wins
+downstream, and serve settled ranges from its cache.
+
+USAGE:
+  python3 -m pytest scripts/test_tow_portal.py
+  python3 scripts/test_tow_portal.py
+"""
+
+import importlib.util
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+import urllib.parse
+import urllib.request
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import tow_portal
+from tow_reports import portal_tow_dates
+
+spec = importlib.util.spec_from_file_location(
+    'portal_standin_server',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'portal-standin-server.py'))
+standin = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(standin)
+
+SOQL = '%Y-%m-%dT%H:%M:%S.000'
+
+
+def make_rows():
+    """~1,200 tows over 60 days a year ago, 40 inventory numbers towed again later, a few undated."""
+    rng = random.Random(11)
+    start = datetime.now() - timedelta(days=400)
+    stamps = rng.sample(range(60 * 24 * 3600), 1250)
+    rows = [{'inventory_number': str(7000000 + i), 'tow_date': (start + timedelta(seconds=s)).strftime(SOQL),
+             'make': 'FIRST'} for i, s in enumerate(stamps[:1200])]
+    for i, s in zip(rng.sample(range(1200), 40), stamps[1200:1240]):
+        again = start + timedelta(seconds=max(s, stamps[i]) + 3600)
+        rows.append({'inventory_number': str(7000000 + i), 'tow_date': again.strftime(SOQL), 'make': 'AGAIN'})
+    rows += [{'inventory_number': str(7100000 + i), 'make': 'UNDATED'} for i in range(5)]
+    rng.shuffle(rows)
+    return rows
+
+
+class PartitionedFetchTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.data_dir = tempfile.mkdtemp()
+        with open(os.path.join(cls.data_dir, f"{tow_portal.TOWED_DATASET}.json"), 'w') as f:
+            json.dump(make_rows(), f)
+        cls.store = standin.DatasetStore(cls.data_dir)
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), standin.make_handler(cls.store, 0, 0))
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.saved = tow_portal.PORTAL_URL, tow_portal.PAGE_SIZE
+        # Small pages so the bigger ranges page with $offset too
+        tow_portal.PORTAL_URL = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        tow_portal.PAGE_SIZE = 100
+
+    @classmethod
+    def tearDownClass(cls):
+        tow_portal.PORTAL_URL, tow_portal.PAGE_SIZE = cls.saved
+        cls.server.shutdown()
+        cls.server.server_close()
+        shutil.rmtree(cls.data_dir)
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def offset_paged(self):
+        """The old fetch: one tow_date DESC query paged with $offset."""
+        rows = []
+        while True:
+            params = {'$order': 'tow_date DESC', '$limit': 500, '$offset': len(rows)}
+            url = f"{tow_portal.PORTAL_URL}/resource/{tow_portal.TOWED_DATASET}.json?{urllib.parse.urlencode(params)}"
+            with urllib.request.urlopen(url) as response:
+                page = json.load(response)
+            rows.extend(page)
+            if len(page) < 500:
+                return rows
+
+    def fetch(self, **kwargs):
+        return tow_portal.fetch_towed_vehicles(workers=4, days=5, cache_dir=self.cache_dir, **kwargs)
+
+    def test_same_rows_and_order_as_offset_paging(self):
+        rows = self.fetch()
+        old = self.offset_paged()
+        self.assertEqual(len(rows), 1245)
+        dated = [row for row in rows if 'tow_date' in row]
+        self.assertEqual(dated, [row for row in old if 'tow_date' in row])
+        self.assertEqual(sorted(r['inventory_number'] for r in rows[len(dated):]),
+                         sorted(r['inventory_number'] for r in old if 'tow_date' not in r))
+
+    def test_repeated_inventory_numbers_keep_the_oldest_row_downstream(self):
+        rows = self.fetch()
+        kept = {}
+        for row in self.offset_paged():
+            kept[row['inventory_number']] = row
+        self.assertEqual({inv: row['tow_date'][:19] for inv, row in kept.items() if 'tow_date' in row},
+                         {inv: f"{date:%Y-%m-%dT%H:%M:%S}" for inv, date in portal_tow_dates(rows).items() if date})
+        self.assertNotIn('AGAIN', {row['make'] for row in kept.values()})
+
+    def test_settled_ranges_come_from_cache(self):
+        first = self.fetch()
+        served = self.store.get(tow_portal.TOWED_DATASET)
+        saved = [dict(row) for row in served]
+        try:
+            # Every dated range is a year old, so settled: edits on the server don't show
+            for row in served:
+                if 'tow_date' in row:
+                    row['make'] = 'EDITED'
+            self.assertEqual(self.fetch(), first)
+            self.assertNotEqual(self.fetch(refresh=True), first)
+        finally:
+            served[:] = saved
+
+
+if __name__ == '__main__':
+    unittest.main()
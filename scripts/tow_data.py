@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Shared loader for the CPD towed-vehicles FOIA workbook
+(25238_P150710_Towed_vehicles.xlsx, sheet "Data").
+
+Parsing the workbook with openpyxl takes far longer than any analysis run on
+it, and every tow script used to do it again. load_foia() converts the sheet
+once into a columnar cache and reuses it for as long as the file is
+unchanged (the cache is keyed by the workbook's SHA-256):
+
+  - the header row is found by scanning the first rows for "Tow Date"
+  - date columns (header contains "date") are parsed to datetimes and stored
+    as int64 microseconds since 1970-01-01 (array 'q', MISSING for blanks)
+  - other columns are kept as the cell values openpyxl returned
+
+Cache reads need only the standard library; openpyxl is imported when the
+workbook has to be converted, pandas only by TowTable.to_dataframe().
+
+USAGE:
+  from tow_data import load_foia
+  foia = load_foia()
+  for tow_date, created in zip(foia.datetimes('Tow Date'), foia.datetimes('Date Tow Record Created')):
+      ...
+  foia_df = foia.to_dataframe()   # date columns as datetime64
+
+  python3 scripts/tow_data.py [--refresh]   # build the cache and print a summary
+"""
+
+import hashlib
+import os
+import pickle
+import sys
+from array import array
+from datetime import date, datetime, timedelta
+
+FOIA_FILE = os.environ.get('TOW_FOIA_FILE', '/home/randy-vollrath/Downloads/25238_P150710_Towed_vehicles.xlsx')
+FOIA_SHEET = 'Data'
+# OEMC dispatch events for the tow event types (FOIA F261085, pipe-delimited)
+OEMC_FILE = os.environ.get('TOW_OEMC_FILE', '/home/randy-vollrath/Downloads/FOIA_F261085_TOW_AUG_OCT_2025.csv')
+CACHE_DIR = os.environ.get('TOW_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'ticketless-tow'))
+
+# Bump when the cache layout or parsing changes
+CACHE_VERSION = 2
+
+HEADER_SCAN_ROWS = 10
+HEADER_MARKER = 'Tow Date'
+
+# Formats seen in string cells across the tow scripts
+DATETIME_FORMATS = ['%Y-%m-%d %H:%M:%S', '%m/%d/%Y %H:%M:%S', '%m/%d/%Y %H:%M', '%m/%d/%Y %I:%M:%S %p',
+                    '%Y-%m-%d', '%m/%d/%Y']
+
+EPOCH = datetime(1970, 1, 1)
+# Same bit pattern as NaT in numpy/pandas datetime64
+MISSING = -(1 << 63)
+
+
+def parse_tow_datetime(value):
+    """Parse one workbook cell (datetime, date or string) to a datetime, or None."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    if isinstance(value, str):
+        value = value.strip()
+        for fmt in DATETIME_FORMATS:
+            try:
+                return datetime.strptime(value, fmt)
+            except ValueError:
+                continue
+    return None
+
+
+def parse_datetime_column(values, formats=DATETIME_FORMATS):
+    """
+    Parse a column of mixed datetime cells and strings to a datetime64[ns]
+    pandas Series (NaT where nothing matches).
+
+    A datetime64 column is returned unchanged. Otherwise datetime/date objects
+    are converted in one pd.to_datetime pass, and strings are parsed one
+    format at a time over the values no earlier format matched (instead of up
+    to len(formats) strptime calls per value). Other values (numbers, bools)
+    become NaT.
+    """
+    import pandas as pd
+
+    column = values if isinstance(values, pd.Series) else pd.Series(values, dtype=object)
+    if pd.api.types.is_datetime64_any_dtype(column):
+        return column
+
+    kind = pd.api.types.infer_dtype(column, skipna=True)
+    if kind in ('datetime', 'datetime64', 'date'):
+        return pd.to_datetime(column, errors='coerce')
+
+    result = pd.Series(pd.NaT, index=column.index, dtype='datetime64[ns]')
+    if kind == 'string':
+        strings = column.dropna()
+    else:
+        is_str = column.map(lambda v: isinstance(v, str))
+        is_native = column.map(lambda v: isinstance(v, (datetime, date)))
+        if is_native.any():
+            result[is_native] = pd.to_datetime(column[is_native], errors='coerce')
+        strings = column[is_str]
+
+    remaining = strings.str.strip()
+    for fmt in formats:
+        if remaining.empty:
+            break
+        parsed = pd.to_datetime(remaining, format=fmt, errors='coerce')
+        matched = parsed.notna()
+        result[matched[matched].index] = parsed[matched]
+        remaining = remaining[~matched]
+    return result
+
+
+def _to_micros(dt):
+    if dt is None:
+        return MISSING
+    delta = dt.replace(tzinfo=None) - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def _from_micros(values):
+    return [EPOCH + timedelta(microseconds=v) if v != MISSING else None for v in values]
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_date_column(header):
+    return 'date' in header.lower()
+
+
+class TowTable:
+    """
+    Columnar view of the FOIA sheet.
+
+    headers:    column names in sheet order
+    header_row: 1-based sheet row the headers were found on
+    """
+
+    def __init__(self, headers, header_row, columns, dates, source=None):
+        self.headers = headers
+        self.header_row = header_row
+        self._columns = columns    # header -> list of cell values (non-date columns)
+        self._dates = dates        # header -> array('q') of microseconds (date columns)
+        self.source = source
+        self._datetimes = {}
+
+    def __len__(self):
+        if self._dates:
+            return len(next(iter(self._dates.values())))
+        return len(next(iter(self._columns.values()), []))
+
+    def __contains__(self, header):
+        return header in self._columns or header in self._dates
+
+    def find(self, *words, exclude=()):
+        """First header containing all words (case-insensitive) and none of exclude, or None."""
+        for header in self.headers:
+            lower = header.lower()
+            if all(w in lower for w in words) and not any(w in lower for w in exclude):
+                return header
+        return None
+
+    def column(self, header):
+        """Values of one column; date columns come back as datetimes (None if blank)."""
+        if header in self._dates:
+            return self.datetimes(header)
+        return self._columns[header]
+
+    def datetimes(self, header):
+        """A date column as a list of datetime or None."""
+        if header not in self._datetimes:
+            self._datetimes[header] = _from_micros(self._dates[header])
+        return self._datetimes[header]
+
+    def micros(self, header):
+        """A date column as int64 microseconds since 1970 (MISSING for blanks)."""
+        return self._dates[header]
+
+    def rows(self):
+        """Iterate rows as tuples in header order (like iter_rows(values_only=True))."""
+        return zip(*(self.column(header) for header in self.headers))
+
+    def to_dataframe(self):
+        """pandas DataFrame of the sheet, date columns as datetime64[ns] (NaT for blanks)."""
+        import numpy as np
+        import pandas as pd
+
+        data = {}
+        for header in self.headers:
+            if header in self._dates:
+                micros = np.frombuffer(self._dates[header], dtype=np.int64)
+                data[header] = micros.view('datetime64[us]').astype('datetime64[ns]')
+            else:
+                data[header] = self._columns[header]
+        return pd.DataFrame(data, columns=self.headers)
+
+
+def _header_names(row):
+    """
+    Stripped header names. Blanks become "Column N" and a repeated name gets
+    ".1", ".2", ... as pandas does, so no column is lost to a duplicate.
+    """
+    names = []
+    seen = set()
+    for idx, value in enumerate(row):
+        name = str(value).strip() if value is not None else ''
+        base = name = name or f'Column {idx + 1}'
+        copy = 0
+        while name in seen:
+            copy += 1
+            name = f'{base}.{copy}'
+        seen.add(name)
+        names.append(name)
+    return names
+
+
+def convert_workbook(path=FOIA_FILE, sheet=FOIA_SHEET):
+    """Read the sheet with openpyxl and return a TowTable."""
+    from openpyxl import load_workbook
+
+    print(f"Converting {os.path.basename(path)} (sheet {sheet!r}); this only happens once per file...")
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet]
+        header_row = None
+        headers = None
+        for idx, row in enumerate(ws.iter_rows(min_row=1, max_row=HEADER_SCAN_ROWS, values_only=True), start=1):
+            if any(isinstance(v, str) and v.strip() == HEADER_MARKER for v in row):
+                header_row = idx
+                headers = _header_names(row)
+                break
+        if headers is None:
+            raise ValueError(f"no header row with {HEADER_MARKER!r} in the first {HEADER_SCAN_ROWS} rows")
+
+        width = len(headers)
+        values = [[] for _ in headers]
+        for row in ws.iter_rows(min_row=header_row + 1, values_only=True):
+            if not any(v is not None for v in row):
+                continue
+            for idx in range(width):
+                values[idx].append(row[idx] if idx < len(row) else None)
+    finally:
+        wb.close()
+
+    columns = {}
+    dates = {}
+    for header, column in zip(headers, values):
+        if is_date_column(header):
+            dates[header] = array('q', (_to_micros(parse_tow_datetime(v)) for v in column))
+        else:
+            columns[header] = column
+    return TowTable(headers, header_row, columns, dates, source=path)
+
+
+def load_foia(path=FOIA_FILE, sheet=FOIA_SHEET, refresh=False, cache_dir=CACHE_DIR):
+    """Return the FOIA sheet as a TowTable, from cache when the workbook is unchanged."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"FOIA workbook not found: {path}")
+
+    digest = file_sha256(path)
+    cache_path = os.path.join(cache_dir, f"foia-{digest[:16]}-{sheet}.pickle")
+
+    if not refresh and os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'rb') as f:
+                cached = pickle.load(f)
+            if cached.get('version') == CACHE_VERSION and cached.get('sha256') == digest:
+                return TowTable(cached['headers'], cached['header_row'], cached['columns'], cached['dates'],
+                                source=path)
+        except (OSError, pickle.UnpicklingError, EOFError, KeyError, AttributeError):
+            pass
+
+    table = convert_workbook(path, sheet)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{cache_path}.tmp-{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump({
+            'version': CACHE_VERSION,
+            'sha256': digest,
+            'sheet': sheet,
+            'header_row': table.header_row,
+            'headers': table.headers,
+            'columns': table._columns,
+            'dates': table._dates,
+        }, f, pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, cache_path)
+    return table
+
+
+# Values that mean "no inventory number" after str() and strip()
+MISSING_KEYS = ['', 'nan', 'None', 'NaN', '<NA>']
+
+
+def normalize_inventory(values):
+    """
+    Inventory numbers as stripped strings (pandas Series), NA where missing.
+    Float-typed numbers (7000001.0, from columns with blanks) lose the '.0'
+    so they match the portal's strings.
+    """
+    import pandas as pd
+
+    keys = pd.Series(values).astype('string').str.strip().str.replace(r'\.0$', '', regex=True)
+    return keys.mask(keys.isin(MISSING_KEYS))
+
+
+def inventory_key(value):
+    """One inventory number normalized like normalize_inventory(), or None."""
+    if value is None:
+        return None
+    key = str(value).strip()
+    if key.endswith('.0'):
+        key = key[:-2]
+    return None if key in MISSING_KEYS else key
+
+
+def _duplicate_summary(keys, examples=5):
+    counts = keys.value_counts()
+    dupes = counts[counts > 1]
+    return {
+        'keys': int(len(dupes)),
+        'rows': int(dupes.sum()),
+        'examples': {str(k): int(n) for k, n in dupes.head(examples).items()},
+    }
+
+
+def join_on_inventory(left, right, left_key, right_key='inventory_number', dedupe_left=True,
+                      suffixes=('', '_right')):
+    """
+    Inner-join two DataFrames on normalized inventory number with one merge.
+
+    Matches the dict-lookup joins the tow scripts used to build with
+    iterrows(): a repeated key resolves to its last row on the right; on the
+    left it does too when dedupe_left is set (at the key's first position),
+    otherwise every left row is kept. Rows come back in left order with an
+    'inventory_number' column holding the normalized key.
+
+    Returns (joined, stats); stats has row/key counts, duplicate-key
+    diagnostics and match rates for both sides (see print_join_stats()).
+    """
+    left = left.assign(inventory_number=normalize_inventory(left[left_key]).values)
+    right = right.assign(inventory_number=normalize_inventory(right[right_key]).values)
+    left = left[left['inventory_number'].notna()]
+    right = right[right['inventory_number'].notna()]
+
+    stats = {
+        'left_rows': len(left),
+        'right_rows': len(right),
+        'left_duplicates': _duplicate_summary(left['inventory_number']),
+        'right_duplicates': _duplicate_summary(right['inventory_number']),
+        'left_deduped': dedupe_left,
+    }
+
+    right = right.drop_duplicates('inventory_number', keep='last')
+    if dedupe_left:
+        first_seen = left['inventory_number'].drop_duplicates(keep='first')
+        left = (left.drop_duplicates('inventory_number', keep='last')
+                .set_index('inventory_number').loc[first_seen.values].reset_index())
+    stats['left_keys'] = int(left['inventory_number'].nunique())
+    stats['right_keys'] = len(right)
+
+    # An inner merge keeps the left frame's row order
+    joined = left.merge(right, on='inventory_number', how='inner', suffixes=suffixes, sort=False)
+    stats['matched'] = len(joined)
+    matched_keys = joined['inventory_number'].nunique()
+    stats['left_match_rate'] = matched_keys / stats['left_keys'] if stats['left_keys'] else 0.0
+    stats['right_match_rate'] = matched_keys / stats['right_keys'] if stats['right_keys'] else 0.0
+    return joined, stats
+
+
+def print_join_stats(stats, left_name='left', right_name='right'):
+    """Print the match rates and duplicate-key diagnostics from join_on_inventory()."""
+    for side, name in (('left', left_name), ('right', right_name)):
+        dupes = stats[f'{side}_duplicates']
+        print(f"{name}: {stats[f'{side}_rows']:,} rows with inventory numbers, "
+              f"{stats[f'{side}_keys']:,} unique, {stats[f'{side}_match_rate'] * 100:.1f}% matched")
+        if dupes['keys']:
+            examples = ', '.join(f"{k} (x{n})" for k, n in dupes['examples'].items())
+            resolved = 'last row used' if side == 'right' or stats['left_deduped'] else 'all rows kept'
+            print(f"  {dupes['keys']:,} inventory numbers repeat across {dupes['rows']:,} rows "
+                  f"({resolved}), e.g. {examples}")
+
+
+if __name__ == '__main__':
+    started = datetime.now()
+    foia = load_foia(refresh='--refresh' in sys.argv[1:])
+    print(f"Loaded {len(foia):,} rows in {(datetime.now() - started).total_seconds():.2f}s "
+          f"(headers on row {foia.header_row})")
+    for header in foia.headers:
+        kind = 'datetime' if header in foia._dates else 'value'
+        print(f"  {header:35} {kind}")
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Time-window interval join between OEMC dispatch events and CPD tow records.
+
+The OEMC export has no inventory number, so a dispatch can only be tied to a
+tow by place and time: same location key, and a dispatch time within
+[tow - before, tow + after]. interval_join() does this as a sort-merge:
+
+  - both sides are sorted by (location key, time), O(n log n)
+  - one sweep walks the tows in that order while the start of the window
+    only ever moves forward through the dispatches, so each tow looks only
+    at the dispatches inside its own window (no nested loop over all pairs)
+  - each tow takes the dispatch nearest in time (the earlier one on a tie);
+    a dispatch may serve more than one tow (counted in the stats)
+
+Location keys (normalize_address() first: upper case, single spaces, street
+suffixes abbreviated):
+  block    hundred block, "7104 N CLARK ST" -> "7100 N CLARK ST" (default;
+           OEMC and CPD rarely record the same house number)
+  address  the full normalized address
+  none     time window only
+
+Midnight-stamped tows (tow date 00:00:00, the time is unknown) are left out.
+Dispatch time is DISPATCH_DATE, or ENTRY_DATE when the event was never
+dispatched.
+
+Standard library only.
+
+USAGE:
+  from tow_join import match_dispatches
+  matches, stats = match_dispatches(load_foia(), load_oemc())
+
+  python3 scripts/tow_join.py [--before-min 240] [--after-min 15] [--key block] [--csv latencies.csv]
+"""
+
+import argparse
+import csv
+import re
+import sys
+from collections import Counter
+from datetime import timedelta
+
+from oemc_data import load_oemc
+from tow_data import EPOCH, FOIA_FILE, MISSING, OEMC_FILE, load_foia
+from tow_stats import Distribution
+
+# Dispatch window around each tow
+DEFAULT_BEFORE_MIN = 4 * 60
+# Dispatches logged shortly after the tow (clock differences between systems)
+DEFAULT_AFTER_MIN = 15
+
+LOCATION_KEYS = ('block', 'address', 'none')
+
+STREET_SUFFIXES = {
+    'STREET': 'ST', 'AVENUE': 'AVE', 'AV': 'AVE', 'BOULEVARD': 'BLVD', 'ROAD': 'RD', 'DRIVE': 'DR',
+    'PLACE': 'PL', 'COURT': 'CT', 'PARKWAY': 'PKWY', 'TERRACE': 'TER', 'LANE': 'LN',
+}
+
+MICROS_PER_MINUTE = 60 * 1000000
+MICROS_PER_DAY = 24 * 60 * MICROS_PER_MINUTE
+
+_NON_ADDRESS = re.compile(r'[^A-Z0-9 ]+')
+
+
+def normalize_address(value):
+    """Upper case, punctuation dropped, single spaces, street suffixes abbreviated; None if blank."""
+    if not value:
+        return None
+    words = _NON_ADDRESS.sub(' ', str(value).upper()).split()
+    if not words:
+        return None
+    words[-1] = STREET_SUFFIXES.get(words[-1], words[-1])
+    return ' '.join(words)
+
+
+def location_key(value, mode='block'):
+    """Join key for an address under one of LOCATION_KEYS (None: can't be matched)."""
+    if mode == 'none':
+        return ''
+    address = normalize_address(value)
+    if address is None or mode == 'address':
+        return address
+    number, _, street = address.partition(' ')
+    if not number.isdigit() or not street:
+        return address
+    return f"{int(number) // 100 * 100} {street}"
+
+
+def interval_join(left, right, before, after):
+    """
+    Match (key, time, id) items on the left to the right item with the same
+    key whose time lies in [time - before, time + after], nearest in time.
+
+    Times are anything ordered that before/after can be subtracted from and
+    added to (ints, or datetimes with timedelta windows). Returns
+    {left id: right id} for the left items that found a match.
+    """
+    left = sorted(left, key=lambda item: (item[0], item[1]))
+    right = sorted(right, key=lambda item: (item[0], item[1]))
+    matches = {}
+    start = 0
+    n = len(right)
+    for key, time, left_id in left:
+        lo = time - before
+        # Left items come in (key, time) order, so the window start never moves back
+        while start < n and (right[start][0], right[start][1]) < (key, lo):
+            start += 1
+        hi = time + after
+        best = None
+        best_distance = None
+        i = start
+        while i < n and right[i][0] == key and right[i][1] <= hi:
+            distance = abs(time - right[i][1])
+            if best is None or distance < best_distance:
+                best, best_distance = right[i][2], distance
+            i += 1
+        if best is not None:
+            matches[left_id] = best
+    return matches
+
+
+def oemc_datetime_column(oemc, word):
+    """First OEMC datetime column with word in its name; ValueError if there is none."""
+    for header in oemc.headers:
+        if word in header.lower() and header in oemc.formats:
+            return header
+    raise ValueError(f"no OEMC datetime column with {word!r} in its name "
+                     f"(datetime columns: {', '.join(oemc.formats) or 'none'})")
+
+
+def match_dispatches(foia, oemc, before_min=DEFAULT_BEFORE_MIN, after_min=DEFAULT_AFTER_MIN, key='block'):
+    """
+    Match FOIA tows to OEMC dispatch events. Returns ({tow row: event row},
+    stats) with row indexes into the two tables.
+    """
+    if key not in LOCATION_KEYS:
+        raise ValueError(f"key must be one of {', '.join(LOCATION_KEYS)}, not {key!r}")
+    dispatch_col = oemc_datetime_column(oemc, 'dispatch')
+    entry_col = oemc_datetime_column(oemc, 'entry')
+
+    address_col = foia.find('address') or foia.find('location')
+    location_col = oemc.find('location')
+    if key != 'none' and (address_col is None or location_col is None):
+        raise ValueError("need a tow address column and an OEMC location column for a location key")
+
+    stats = Counter()
+    tows = []
+    addresses = foia.column(address_col) if address_col else [None] * len(foia)
+    for row, (tow_time, address) in enumerate(zip(foia.micros('Tow Date'), addresses)):
+        if tow_time == MISSING:
+            stats['tows_without_date'] += 1
+        elif tow_time % MICROS_PER_DAY == 0:
+            stats['tows_midnight_stamped'] += 1
+        else:
+            loc = location_key(address, key)
+            if loc is None:
+                stats['tows_without_location'] += 1
+            else:
+                tows.append((loc, tow_time, row))
+
+    events = []
+    dispatched = oemc.micros(dispatch_col)
+    entered = oemc.micros(entry_col)
+    locations = oemc.column(location_col) if location_col else [None] * len(oemc)
+    for row, (dispatch_time, entry_time, location) in enumerate(zip(dispatched, entered, locations)):
+        event_time = dispatch_time if dispatch_time != MISSING else entry_time
+        loc = location_key(location, key)
+        if event_time == MISSING or loc is None:
+            stats['events_unusable'] += 1
+        else:
+            events.append((loc, event_time, row))
+
+    matches = interval_join(tows, events, before_min * MICROS_PER_MINUTE, after_min * MICROS_PER_MINUTE)
+    event_uses = Counter(matches.values())
+    stats.update({
+        'tows_considered': len(tows),
+        'events_considered': len(events),
+        'matched': len(matches),
+        'events_matched': len(event_uses),
+        'events_reused': sum(1 for n in event_uses.values() if n > 1),
+    })
+    return matches, dict(stats)
+
+
+def _stamp(micros):
+    return None if micros == MISSING else EPOCH + timedelta(microseconds=micros)
+
+
+def _minutes(later, earlier):
+    if later == MISSING or earlier == MISSING:
+        return None
+    return (later - earlier) / MICROS_PER_MINUTE
+
+
+def latency_rows(foia, oemc, matches):
+    """
+    One dict per matched tow: ids, timestamps and the latencies in minutes
+    (call to dispatch, dispatch to tow, tow to CPD record, dispatch to record).
+    """
+    inventory_col = foia.find('inventory')
+    inventory = foia.column(inventory_col) if inventory_col else [None] * len(foia)
+    tow_dates = foia.micros('Tow Date')
+    created = (foia.micros('Date Tow Record Created') if 'Date Tow Record Created' in foia
+               else [MISSING] * len(foia))
+    event_col = oemc.find('event')
+    event_numbers = oemc.column(event_col) if event_col else [None] * len(oemc)
+    entered = oemc.micros(oemc_datetime_column(oemc, 'entry'))
+    dispatched = oemc.micros(oemc_datetime_column(oemc, 'dispatch'))
+
+    for tow_row, event_row in sorted(matches.items()):
+        entry, dispatch = entered[event_row], dispatched[event_row]
+        dispatch = dispatch if dispatch != MISSING else entry
+        yield {
+            'inventory_number': inventory[tow_row],
+            'event_number': event_numbers[event_row],
+            'call_entered': _stamp(entry),
+            'dispatched': _stamp(dispatch),
+            'towed': _stamp(tow_dates[tow_row]),
+            'record_created': _stamp(created[tow_row]),
+            'call_to_dispatch_min': _minutes(dispatch, entry),
+            'dispatch_to_tow_min': _minutes(tow_dates[tow_row], dispatch),
+            'tow_to_record_min': _minutes(created[tow_row], tow_dates[tow_row]),
+            'dispatch_to_record_min': _minutes(created[tow_row], dispatch),
+        }
+
+
+LATENCY_FIELDS = ['call_to_dispatch_min', 'dispatch_to_tow_min', 'tow_to_record_min', 'dispatch_to_record_min']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Match OEMC dispatch events to CPD tows by place and time')
+    parser.add_argument('--foia', default=FOIA_FILE)
+    parser.add_argument('--oemc', default=OEMC_FILE)
+    parser.add_argument('--before-min', type=int, default=DEFAULT_BEFORE_MIN,
+                        help='Dispatch up to this many minutes before the tow')
+    parser.add_argument('--after-min', type=int, default=DEFAULT_AFTER_MIN,
+                        help='or this many minutes after it')
+    parser.add_argument('--key', choices=LOCATION_KEYS, default='block', help='Location key')
+    parser.add_argument('--csv', help='Write one row per matched tow')
+    args = parser.parse_args()
+
+    try:
+        foia = load_foia(args.foia)
+        oemc = load_oemc(args.oemc)
+        matches, stats = match_dispatches(foia, oemc, args.before_min, args.after_min, args.key)
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
+    print(f"Window: dispatch {args.before_min} min before to {args.after_min} min after the tow, "
+          f"location key: {args.key}")
+    for name, value in stats.items():
+        print(f"  {name:25s} {value:,}")
+    considered = stats['tows_considered']
+    print(f"Matched {stats['matched']:,} of {considered:,} timed tows "
+          f"({stats['matched'] * 100 / considered if considered else 0:.1f}%)")
+
+    rows = list(latency_rows(foia, oemc, matches))
+    if rows:
+        print(f"\n{'Latency (minutes)':25s} {'n':>7s} {'P25':>8s} {'Median':>8s} {'P75':>8s} {'P90':>8s}")
+        for field in LATENCY_FIELDS:
+            dist = Distribution(row[field] for row in rows if row[field] is not None)
+            if dist:
+                p25, p50, p75, p90 = dist.percentiles([25, 50, 75, 90])
+                print(f"{field:25s} {len(dist):7,} {p25:8.1f} {p50:8.1f} {p75:8.1f} {p90:8.1f}")
+
+    if args.csv:
+        with open(args.csv, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ['inventory_number'])
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"\nWrote {len(rows):,} matched tows to {args.csv}")
+
+
+if __name__ == '__main__':
+    main()
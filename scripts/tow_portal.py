@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Partitioned, parallel fetch of the Towed Vehicles dataset (ygr5-vcbg) from
+the Chicago Data Portal.
+
+Paging the whole dataset with $offset gets slower with every page (the
+portal re-scans up to the offset each time) and analyze-tow-delay.py used to
+stop at a 200K safety cap. fetch_towed_vehicles() instead:
+
+  - asks for the oldest and newest tow_date (two one-row queries)
+  - splits that span into PARTITION_DAYS-wide tow_date ranges
+  - fetches the ranges on FETCH_WORKERS threads (each range pages with
+    $offset only if it is bigger than PAGE_SIZE, which is rare)
+  - stitches them newest first, ordered by tow_date DESC like the old query,
+    keeping every row: a repeated inventory_number is counted, not dropped,
+    so consumers that keep the last row per number (join_on_inventory(),
+    tow_reports.portal_tow_dates()) still end up with the oldest, as before
+
+Each range is cached as JSON under CACHE_DIR/portal. Ranges that ended more
+than SETTLED_DAYS ago are reused from the cache; recent ones are always
+fetched again because tows are still being added to them.
+
+Standard library only.
+
+USAGE:
+  from tow_portal import fetch_towed_vehicles
+  rows = fetch_towed_vehicles()            # list of row dicts, like the JSON endpoint
+
+  python3 scripts/tow_portal.py [--refresh] [--workers 8] [--days 7]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from portal_client import iter_json_rows, open_body
+from tow_data import CACHE_DIR
+
+TOWED_DATASET = 'ygr5-vcbg'
+
+# Override to point at a local stand-in (scripts/portal-standin-server.py)
+PORTAL_URL = os.environ.get('CHICAGO_PORTAL_URL', 'https://data.cityofchicago.org')
+
+PARTITION_DAYS = 7
+FETCH_WORKERS = 8
+PAGE_SIZE = 50000
+FETCH_RETRIES = 2
+REQUEST_TIMEOUT = 120  # seconds
+
+# Ranges that ended this long ago no longer change and are served from cache
+SETTLED_DAYS = 14
+
+PORTAL_CACHE_DIR = os.path.join(CACHE_DIR, 'portal')
+
+SOQL_DATETIME = '%Y-%m-%dT%H:%M:%S'
+
+
+def _query(params, dataset_id=TOWED_DATASET):
+    """Run one SoQL query and return the rows, retrying transient failures."""
+    url = f"{PORTAL_URL}/resource/{dataset_id}.json?{urllib.parse.urlencode(params)}"
+    for attempt in range(FETCH_RETRIES + 1):
+        try:
+            req = urllib.request.Request(url)
+            req.add_header('Accept', 'application/json')
+            req.add_header('Accept-Encoding', 'gzip')
+            with urllib.request.urlopen(req, timeout=REQUEST_TIMEOUT) as response:
+                return list(iter_json_rows(open_body(response)))
+        except (OSError, ValueError) as e:
+            if attempt == FETCH_RETRIES:
+                raise
+            print(f"    Retrying after error: {e}")
+            time.sleep(2 ** attempt)
+
+
+def _parse_tow_date(value):
+    return datetime.strptime(value[:19], SOQL_DATETIME)
+
+
+def tow_date_bounds():
+    """(oldest, newest) tow_date in the dataset as datetimes, or None if it is empty."""
+    bounds = []
+    for order in ('ASC', 'DESC'):
+        rows = _query({'$select': 'tow_date', '$where': 'tow_date IS NOT NULL',
+                       '$order': f'tow_date {order}', '$limit': 1})
+        if not rows:
+            return None
+        bounds.append(_parse_tow_date(rows[0]['tow_date']))
+    return tuple(bounds)
+
+
+def date_partitions(start, end, days=PARTITION_DAYS):
+    """Half-open [lo, hi) day-aligned ranges covering start..end, newest first."""
+    lo = datetime(start.year, start.month, start.day)
+    last = datetime(end.year, end.month, end.day) + timedelta(days=1)
+    ranges = []
+    while lo < last:
+        hi = min(lo + timedelta(days=days), last)
+        ranges.append((lo, hi))
+        lo = hi
+    ranges.reverse()
+    return ranges
+
+
+def _cache_path(lo, hi, cache_dir):
+    return os.path.join(cache_dir, f"{TOWED_DATASET}-{lo:%Y%m%d}-{hi:%Y%m%d}.json")
+
+
+def fetch_partition(lo, hi, refresh=False, cache_dir=PORTAL_CACHE_DIR):
+    """
+    All rows with lo <= tow_date < hi, ordered by tow_date DESC; lo=hi=None
+    fetches the rows without a tow_date. Returns (rows, from_cache).
+    """
+    if lo is None:
+        where = 'tow_date IS NULL'
+        path = None
+        settled = False
+    else:
+        where = f"tow_date >= '{lo:{SOQL_DATETIME}}' AND tow_date < '{hi:{SOQL_DATETIME}}'"
+        path = _cache_path(lo, hi, cache_dir)
+        settled = hi <= datetime.now() - timedelta(days=SETTLED_DAYS)
+    if settled and not refresh and os.path.exists(path):
+        try:
+            with open(path) as f:
+                return json.load(f), True
+        except (OSError, ValueError):
+            pass
+
+    rows = []
+    offset = 0
+    while True:
+        page = _query({'$where': where, '$order': ':id', '$limit': PAGE_SIZE, '$offset': offset})
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            break
+        offset += PAGE_SIZE
+    rows.sort(key=lambda row: row.get('tow_date', ''), reverse=True)
+
+    if settled:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        with open(tmp_path, 'w') as f:
+            json.dump(rows, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+    return rows, False
+
+
+def fetch_towed_vehicles(start=None, end=None, workers=FETCH_WORKERS, days=PARTITION_DAYS,
+                         refresh=False, cache_dir=PORTAL_CACHE_DIR):
+    """
+    Fetch every towed-vehicle row with tow_date between start and end
+    (datetimes, default: the whole dataset), newest first. Fetching the
+    whole dataset also picks up rows without a tow_date (last, as in a
+    tow_date DESC query).
+    """
+    whole = start is None and end is None
+    if start is None or end is None:
+        bounds = tow_date_bounds()
+        if bounds is None:
+            return []
+        start = start or bounds[0]
+        end = end or bounds[1]
+
+    ranges = date_partitions(start, end, days)
+    print(f"  {len(ranges)} tow_date ranges of {days} days, {start:%Y-%m-%d} to {end:%Y-%m-%d}, "
+          f"{workers} workers")
+    if whole:
+        ranges.append((None, None))
+
+    def fetch(bounds):
+        return fetch_partition(*bounds, refresh=refresh, cache_dir=cache_dir)
+
+    rows = []
+    seen = set()
+    repeated = 0
+    cached = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # map() yields in range order (newest first) as results complete
+        for partition, from_cache in pool.map(fetch, ranges):
+            cached += from_cache
+            for row in partition:
+                inv = row.get('inventory_number')
+                if inv is not None:
+                    if inv in seen:
+                        repeated += 1
+                    seen.add(inv)
+                rows.append(row)
+
+    print(f"  {len(rows):,} rows ({cached} of {len(ranges)} ranges from cache"
+          f"{f', {repeated:,} rows repeat an inventory number' if repeated else ''})")
+    return rows
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fetch the towed vehicles dataset (ygr5-vcbg)')
+    parser.add_argument('--refresh', action='store_true', help='Ignore cached ranges')
+    parser.add_argument('--workers', type=int, default=FETCH_WORKERS)
+    parser.add_argument('--days', type=int, default=PARTITION_DAYS, help='Days per tow_date range')
+    args = parser.parse_args()
+
+    started = time.time()
+    try:
+        result = fetch_towed_vehicles(workers=args.workers, days=args.days, refresh=args.refresh)
+    except OSError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    print(f"Fetched {len(result):,} rows in {time.time() - started:.2f}s")
@@ -0,0 +1,714 @@
+#!/usr/bin/env python3
+"""
+Tow analyses as pluggable reducers over one pass of the data.
+
+The tow findings used to come from six scripts that each loaded the FOIA
+workbook (and the portal or OEMC data) again. Here every analysis is a
+Report that is fed rows one at a time:
+
+  - add_tow(tow) for each FOIA row (a Tow tuple, dates already parsed)
+  - add_dispatch(event) for each OEMC dispatch event
+  - start(context) once before the pass, with lookups preloaded for reports
+    that need them (context['portal']: inventory number -> portal tow_date)
+
+result() returns a JSON-ready dict and print_report() prints it. Reports
+keep QuantileSketch / BucketHistogram summaries rather than row lists, so
+memory stays bounded however many rows go through. run_reports() streams
+each source once and feeds every selected report that reads it.
+
+Adding an analysis: subclass Report, set name/title/sources, and decorate it
+with @register; analyze-tow.py picks it up by name.
+
+Standard library only.
+
+USAGE:
+  from tow_reports import REPORTS, run_reports
+  reports = [REPORTS[name]() for name in ('record-lag', 'midnight')]
+  results = run_reports(reports, foia=load_foia(), oemc=load_oemc())
+"""
+
+from collections import Counter, defaultdict, namedtuple
+from datetime import datetime, timedelta
+from itertools import repeat
+
+from quantile_sketch import BucketHistogram, QuantileSketch
+from tow_data import inventory_key
+from tow_join import DEFAULT_AFTER_MIN, DEFAULT_BEFORE_MIN, LATENCY_FIELDS, interval_join, location_key
+from tow_portal import SOQL_DATETIME
+
+# One FOIA row. delay is record creation minus tow date in seconds (None
+# unless both dates are present); inventory is normalized (inventory_key()).
+Tow = namedtuple('Tow', 'inventory tow_date created delay reason pound tow_type address')
+
+DispatchEvent = namedtuple('DispatchEvent', 'event_number entry dispatch close location event_type disposition')
+
+# Record creation delays past this are treated as data errors
+MAX_DELAY = 72 * 3600
+
+# Our hourly portal sync adds ~30 min on average
+SYNC_DELAY = 30 * 60
+
+REPORTS = {}
+
+
+def register(cls):
+    """Class decorator: make a Report selectable by its name."""
+    REPORTS[cls.name] = cls
+    return cls
+
+
+def format_duration(seconds):
+    """Seconds as '3h 25m' / '12m'."""
+    total_seconds = int(seconds)
+    hours = total_seconds // 3600
+    minutes = (total_seconds % 3600) // 60
+    return f"{hours}h {minutes}m" if hours > 0 else f"{minutes}m"
+
+
+def _pct(count, total):
+    return count * 100 / total if total else 0.0
+
+
+class DelayStats:
+    """
+    Sketch percentiles, an exact mean and exact counts at fixed edges for
+    one stream of numbers. closed='right' buckets answer within(edge) (<=),
+    closed='left' buckets are [lo, hi) for histograms.
+    """
+
+    def __init__(self, edges=(), closed='right'):
+        self.sketch = QuantileSketch()
+        self.buckets = BucketHistogram(edges, closed)
+        self.total = 0.0
+
+    def __len__(self):
+        return len(self.sketch)
+
+    def update(self, value):
+        self.sketch.update(value)
+        self.buckets.update(value)
+        self.total += value
+
+    def merge(self, other):
+        self.sketch.merge(other.sketch)
+        self.buckets.merge(other.buckets)
+        self.total += other.total
+        return self
+
+    @property
+    def mean(self):
+        return self.total / len(self) if len(self) else None
+
+    def median(self):
+        return self.sketch.quantile(0.5)
+
+    def within(self, edge):
+        return self.buckets.count_at_most(edge)
+
+    def histogram(self, labels):
+        """[{'bucket', 'count', 'pct'}] for the buckets, labels in bucket order."""
+        n = len(self)
+        return [{'bucket': label, 'count': count, 'pct': _pct(count, n)}
+                for label, count in zip(labels, self.buckets.counts)]
+
+    def summary(self, percentiles=(50,), scale=1):
+        """count/min/max/mean/pNN, values divided by scale (e.g. 3600 for hours)."""
+        if not len(self):
+            return {'count': 0}
+        out = {'count': len(self), 'min': self.sketch.min / scale, 'max': self.sketch.max / scale,
+               'mean': self.mean / scale}
+        values = self.sketch.quantiles([p / 100 for p in percentiles])
+        for p, value in zip(percentiles, values):
+            out[f'p{p}'] = value / scale
+        return out
+
+
+def _windows(stats, windows, offset=0):
+    n = len(stats)
+    return [{'window': label, 'seconds': seconds, 'count': stats.within(seconds - offset),
+             'pct': _pct(stats.within(seconds - offset), n)}
+            for seconds, label in windows]
+
+
+def _banner(title):
+    print("\n" + "=" * 80)
+    print(title)
+    print("=" * 80)
+
+
+class Report:
+    """
+    One analysis, fed row by row.
+
+    name:    command-line name
+    title:   heading for the console report
+    sources: data it reads: 'foia', 'portal' (needs 'foia' too), 'oemc'
+    """
+
+    name = None
+    title = None
+    sources = ('foia',)
+
+    def start(self, context):
+        pass
+
+    def add_tow(self, tow):
+        pass
+
+    def add_dispatch(self, event):
+        pass
+
+    def result(self):
+        raise NotImplementedError
+
+    def print_report(self, result):
+        raise NotImplementedError
+
+
+class _FilteredDelays(Report):
+    """Shared filter: both dates present, 0 <= delay <= MAX_DELAY."""
+
+    def __init__(self):
+        self.valid_pairs = 0
+        self.negative = 0
+        self.outliers = 0
+
+    def add_tow(self, tow):
+        if tow.delay is None:
+            return
+        self.valid_pairs += 1
+        if tow.delay < 0:
+            self.negative += 1
+        elif tow.delay > MAX_DELAY:
+            self.outliers += 1
+        else:
+            self.add_delay(tow)
+
+    def add_delay(self, tow):
+        raise NotImplementedError
+
+
+LAG_WINDOWS = [(15 * 60, "15 min"), (30 * 60, "30 min"), (3600, "1 hour"), (2 * 3600, "2 hours"),
+               (3 * 3600, "3 hours"), (4 * 3600, "4 hours"), (6 * 3600, "6 hours"), (8 * 3600, "8 hours"),
+               (12 * 3600, "12 hours"), (24 * 3600, "24 hours")]
+NOTIFY_WINDOWS = [(3600, "1 hour"), (2 * 3600, "2 hours"), (3 * 3600, "3 hours"), (4 * 3600, "4 hours"),
+                  (6 * 3600, "6 hours")]
+
+# (CPD percentile, portal ETL minutes, sync minutes) per scenario
+TIMELINE_SCENARIOS = {'best': (25, 0, 5), 'likely': (50, 15, 30), 'worst': (75, 30, 60)}
+
+
+@register
+class RecordLagReport(_FilteredDelays):
+    """CPD record creation delay for tows with a real (non-midnight) timestamp."""
+
+    name = 'record-lag'
+    title = "CPD RECORD CREATION LAG (non-midnight tow timestamps)"
+
+    def __init__(self):
+        super().__init__()
+        edges = {s for s, _ in LAG_WINDOWS} | {s - SYNC_DELAY for s, _ in NOTIFY_WINDOWS}
+        self.delays = DelayStats(sorted(edges))
+        self.reasons = Counter()
+
+    def add_delay(self, tow):
+        if tow.tow_date.time() == datetime.min.time():
+            return
+        self.delays.update(tow.delay)
+        self.reasons[tow.reason or "Unknown"] += 1
+
+    def result(self):
+        n = len(self.delays)
+        out = {
+            'valid_pairs': self.valid_pairs,
+            'negative_delays': self.negative,
+            'outliers_over_72h': self.outliers,
+            'count': n,
+            'share_of_valid_pct': _pct(n, self.valid_pairs),
+        }
+        if not n:
+            return out
+        out['delay_seconds'] = self.delays.summary((10, 25, 50, 75, 90, 95, 99))
+        out['created_within'] = _windows(self.delays, LAG_WINDOWS)
+        out['notified_within'] = _windows(self.delays, NOTIFY_WINDOWS, offset=SYNC_DELAY)
+        out['top_reasons'] = [{'reason': r, 'count': c, 'pct': _pct(c, n)} for r, c in self.reasons.most_common(10)]
+        out['timeline_minutes'] = {
+            scenario: out['delay_seconds'][f'p{p}'] / 60 + portal + sync
+            for scenario, (p, portal, sync) in TIMELINE_SCENARIOS.items()
+        }
+        return out
+
+    def print_report(self, result):
+        print(f"\nValid date pairs: {result['valid_pairs']:,} "
+              f"(filtered: {result['negative_delays']:,} negative, {result['outliers_over_72h']:,} >72h)")
+        print(f"Non-midnight records: {result['count']:,} ({result['share_of_valid_pct']:.1f}% of valid pairs)")
+        if not result['count']:
+            return
+        delays = result['delay_seconds']
+        print("\nCPD Record Creation Delay Distribution:")
+        print(f"  Min:    {format_duration(delays['min'])}")
+        for label, p in [("P10", 10), ("P25", 25), ("Median", 50), ("P75", 75), ("P90", 90), ("P95", 95), ("P99", 99)]:
+            print(f"  {label + ':':7s} {format_duration(delays[f'p{p}'])}")
+        print(f"  Max:    {format_duration(delays['max'])}")
+
+        print("\n% of records created within:")
+        for w in result['created_within']:
+            print(f"  {w['window']:10s}: {w['pct']:5.1f}%  ({w['count']:,} records)")
+        print(f"\nWith our ~{SYNC_DELAY // 60} min average sync delay, % of users notified within:")
+        for w in result['notified_within']:
+            print(f"  {w['window']:10s}: {w['pct']:5.1f}%  ({w['count']:,} users)")
+
+        print("\nTow Reason Breakdown (top 10):")
+        for r in result['top_reasons']:
+            print(f"  {str(r['reason']):40s}: {r['count']:5,} ({r['pct']:4.1f}%)")
+
+        print("\nEnd-to-end notification estimate (CPD lag + portal ETL + our sync):")
+        for scenario, (p, portal, sync) in TIMELINE_SCENARIOS.items():
+            total = result['timeline_minutes'][scenario]
+            print(f"  {scenario.capitalize():7s} CPD P{p} + {portal} min portal + {sync} min sync "
+                  f"= ~{int(total)} min ({int(total / 60)}h {int(total % 60)}m)")
+
+
+@register
+class MidnightReport(_FilteredDelays):
+    """What the record creation times say about midnight-stamped tows."""
+
+    name = 'midnight'
+    title = "MIDNIGHT-STAMPED RECORDS (inferred tow times)"
+
+    def __init__(self):
+        super().__init__()
+        self.creation_hours = [0] * 24
+        self.creation_minutes = DelayStats()
+        self.noon_delays = DelayStats()
+
+    def add_delay(self, tow):
+        if tow.tow_date.time() != datetime.min.time():
+            return
+        created = tow.created
+        self.creation_hours[created.hour] += 1
+        self.creation_minutes.update(created.hour * 60 + created.minute)
+        # Speculative: the tow happened at noon on the stamped day
+        noon_delay = tow.delay - 12 * 3600
+        if noon_delay >= 0:
+            self.noon_delays.update(noon_delay)
+
+    def result(self):
+        n = len(self.creation_minutes)
+        out = {'count': n, 'share_of_valid_pct': _pct(n, self.valid_pairs), 'creation_hour_counts': self.creation_hours}
+        if not n:
+            return out
+        mean, median = self.creation_minutes.mean, self.creation_minutes.median()
+        out['mean_creation_time'] = f"{int(mean // 60):02d}:{int(mean % 60):02d}"
+        out['median_creation_time'] = f"{int(median // 60):02d}:{int(median % 60):02d}"
+        out['noon_assumed_delay_seconds'] = self.noon_delays.summary((25, 50, 75))
+        return out
+
+    def print_report(self, result):
+        n = result['count']
+        print(f"\nCount: {n:,} records ({result['share_of_valid_pct']:.1f}% of valid pairs)")
+        if not n:
+            return
+        print("\nRecord creation time of day (when CPD enters midnight-stamped records):")
+        for hour, count in enumerate(result['creation_hour_counts']):
+            pct = _pct(count, n)
+            print(f"  {hour:02d}:00-{hour:02d}:59  {count:5,} ({pct:4.1f}%)  {'█' * int(pct / 2)}")
+        print(f"\nAverage record creation time: {result['mean_creation_time']}")
+        print(f"Median record creation time:  {result['median_creation_time']}")
+        noon = result['noon_assumed_delay_seconds']
+        if noon['count']:
+            print("\nAssuming the tow happened at noon on the stamped day (speculative):")
+            print(f"  P25 delay:    {format_duration(noon['p25'])}")
+            print(f"  Median delay: {format_duration(noon['p50'])}")
+            print(f"  P75 delay:    {format_duration(noon['p75'])}")
+
+
+NOTIFICATION_WINDOWS = [(30 * 60, "30 minutes"), (3600, "1 hour"), (1.5 * 3600, "1.5 hours"), (2 * 3600, "2 hours"),
+                        (3 * 3600, "3 hours"), (4 * 3600, "4 hours"), (5 * 3600, "5 hours"), (6 * 3600, "6 hours"),
+                        (8 * 3600, "8 hours"), (12 * 3600, "12 hours"), (24 * 3600, "24 hours")]
+# Notified within N hours needs the record created within N - 1 hours (hourly sync)
+NOTIFIED_WINDOWS = [(h * 3600, f"{h} hours") for h in (2, 3, 4, 6, 8, 12, 24)]
+NOTIFICATION_EDGES = sorted({s for s, _ in NOTIFICATION_WINDOWS} | {s - 3600 for s, _ in NOTIFIED_WINDOWS})
+
+
+@register
+class NotificationReport(_FilteredDelays):
+    """Share of tows with a record available within each notification window."""
+
+    name = 'notification'
+    title = "NOTIFICATION TIMING (tow to record creation, all records)"
+
+    def __init__(self):
+        super().__init__()
+        self.delays = DelayStats(NOTIFICATION_EDGES)
+        self.by_hour = defaultdict(lambda: DelayStats(NOTIFICATION_EDGES))
+        self.by_reason = defaultdict(lambda: DelayStats(NOTIFICATION_EDGES))
+
+    def add_delay(self, tow):
+        self.delays.update(tow.delay)
+        self.by_hour[tow.tow_date.hour].update(tow.delay)
+        if tow.reason:
+            self.by_reason[tow.reason].update(tow.delay)
+
+    def result(self):
+        n = len(self.delays)
+        out = {'count': n, 'negative_delays': self.negative, 'outliers_over_72h': self.outliers}
+        if not n:
+            return out
+        out['delay_seconds'] = self.delays.summary((50, 75, 90, 95))
+        out['created_within'] = _windows(self.delays, NOTIFICATION_WINDOWS)
+        out['notified_within'] = _windows(self.delays, NOTIFIED_WINDOWS, offset=3600)
+        out['by_tow_hour'] = [
+            {'hour': hour, 'count': len(stats), 'median_seconds': stats.median(),
+             **{f'within_{h}h_pct': _pct(stats.within(h * 3600), len(stats)) for h in (2, 4, 6)}}
+            for hour, stats in sorted(self.by_hour.items())
+        ]
+        by_volume = sorted(self.by_reason.items(), key=lambda x: len(x[1]), reverse=True)[:10]
+        out['by_reason'] = [
+            {'reason': reason, 'count': len(stats), 'median_seconds': stats.median(),
+             'within_4h_pct': _pct(stats.within(4 * 3600), len(stats))}
+            for reason, stats in by_volume
+        ]
+        return out
+
+    def print_report(self, result):
+        n = result['count']
+        print(f"\nValid records: {n:,} (skipped {result['negative_delays']:,} negative, "
+              f"{result['outliers_over_72h']:,} >72h)")
+        if not n:
+            return
+        delays = result['delay_seconds']
+        print(f"  Median delay: {format_duration(delays['p50'])}")
+        for p in (75, 90, 95):
+            print(f"  {p}th percentile: {format_duration(delays[f'p{p}'])}")
+
+        print("\nRecord created within:")
+        for w in result['created_within']:
+            print(f"  Within {w['window']:12s}: {w['count']:6,} / {n:,} ({w['pct']:5.1f}%)")
+        print("\nUser notified within (record creation + hourly sync):")
+        for w in result['notified_within']:
+            print(f"  Notified within {w['window']:8s}: {w['count']:6,} / {n:,} ({w['pct']:5.1f}%)")
+
+        print(f"\n{'Hour':6s}  {'Count':>6s}  {'Median':>10s}  {'<2h':>6s}  {'<4h':>6s}  {'<6h':>6s}")
+        print("-" * 60)
+        for h in result['by_tow_hour']:
+            print(f"{h['hour']:02d}:00   {h['count']:6,}  {format_duration(h['median_seconds']):>10s}  "
+                  f"{h['within_2h_pct']:5.1f}%  {h['within_4h_pct']:5.1f}%  {h['within_6h_pct']:5.1f}%")
+
+        print(f"\n{'Tow Reason':40s}  {'Count':>6s}  {'Median':>10s}  {'<4h':>6s}")
+        print("-" * 80)
+        for r in result['by_reason']:
+            print(f"{r['reason'][:38]:40s}  {r['count']:6,}  {format_duration(r['median_seconds']):>10s}  "
+                  f"{r['within_4h_pct']:5.1f}%")
+
+
+# Hour edges of the portal delay histogram ([lo, hi) buckets)
+PORTAL_GAP_EDGES = [0, 1, 6, 12, 24, 48, 72, 168, 336]
+PORTAL_GAP_LABELS = ["negative", "0-1h", "1-6h", "6-12h", "12-24h", "24-48h", "48-72h", "3-7 days", "7-14 days",
+                     "14+ days"]
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+@register
+class PortalDelayReport(Report):
+    """Portal tow_date against the FOIA tow and record creation dates, matched by inventory number."""
+
+    name = 'portal-delay'
+    title = "PORTAL PUBLICATION DELAY (portal tow_date vs FOIA dates)"
+    sources = ('foia', 'portal')
+
+    def __init__(self):
+        self.portal = {}
+        self.foia_keys = set()
+        self.matched = {}
+
+    def start(self, context):
+        self.portal = context['portal']
+
+    def add_tow(self, tow):
+        if tow.inventory is None:
+            return
+        self.foia_keys.add(tow.inventory)
+        if tow.inventory in self.portal:
+            # A repeated inventory number uses its last FOIA row (like join_on_inventory)
+            self.matched[tow.inventory] = tow
+
+    def result(self):
+        gaps = DelayStats([e * 3600 for e in PORTAL_GAP_EDGES], closed='left')
+        processing = DelayStats()
+        by_day = defaultdict(DelayStats)
+        by_pound = defaultdict(DelayStats)
+        tow_aligned = created_aligned = with_created = 0
+        for key, tow in self.matched.items():
+            portal_date = self.portal[key]
+            if tow.tow_date is None or portal_date is None:
+                continue
+            gap = (portal_date - tow.tow_date).total_seconds()
+            gaps.update(gap)
+            by_day[WEEKDAYS[tow.tow_date.weekday()]].update(gap)
+            by_pound[str(tow.pound)].update(gap)
+            tow_aligned += abs(gap) < 3600
+            if tow.created is not None:
+                with_created += 1
+                created_aligned += abs((portal_date - tow.created).total_seconds()) < 3600
+                processing.update(tow.delay)
+
+        n = len(gaps)
+        out = {
+            'foia_inventory_numbers': len(self.foia_keys),
+            'portal_inventory_numbers': len(self.portal),
+            'matched': len(self.matched),
+            'match_rate_pct': _pct(len(self.matched), len(self.foia_keys)),
+            'complete_date_records': n,
+        }
+        if not n:
+            return out
+        out['gap_hours'] = gaps.summary((25, 50, 75, 90, 95, 99), scale=3600)
+        out['histogram'] = gaps.histogram(PORTAL_GAP_LABELS)
+        out['portal_matches_tow_date_pct'] = _pct(tow_aligned, n)
+        out['portal_matches_created_date_pct'] = _pct(created_aligned, with_created)
+        out['cpd_processing_hours'] = processing.summary((50, 90), scale=3600)
+        out['by_tow_day'] = [{'day': day, 'count': len(by_day[day]), 'mean_hours': by_day[day].mean / 3600,
+                              'median_hours': by_day[day].median() / 3600}
+                             for day in WEEKDAYS if day in by_day]
+        by_volume = sorted(by_pound.items(), key=lambda x: len(x[1]), reverse=True)[:10]
+        out['by_pound'] = [{'pound': pound, 'count': len(stats), 'mean_hours': stats.mean / 3600,
+                            'median_hours': stats.median() / 3600} for pound, stats in by_volume]
+        return out
+
+    def print_report(self, result):
+        print(f"\nFOIA inventory numbers: {result['foia_inventory_numbers']:,}, "
+              f"portal: {result['portal_inventory_numbers']:,}")
+        print(f"Matched: {result['matched']:,} ({result['match_rate_pct']:.1f}% of FOIA), "
+              f"{result['complete_date_records']:,} with both tow dates")
+        if not result['complete_date_records']:
+            return
+        gaps = result['gap_hours']
+        print("\nTime gap statistics (hours):")
+        for label, key in [("Min", 'min'), ("Max", 'max'), ("Mean", 'mean'), ("Median", 'p50'), ("P25", 'p25'),
+                           ("P75", 'p75'), ("P90", 'p90'), ("P95", 'p95'), ("P99", 'p99')]:
+            print(f"  {label + ':':7s} {gaps[key]:.2f}h ({gaps[key] / 24:.1f} days)")
+
+        print("\nDelay distribution:")
+        for bucket in result['histogram']:
+            print(f"  {bucket['bucket']:12} {bucket['count']:6,} ({bucket['pct']:5.1f}%) {'█' * int(bucket['pct'] / 2)}")
+
+        print(f"\nPortal tow_date matches FOIA Tow Date (±1h): {result['portal_matches_tow_date_pct']:.1f}%")
+        print(f"Portal tow_date matches FOIA Created Date (±1h): {result['portal_matches_created_date_pct']:.1f}%")
+        processing = result['cpd_processing_hours']
+        if processing['count']:
+            print(f"CPD processing (created - tow): median {processing['p50']:.2f}h, P90 {processing['p90']:.2f}h")
+
+        print(f"\n{'Day towed':10s} {'Count':>7s} {'Mean':>8s} {'Median':>8s}")
+        for d in result['by_tow_day']:
+            print(f"{d['day']:10s} {d['count']:7,} {d['mean_hours']:7.1f}h {d['median_hours']:7.1f}h")
+        print(f"\n{'Pound':10s} {'Count':>7s} {'Mean':>8s} {'Median':>8s}")
+        for p in result['by_pound']:
+            print(f"{p['pound'][:10]:10s} {p['count']:7,} {p['mean_hours']:7.1f}h {p['median_hours']:7.1f}h")
+
+
+# Minute edges of the dispatch duration histograms ([lo, hi) buckets)
+DISPATCH_EDGES = [15, 30, 60, 120, 240]
+DISPATCH_LABELS = ['0-15min', '15-30min', '30-60min', '1-2h', '2-4h', '4h+']
+
+
+@register
+class DispatchReport(Report):
+    """OEMC call-to-dispatch and dispatch-to-close durations."""
+
+    name = 'dispatch'
+    title = "OEMC DISPATCH DURATIONS"
+    sources = ('oemc',)
+
+    def __init__(self):
+        self.events = 0
+        self.to_dispatch = DelayStats(DISPATCH_EDGES, closed='left')
+        self.to_close = DelayStats(DISPATCH_EDGES, closed='left')
+        self.dispositions = Counter()
+
+    def add_dispatch(self, event):
+        self.events += 1
+        self.dispositions[event.disposition or "Unknown"] += 1
+        if event.entry and event.dispatch:
+            self.to_dispatch.update((event.dispatch - event.entry).total_seconds() / 60)
+        if event.dispatch and event.close:
+            self.to_close.update((event.close - event.dispatch).total_seconds() / 60)
+
+    def result(self):
+        out = {'events': self.events,
+               'dispositions': [{'disposition': d, 'count': c} for d, c in self.dispositions.most_common(10)]}
+        for key, stats in (('entry_to_dispatch_minutes', self.to_dispatch),
+                           ('dispatch_to_close_minutes', self.to_close)):
+            out[key] = stats.summary((50, 90))
+            if len(stats):
+                out[key]['histogram'] = stats.histogram(DISPATCH_LABELS)
+        return out
+
+    def print_report(self, result):
+        print(f"\nEvents: {result['events']:,}")
+        for d in result['dispositions']:
+            print(f"  {str(d['disposition']):20s} {d['count']:7,}")
+        for key, label in (('entry_to_dispatch_minutes', "Call entry to dispatch"),
+                           ('dispatch_to_close_minutes', "Dispatch to close")):
+            stats = result[key]
+            print(f"\n{label} (n={stats['count']:,}):")
+            if not stats['count']:
+                continue
+            print(f"  Min: {stats['min']:.1f}  Median: {stats['p50']:.1f}  P90: {stats['p90']:.1f}  "
+                  f"Max: {stats['max']:.1f}  Mean: {stats['mean']:.1f} minutes")
+            for bucket in stats['histogram']:
+                print(f"    {bucket['bucket']:12} {bucket['count']:6,} ({bucket['pct']:5.2f}%)")
+
+
+@register
+class DispatchLatencyReport(Report):
+    """Call, dispatch, tow and record times for tows matched to OEMC dispatches (tow_join)."""
+
+    name = 'dispatch-latency'
+    title = "DISPATCH TO TOW TO RECORD LATENCY (OEMC events matched to tows)"
+    sources = ('foia', 'oemc')
+
+    def __init__(self, before_min=DEFAULT_BEFORE_MIN, after_min=DEFAULT_AFTER_MIN, key='block'):
+        self.before_min = before_min
+        self.after_min = after_min
+        self.key = key
+        self.tows = []
+        self.events = []
+        self.midnight = 0
+
+    def add_tow(self, tow):
+        if tow.tow_date is None:
+            return
+        if tow.tow_date.time() == datetime.min.time():
+            self.midnight += 1
+            return
+        loc = location_key(tow.address, self.key)
+        if loc is not None:
+            self.tows.append((loc, tow.tow_date, (tow.tow_date, tow.created)))
+
+    def add_dispatch(self, event):
+        when = event.dispatch or event.entry
+        loc = location_key(event.location, self.key)
+        if when is not None and loc is not None:
+            self.events.append((loc, when, event))
+
+    def result(self):
+        tows = [(loc, when, i) for i, (loc, when, _) in enumerate(self.tows)]
+        events = [(loc, when, i) for i, (loc, when, _) in enumerate(self.events)]
+        matches = interval_join(tows, events, timedelta(minutes=self.before_min), timedelta(minutes=self.after_min))
+
+        latencies = {field: DelayStats() for field in LATENCY_FIELDS}
+        for tow_id, event_id in matches.items():
+            tow_date, created = self.tows[tow_id][2]
+            event = self.events[event_id][2]
+            dispatch = event.dispatch or event.entry
+            for field, later, earlier in (('call_to_dispatch_min', dispatch, event.entry),
+                                          ('dispatch_to_tow_min', tow_date, dispatch),
+                                          ('tow_to_record_min', created, tow_date),
+                                          ('dispatch_to_record_min', created, dispatch)):
+                if later is not None and earlier is not None:
+                    latencies[field].update((later - earlier).total_seconds() / 60)
+
+        out = {
+            'window_minutes': {'before': self.before_min, 'after': self.after_min},
+            'location_key': self.key,
+            'tows_midnight_stamped': self.midnight,
+            'tows_considered': len(tows),
+            'events_considered': len(events),
+            'matched': len(matches),
+            'match_rate_pct': _pct(len(matches), len(tows)),
+            'events_reused': sum(1 for n in Counter(matches.values()).values() if n > 1),
+        }
+        for field, stats in latencies.items():
+            out[field] = stats.summary((25, 50, 75, 90))
+        return out
+
+    def print_report(self, result):
+        window = result['window_minutes']
+        print(f"\nWindow: dispatch {window['before']} min before to {window['after']} min after the tow, "
+              f"location key: {result['location_key']}")
+        print(f"Timed tows: {result['tows_considered']:,} ({result['tows_midnight_stamped']:,} midnight-stamped "
+              f"left out), dispatch events: {result['events_considered']:,}")
+        print(f"Matched: {result['matched']:,} ({result['match_rate_pct']:.1f}%), "
+              f"{result['events_reused']:,} events matched more than one tow")
+        print(f"\n{'Latency (minutes)':25s} {'n':>7s} {'P25':>8s} {'Median':>8s} {'P75':>8s} {'P90':>8s}")
+        for field in LATENCY_FIELDS:
+            stats = result[field]
+            if stats['count']:
+                print(f"{field:25s} {stats['count']:7,} {stats['p25']:8.1f} {stats['p50']:8.1f} "
+                      f"{stats['p75']:8.1f} {stats['p90']:8.1f}")
+
+
+def iter_tows(foia):
+    """The FOIA table as Tow tuples (dates parsed, delay computed, inventory normalized)."""
+    def values(*words):
+        header = foia.find(*words)
+        return foia.column(header) if header else repeat(None, len(foia))
+
+    tow_dates = foia.datetimes('Tow Date')
+    created = foia.datetimes('Date Tow Record Created')
+    for inv, tow_date, created_date, reason, pound, tow_type, address in zip(
+            values('inventory'), tow_dates, created, values('reason'), values('pound'), values('type'),
+            values('address')):
+        delay = (created_date - tow_date).total_seconds() if tow_date and created_date else None
+        yield Tow(inventory_key(inv), tow_date, created_date, delay,
+                  str(reason).strip() if reason else None, pound, tow_type, address)
+
+
+def iter_dispatch_events(oemc):
+    """The OEMC table (oemc_data.load_oemc()) as DispatchEvent tuples, datetimes None if blank."""
+    def values(word, dates=False):
+        header = oemc.find(word)
+        if header is None:
+            return repeat(None, len(oemc))
+        return oemc.datetimes(header) if dates and header in oemc.formats else oemc.column(header)
+
+    return map(DispatchEvent._make, zip(
+        values('event_number'), values('entry', dates=True), values('dispatch', dates=True),
+        values('close', dates=True), values('location'), values('type'), values('disposition')))
+
+
+def portal_tow_dates(rows):
+    """{normalized inventory number: portal tow_date (datetime or None)} from portal row dicts."""
+    dates = {}
+    for row in rows:
+        key = inventory_key(row.get('inventory_number'))
+        if key is None:
+            continue
+        value = row.get('tow_date')
+        try:
+            dates[key] = datetime.strptime(value[:19], SOQL_DATETIME) if value else None
+        except ValueError:
+            dates[key] = None
+    return dates
+
+
+def run_reports(reports, foia=None, portal=None, oemc=None):
+    """
+    Feed each source once to every report that reads it and return
+    {report name: result}. foia and oemc are the loaded tables, portal the
+    portal_tow_dates() lookup.
+    """
+    context = {'portal': portal or {}}
+    for report in reports:
+        report.start(context)
+
+    tow_reducers = [r.add_tow for r in reports if 'foia' in r.sources]
+    if tow_reducers and foia is not None:
+        for tow in iter_tows(foia):
+            for add in tow_reducers:
+                add(tow)
+
+    dispatch_reducers = [r.add_dispatch for r in reports if 'oemc' in r.sources]
+    if dispatch_reducers and oemc is not None:
+        for event in iter_dispatch_events(oemc):
+            for add in dispatch_reducers:
+                add(event)
+
+    return {report.name: report.result() for report in reports}
+
+
+def print_results(reports, results):
+    for report in reports:
+        _banner(report.title)
+        report.print_report(results[report.name])
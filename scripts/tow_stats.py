@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Percentiles and threshold counts for the tow delay reports.
+
+The reports used to rebuild a list of total_seconds() for every percentile
+they printed and scan every delay once per "within N minutes" threshold.
+Distribution converts the values to a float array once, sorts once, and
+answers percentiles by index and threshold counts by bisection:
+
+    dist = Distribution(delays)                  # timedeltas or numbers
+    p25, p50, p75 = dist.percentiles([25, 50, 75])
+    within_hour = dist.count_at_most(3600)       # delays <= 1 hour
+    dist.histogram([60, 300, 900])               # [<1m, 1-5m, 5-15m, >=15m]
+
+Timedeltas become seconds; results are plain floats (seconds for delays).
+
+Standard library only.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+
+
+def _as_float(value):
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    return float(value)
+
+
+class Distribution:
+    """
+    A sorted sample of numbers.
+
+    Percentile methods:
+      'linear'  interpolate between the two closest ranks (numpy's default,
+                what analyze-tow-timing has always printed)
+      'lower'   values[int(n * p / 100)], the index rule used by
+                analyze-tow-notification-timing and analyze-tow-data
+    """
+
+    def __init__(self, values):
+        self.values = array('d', sorted(_as_float(v) for v in values))
+
+    def __len__(self):
+        return len(self.values)
+
+    def __bool__(self):
+        return len(self.values) > 0
+
+    @property
+    def min(self):
+        return self.values[0] if self.values else None
+
+    @property
+    def max(self):
+        return self.values[-1] if self.values else None
+
+    @property
+    def mean(self):
+        return sum(self.values) / len(self.values) if self.values else None
+
+    def percentile(self, p, method='linear'):
+        """The p-th percentile (0-100), or None if the sample is empty."""
+        data = self.values
+        n = len(data)
+        if not n:
+            return None
+        if method == 'lower':
+            return data[min(int(n * p / 100.0), n - 1)]
+        if method != 'linear':
+            raise ValueError(f"unknown percentile method {method!r}")
+        k = (n - 1) * (p / 100.0)
+        f = int(k)
+        if f + 1 >= n:
+            return data[-1]
+        return data[f] + (data[f + 1] - data[f]) * (k - f)
+
+    def percentiles(self, ps, method='linear'):
+        return [self.percentile(p, method) for p in ps]
+
+    def count_at_most(self, threshold):
+        """Number of values <= threshold."""
+        return bisect_right(self.values, threshold)
+
+    def count_below(self, threshold):
+        """Number of values < threshold."""
+        return bisect_left(self.values, threshold)
+
+    def fraction_at_most(self, threshold):
+        return self.count_at_most(threshold) / len(self.values) if self.values else 0.0
+
+    def histogram(self, edges):
+        """
+        Counts per bucket for ascending edges: [< e0, e0 <= v < e1, ...,
+        >= e_last] (len(edges) + 1 counts).
+        """
+        cuts = [0] + [self.count_below(edge) for edge in edges] + [len(self.values)]
+        return [hi - lo for lo, hi in zip(cuts, cuts[1:])]
@@ -9,21 +9,67 @@ Runs weekly via GitHub Actions or manually.
 import json
 import os
 import sys
+import tempfile
 from datetime import datetime, timedelta
 from collections import defaultdict
 import urllib.request
 import urllib.parse
 
-# Block size: ~0.002 degrees = ~220m = ~720 ft = ~1.5 Chicago blocks
-BLOCK_SIZE = 0.002
-
-def round_to_block(lat, lng):
-    """Round coordinates to block grid."""
-    return (round(lat / BLOCK_SIZE) * BLOCK_SIZE, round(lng / BLOCK_SIZE) * BLOCK_SIZE)
-
-def fetch_data(dataset_id, params, limit=50000):
-    """Fetch data from Chicago Data Portal."""
-    base_url = f"https://data.cityofchicago.org/resource/{dataset_id}.json"
+from portal_client import iter_csv_rows, iter_json_rows, open_body
+from grid import cell_center, cell_id
+from processor_runner import run_processors
+from layer_assets import publish_layers
+
+# Max characters of quoted sr_type literals per IN (...) clause in process_311
+SR_TYPE_BATCH_CHARS = 1500
+
+# Override to point at a local stand-in (scripts/portal-standin-server.py)
+PORTAL_URL = os.environ.get('CHICAGO_PORTAL_URL', 'https://data.cityofchicago.org')
+
+# Portal transport: 'csv' (gzip-encoded CSV, default) or 'json'
+PORTAL_FORMAT = os.environ.get('PORTAL_FORMAT', 'csv')
+
+# Processor isolation: each dataset runs in its own worker process
+PROCESSOR_WORKERS = int(os.environ.get('PROCESSOR_WORKERS', 4))
+PROCESSOR_TIMEOUT = int(os.environ.get('PROCESSOR_TIMEOUT', 600))  # seconds per attempt
+PROCESSOR_MEMORY_MB = int(os.environ.get('PROCESSOR_MEMORY_MB', 2048))
+PROCESSOR_RETRIES = int(os.environ.get('PROCESSOR_RETRIES', 1))
+RUN_REPORT_PATH = os.environ.get(
+    'RUN_REPORT_PATH',
+    os.path.join(tempfile.gettempdir(), 'neighborhood-data-run-report.json')
+)
+
+def batch_in_lists(values, max_chars):
+    """
+    Group values into quoted, comma-separated SoQL IN lists of at most
+    max_chars each, so every query URL stays well under server limits.
+    """
+    batches = []
+    current = []
+    size = 0
+    for value in values:
+        literal = "'" + value.replace("'", "''") + "'"
+        if current and size + len(literal) > max_chars:
+            batches.append(','.join(current))
+            current = []
+            size = 0
+        current.append(literal)
+        size += len(literal) + 1
+    if current:
+        batches.append(','.join(current))
+    return batches
+
+def fetch_data(dataset_id, params, limit=50000, fmt=None):
+    """
+    Fetch data from Chicago Data Portal.
+
+    Returns a generator that yields rows as the response body streams in, so
+    the request is only sent once the caller starts iterating. With fmt='csv'
+    the .csv resource endpoint is used; rows come back as the same dicts the
+    JSON endpoint produces, restricted to the $select columns.
+    """
+    fmt = fmt or PORTAL_FORMAT
+    base_url = f"{PORTAL_URL}/resource/{dataset_id}.{fmt}"
     params['$limit'] = limit
     query = urllib.parse.urlencode(params)
     url = f"{base_url}?{query}"
@@ -31,12 +77,15 @@ def fetch_data(dataset_id, params, limit=50000):
     print(f"  Fetching: {url[:100]}...")
 
     req = urllib.request.Request(url)
-    req.add_header('Accept', 'application/json')
+    req.add_header('Accept', 'text/csv' if fmt == 'csv' else 'application/json')
+    req.add_header('Accept-Encoding', 'gzip')
 
     with urllib.request.urlopen(req, timeout=120) as response:
-        data = json.loads(response.read().decode('utf-8'))
-
-    return data
+        body = open_body(response)
+        if fmt == 'csv':
+            yield from iter_csv_rows(body)
+        else:
+            yield from iter_json_rows(body)
 
 # ============================================
 # 311 SERVICE REQUESTS
@@ -73,6 +122,11 @@ def process_311():
         ]
     }
 
+    type_to_category = {}
+    for category, types in RELEVANT_TYPES.items():
+        for sr_type in types:
+            type_to_category[sr_type] = category
+
     blocks = defaultdict(lambda: {
         'count': 0,
         'categories': defaultdict(int),
@@ -85,18 +139,31 @@ def process_311():
     one_year_ago = (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%dT00:00:00')
     ninety_days_ago = (datetime.now() - timedelta(days=90)).strftime('%Y-%m-%dT00:00:00')
 
-    # Fetch all relevant types
-    for category, types in RELEVANT_TYPES.items():
-        for sr_type in types:
-            try:
-                data = fetch_data('v6vf-nfxy', {
-                    '$where': f"sr_type = '{sr_type}' AND created_date > '{one_year_ago}' AND latitude IS NOT NULL",
-                    '$select': 'sr_number,sr_type,created_date,latitude,longitude,ward,street_address'
-                })
+    type_counts = defaultdict(int)
+    page_size = 50000
 
-                print(f"    {sr_type}: {len(data)} records")
+    # One IN (...) query per batch of types instead of one query per type.
+    # Batches page with $offset, so a busy type no longer hits its own 50K cap.
+    for batch in batch_in_lists(list(type_to_category), SR_TYPE_BATCH_CHARS):
+        offset = 0
+        try:
+            while True:
+                rows = fetch_data('v6vf-nfxy', {
+                    '$where': f"sr_type IN ({batch}) AND created_date > '{one_year_ago}' AND latitude IS NOT NULL",
+                    '$select': 'sr_type,created_date,latitude,longitude,ward,street_address',
+                    '$order': ':id',
+                    '$offset': offset
+                }, limit=page_size)
+
+                fetched = 0
+                for row in rows:
+                    fetched += 1
+                    sr_type = row.get('sr_type', '')
+                    category = type_to_category.get(sr_type)
+                    if not category:
+                        continue
+                    type_counts[sr_type] += 1
 
-                for row in data:
                     try:
                         lat = float(row.get('latitude', 0))
                         lng = float(row.get('longitude', 0))
@@ -106,7 +173,7 @@ def process_311():
                     if not (41.6 < lat < 42.1 and -88.0 < lng < -87.5):
                         continue
 
-                    block_key = round_to_block(lat, lng)
+                    block_key = cell_id(lat, lng)
                     blocks[block_key]['count'] += 1
                     blocks[block_key]['categories'][category] += 1
 
@@ -119,8 +186,15 @@ def process_311():
                     if created and created >= ninety_days_ago:
                         blocks[block_key]['recent_count'] += 1
 
-            except Exception as e:
-                print(f"    Error fetching {sr_type}: {e}")
+                if fetched < page_size:
+                    break
+                offset += page_size
+
+        except Exception as e:
+            print(f"    Error fetching batch at offset {offset}: {e}")
+
+    for sr_type in type_to_category:
+        print(f"    {sr_type}: {type_counts[sr_type]} records")
 
     print(f"  Total blocks with data: {len(blocks)}")
 
@@ -129,11 +203,12 @@ def process_311():
     print(f"  Blocks with 3+ requests: {len(filtered)}")
 
     data = []
-    for (lat, lng), block in filtered.items():
+    for cell, block in filtered.items():
+        lat, lng = cell_center(cell)
         score = min(100, int(block['count'] / 50 * 100))
         data.append([
-            round(lat, 4),
-            round(lng, 4),
+            lat,
+            lng,
             block['count'],
             score,
             dict(block['categories']),
@@ -194,15 +269,15 @@ def process_crimes():
 
     # Crimes - One Year Prior to Present dataset
     try:
-        data = fetch_data('ijzp-q8t2', {
+        rows = fetch_data('ijzp-q8t2', {
             '$where': f"date > '{one_year_ago}' AND latitude IS NOT NULL",
-            '$select': 'id,date,primary_type,block,latitude,longitude,ward,arrest',
+            '$select': 'primary_type,block,latitude,longitude,ward,arrest',
             '$limit': 200000
         })
 
-        print(f"  Fetched {len(data)} crime records")
-
-        for row in data:
+        fetched = 0
+        for row in rows:
+            fetched += 1
             crime_type = row.get('primary_type', '').strip()
             category = type_to_category.get(crime_type, 'other')
 
@@ -215,7 +290,7 @@ def process_crimes():
             if not (41.6 < lat < 42.1 and -88.0 < lng < -87.5):
                 continue
 
-            block_key = round_to_block(lat, lng)
+            block_key = cell_id(lat, lng)
             blocks[block_key]['count'] += 1
             blocks[block_key]['categories'][category] += 1
 
@@ -227,6 +302,8 @@ def process_crimes():
             if str(row.get('arrest', '')).upper() in ['TRUE', 'Y', '1']:
                 blocks[block_key]['arrests'] += 1
 
+        print(f"  Fetched {fetched} crime records")
+
     except Exception as e:
         print(f"  Error fetching crimes: {e}")
         return None
@@ -237,14 +314,15 @@ def process_crimes():
     print(f"  Blocks with 2+ crimes: {len(filtered)}")
 
     data = []
-    for (lat, lng), block in filtered.items():
+    for cell, block in filtered.items():
+        lat, lng = cell_center(cell)
         violent = block['categories'].get('violent', 0)
         property_crime = block['categories'].get('property', 0)
         score = min(100, int((violent * 3 + property_crime) / block['count'] * 50 + block['count'] / 20 * 25))
 
         data.append([
-            round(lat, 4),
-            round(lng, 4),
+            lat,
+            lng,
             block['count'],
             score,
             dict(block['categories']),
@@ -291,15 +369,15 @@ def process_crashes():
     one_year_ago = (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%dT00:00:00')
 
     try:
-        data = fetch_data('85ca-t3if', {
+        rows = fetch_data('85ca-t3if', {
             '$where': f"crash_date > '{one_year_ago}' AND latitude IS NOT NULL",
-            '$select': 'crash_record_id,crash_date,latitude,longitude,injuries_total,injuries_fatal,hit_and_run_i,street_name,street_direction,street_no',
+            '$select': 'latitude,longitude,injuries_total,injuries_fatal,hit_and_run_i,street_name,street_direction,street_no',
             '$limit': 100000
         })
 
-        print(f"  Fetched {len(data)} crash records")
-
-        for row in data:
+        fetched = 0
+        for row in rows:
+            fetched += 1
             try:
                 lat = float(row.get('latitude', 0))
                 lng = float(row.get('longitude', 0))
@@ -309,7 +387,7 @@ def process_crashes():
             if not (41.6 < lat < 42.1 and -88.0 < lng < -87.5):
                 continue
 
-            block_key = round_to_block(lat, lng)
+            block_key = cell_id(lat, lng)
             blocks[block_key]['count'] += 1
 
             try:
@@ -327,6 +405,8 @@ def process_crashes():
                 num = row.get('street_no', '')
                 blocks[block_key]['address'] = f"{num} {direction} {street}".strip()
 
+        print(f"  Fetched {fetched} crash records")
+
     except Exception as e:
         print(f"  Error fetching crashes: {e}")
         return None
@@ -337,7 +417,8 @@ def process_crashes():
     print(f"  Blocks with 3+ crashes: {len(filtered)}")
 
     data = []
-    for (lat, lng), block in filtered.items():
+    for cell, block in filtered.items():
+        lat, lng = cell_center(cell)
         injury_rate = block['injuries'] / block['count'] if block['count'] > 0 else 0
         score = min(100, int(
             block['fatal'] * 20 +
@@ -346,8 +427,8 @@ def process_crashes():
         ))
 
         data.append([
-            round(lat, 4),
-            round(lng, 4),
+            lat,
+            lng,
             block['count'],
             score,
             block['injuries'],
@@ -392,15 +473,15 @@ def process_violations():
     one_year_ago = (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%dT00:00:00')
 
     try:
-        data = fetch_data('22u3-xenr', {
+        rows = fetch_data('22u3-xenr', {
             '$where': f"violation_date > '{one_year_ago}' AND latitude IS NOT NULL",
-            '$select': 'id,violation_date,violation_code,violation_description,violation_status,address,latitude,longitude',
+            '$select': 'violation_code,violation_description,violation_status,address,latitude,longitude',
             '$limit': 100000
         })
 
-        print(f"  Fetched {len(data)} violation records")
-
-        for row in data:
+        fetched = 0
+        for row in rows:
+            fetched += 1
             try:
                 lat = float(row.get('latitude', 0))
                 lng = float(row.get('longitude', 0))
@@ -410,7 +491,7 @@ def process_violations():
             if not (41.6 < lat < 42.1 and -88.0 < lng < -87.5):
                 continue
 
-            block_key = round_to_block(lat, lng)
+            block_key = cell_id(lat, lng)
             blocks[block_key]['count'] += 1
 
             desc = (row.get('violation_description', '') + ' ' + row.get('violation_code', '')).upper()
@@ -424,6 +505,8 @@ def process_violations():
             if not blocks[block_key]['address']:
                 blocks[block_key]['address'] = row.get('address', '')
 
+        print(f"  Fetched {fetched} violation records")
+
     except Exception as e:
         print(f"  Error fetching violations: {e}")
         return None
@@ -434,12 +517,13 @@ def process_violations():
     print(f"  Blocks with 2+ violations: {len(filtered)}")
 
     data = []
-    for (lat, lng), block in filtered.items():
+    for cell, block in filtered.items():
+        lat, lng = cell_center(cell)
         score = min(100, int(block['high_risk'] * 10 + block['count'] / 10 * 50))
 
         data.append([
-            round(lat, 4),
-            round(lng, 4),
+            lat,
+            lng,
             block['count'],
             score,
             block['high_risk'],
@@ -476,15 +560,15 @@ def process_potholes():
     one_year_ago = (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%dT00:00:00')
 
     try:
-        data = fetch_data('wqdh-9gek', {
+        rows = fetch_data('wqdh-9gek', {
             '$where': f"request_date > '{one_year_ago}' AND latitude IS NOT NULL",
-            '$select': 'service_request_number,request_date,completion_date,number_of_potholes_filled_on_block,address,latitude,longitude',
+            '$select': 'completion_date,number_of_potholes_filled_on_block,address,latitude,longitude',
             '$limit': 50000
         })
 
-        print(f"  Fetched {len(data)} pothole records")
-
-        for row in data:
+        fetched = 0
+        for row in rows:
+            fetched += 1
             try:
                 lat = float(row.get('latitude', 0))
                 lng = float(row.get('longitude', 0))
@@ -494,7 +578,7 @@ def process_potholes():
             if not (41.6 < lat < 42.1 and -88.0 < lng < -87.5):
                 continue
 
-            block_key = round_to_block(lat, lng)
+            block_key = cell_id(lat, lng)
             blocks[block_key]['count'] += 1
 
             try:
@@ -508,6 +592,8 @@ def process_potholes():
             if not blocks[block_key]['address']:
                 blocks[block_key]['address'] = row.get('address', '')
 
+        print(f"  Fetched {fetched} pothole records")
+
     except Exception as e:
         print(f"  Error fetching potholes: {e}")
         return None
@@ -518,10 +604,11 @@ def process_potholes():
     print(f"  Blocks with 2+ pothole requests: {len(filtered)}")
 
     data = []
-    for (lat, lng), block in filtered.items():
+    for cell, block in filtered.items():
+        lat, lng = cell_center(cell)
         data.append([
-            round(lat, 4),
-            round(lng, 4),
+            lat,
+            lng,
             block['count'],
             block['filled'],
             block['completed'],
@@ -558,15 +645,15 @@ def process_permits():
     one_year_ago = (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%dT00:00:00')
 
     try:
-        data = fetch_data('ydr8-5enu', {
+        rows = fetch_data('ydr8-5enu', {
             '$where': f"application_start_date > '{one_year_ago}' AND latitude IS NOT NULL",
-            '$select': 'id,application_start_date,permit_status,reported_cost,latitude,longitude,street_number,street_direction,street_name',
+            '$select': 'permit_status,reported_cost,latitude,longitude,street_number,street_direction,street_name',
             '$limit': 100000
         })
 
-        print(f"  Fetched {len(data)} permit records")
-
-        for row in data:
+        fetched = 0
+        for row in rows:
+            fetched += 1
             try:
                 lat = float(row.get('latitude', 0))
                 lng = float(row.get('longitude', 0))
@@ -576,7 +663,7 @@ def process_permits():
             if not (41.6 < lat < 42.1 and -88.0 < lng < -87.5):
                 continue
 
-            block_key = round_to_block(lat, lng)
+            block_key = cell_id(lat, lng)
             blocks[block_key]['count'] += 1
 
             status = row.get('permit_status', '').upper()
@@ -594,6 +681,8 @@ def process_permits():
                 name = row.get('street_name', '')
                 blocks[block_key]['address'] = f"{num} {direction} {name}".strip()
 
+        print(f"  Fetched {fetched} permit records")
+
     except Exception as e:
         print(f"  Error fetching permits: {e}")
         return None
@@ -604,10 +693,11 @@ def process_permits():
     print(f"  Blocks with 2+ permits: {len(filtered)}")
 
     data = []
-    for (lat, lng), block in filtered.items():
+    for cell, block in filtered.items():
+        lat, lng = cell_center(cell)
         data.append([
-            round(lat, 4),
-            round(lng, 4),
+            lat,
+            lng,
             block['count'],
             block['issued'],
             int(block['cost']),
@@ -643,15 +733,15 @@ def process_licenses():
     one_year_ago = (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%dT00:00:00')
 
     try:
-        data = fetch_data('r5kz-chrr', {
+        rows = fetch_data('r5kz-chrr', {
             '$where': f"date_issued > '{one_year_ago}' AND latitude IS NOT NULL",
-            '$select': 'id,date_issued,license_status,address,latitude,longitude',
+            '$select': 'license_status,address,latitude,longitude',
             '$limit': 100000
         })
 
-        print(f"  Fetched {len(data)} license records")
-
-        for row in data:
+        fetched = 0
+        for row in rows:
+            fetched += 1
             try:
                 lat = float(row.get('latitude', 0))
                 lng = float(row.get('longitude', 0))
@@ -661,7 +751,7 @@ def process_licenses():
             if not (41.6 < lat < 42.1 and -88.0 < lng < -87.5):
                 continue
 
-            block_key = round_to_block(lat, lng)
+            block_key = cell_id(lat, lng)
             blocks[block_key]['count'] += 1
 
             status = row.get('license_status', '').upper()
@@ -671,6 +761,8 @@ def process_licenses():
             if not blocks[block_key]['address']:
                 blocks[block_key]['address'] = row.get('address', '')
 
+        print(f"  Fetched {fetched} license records")
+
     except Exception as e:
         print(f"  Error fetching licenses: {e}")
         return None
@@ -681,10 +773,11 @@ def process_licenses():
     print(f"  Blocks with 2+ licenses: {len(filtered)}")
 
     data = []
-    for (lat, lng), block in filtered.items():
+    for cell, block in filtered.items():
+        lat, lng = cell_center(cell)
         data.append([
-            round(lat, 4),
-            round(lng, 4),
+            lat,
+            lng,
             block['count'],
             block['active'],
             block['address'] or ''
@@ -721,8 +814,6 @@ def main():
         print(f"Error: Output directory not found: {output_dir}")
         sys.exit(1)
 
-    success = True
-
     # Process each data type
     processors = [
         ('311-data.json', process_311),
@@ -734,20 +825,29 @@ def main():
         ('licenses-data.json', process_licenses),
     ]
 
-    for filename, processor in processors:
-        try:
-            data = processor()
-            if data:
-                output_path = os.path.join(output_dir, filename)
-                with open(output_path, 'w') as f:
-                    json.dump(data, f, separators=(',', ':'))
-                print(f"  Written: {filename} ({os.path.getsize(output_path) / 1024:.1f} KB)")
-            else:
-                print(f"  FAILED: {filename}")
-                success = False
-        except Exception as e:
-            print(f"  ERROR processing {filename}: {e}")
-            success = False
+    started = datetime.now()
+    results = run_processors(
+        processors,
+        output_dir,
+        workers=PROCESSOR_WORKERS,
+        timeout=PROCESSOR_TIMEOUT,
+        memory_mb=PROCESSOR_MEMORY_MB,
+        retries=PROCESSOR_RETRIES,
+    )
+    success = all(r['status'] == 'ok' for r in results)
+
+    published = publish_layers(output_dir, [r['file'] for r in results if r['status'] == 'ok'])
+    print(f"\n  Published {published} hashed assets (manifest: public/layer-manifest.json)")
+
+    report = {
+        'started': started.strftime('%Y-%m-%dT%H:%M:%S'),
+        'finished': datetime.now().strftime('%Y-%m-%dT%H:%M:%S'),
+        'success': success,
+        'processors': results,
+    }
+    with open(RUN_REPORT_PATH, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n  Run report: {RUN_REPORT_PATH}")
 
     print("\n" + "=" * 50)
     if success:
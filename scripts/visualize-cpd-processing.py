@@ -4,11 +4,7 @@ Visualize CPD internal processing time from FOIA data.
 Shows how long it takes from actual tow to record creation.
 """
 
-import openpyxl
-import pandas as pd
-from datetime import datetime
-
-FOIA_FILE = "/home/randy-vollrath/Downloads/25238_P150710_Towed_vehicles.xlsx"
+from tow_data import FOIA_FILE, load_foia, parse_datetime_column
 
 print("="*80)
 print("CPD INTERNAL PROCESSING TIME ANALYSIS")
@@ -16,31 +12,11 @@ print("From actual tow to 'Date Tow Record Created'")
 print("="*80)
 
 # Load FOIA data
-wb = openpyxl.load_workbook(FOIA_FILE, read_only=True)
-sheet = wb["Data"]
-headers = [cell.value for cell in next(sheet.iter_rows(min_row=1, max_row=1))]
-foia_rows = []
-for row in sheet.iter_rows(min_row=2, values_only=True):
-    foia_rows.append(row)
-
-foia_df = pd.DataFrame(foia_rows, columns=headers)
+foia_df = load_foia(FOIA_FILE).to_dataframe()
 
 # Parse dates
-def safe_parse_date(val):
-    if pd.isna(val):
-        return None
-    if isinstance(val, datetime):
-        return val
-    if isinstance(val, str):
-        for fmt in ["%Y-%m-%d %H:%M:%S", "%m/%d/%Y %H:%M:%S", "%Y-%m-%d", "%m/%d/%Y"]:
-            try:
-                return datetime.strptime(val, fmt)
-            except:
-                continue
-    return None
-
-foia_df['tow_date_parsed'] = foia_df['Tow Date'].apply(safe_parse_date)
-foia_df['created_date_parsed'] = foia_df['Date Tow Record Created'].apply(safe_parse_date)
+foia_df['tow_date_parsed'] = parse_datetime_column(foia_df['Tow Date'])
+foia_df['created_date_parsed'] = parse_datetime_column(foia_df['Date Tow Record Created'])
 
 # Filter to complete records
 complete = foia_df[